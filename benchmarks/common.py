@@ -0,0 +1,215 @@
+"""Fixtures, timing, and output helpers shared by the benchmarks."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+root_dir = Path(__file__).parent.parent
+testdata_dir = root_dir.joinpath("mphapi", "testdata")
+snapshot_dir = root_dir.joinpath("mphapi", "snapshots", "client_test", "test_client")
+
+claim_kinds = ["hcfa", "inpatient", "outpatient"]
+"""The kinds of claims in the testdata, from smallest to largest"""
+
+
+def load_claim_data(kind: str) -> dict[str, Any]:
+    """Returns the camelCase JSON of the testdata claim of the given kind."""
+
+    with testdata_dir.joinpath(f"{kind}.json").open() as f:
+        return json.load(f)
+
+
+def load_pricing_data(kind: str) -> dict[str, Any]:
+    """Returns the camelCase JSON the API responds with when pricing the testdata claim."""
+
+    from mphapi import Pricing
+
+    with snapshot_dir.joinpath(f"{kind}.json").open() as f:
+        pricing = Pricing.model_validate_json(f.read())
+
+    return pricing.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def claim_mix(count: int) -> list[dict[str, Any]]:
+    """
+    Returns `count` claims cycling through the testdata claims, each with a unique claim ID. This is
+    roughly the mix of professional and institutional claims seen in bulk pricing jobs.
+    """
+
+    templates = [load_claim_data(kind) for kind in claim_kinds]
+
+    claims: list[dict[str, Any]] = []
+    for i in range(count):
+        claim = dict(templates[i % len(templates)])
+        claim["claimID"] = str(i)
+        claims.append(claim)
+
+    return claims
+
+
+def pricing_mix(count: int) -> list[dict[str, Any]]:
+    """Returns `count` pricing results matching the claims from `claim_mix`."""
+
+    templates = [load_pricing_data(kind) for kind in claim_kinds]
+
+    pricings: list[dict[str, Any]] = []
+    for i in range(count):
+        pricing = dict(templates[i % len(templates)])
+        pricing["claimID"] = str(i)
+        pricings.append(pricing)
+
+    return pricings
+
+
+def responses_body(pricings: list[dict[str, Any]]) -> bytes:
+    """Wraps pricing results in the envelope returned by the batch endpoints."""
+
+    return json.dumps(
+        {
+            "results": pricings,
+            "success_count": len(pricings),
+            "error_count": 0,
+            "status_code": 200,
+        }
+    ).encode()
+
+
+def measure(
+    fn: Callable[[], Any], operations: int = 1, repeat: int = 7
+) -> dict[str, float]:
+    """
+    Times `fn` the way `timeit` does: the number of calls per sample is picked so a sample takes
+    at least 0.2 seconds, and the best samples are the least disturbed by the rest of the system.
+
+    `operations` is how many operations a single call performs (e.g. the number of claims in a
+    batch) so results are reported per operation.
+    """
+
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = [
+        elapsed / (number * operations) for elapsed in timer.repeat(repeat, number)
+    ]
+
+    return summarize(samples)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    median = statistics.median(samples)
+
+    return {
+        "min": min(samples),
+        "median": median,
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "max": max(samples),
+        "ops_per_second": 1 / median if median > 0 else 0.0,
+    }
+
+
+def environment() -> dict[str, str]:
+    """Describes what was benchmarked so results from different versions can be told apart."""
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root_dir,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(
+    benchmark: str, metrics: dict[str, dict[str, float]], output: Path | None
+) -> None:
+    """Writes the results as JSON to `output`, or stdout if it's not set."""
+
+    result = {
+        "benchmark": benchmark,
+        "environment": environment(),
+        "metrics": metrics,
+    }
+
+    if output is None:
+        json.dump(result, sys.stdout, indent=4)
+        print()
+    else:
+        output.write_text(json.dumps(result, indent=4))
+
+
+def canned_pricing(pricings: list[dict[str, Any]]) -> Callable[[bytes], bytes]:
+    """
+    Returns a function answering a pricing request body with canned pricing results. Batch
+    requests get one result per claim in the request.
+    """
+
+    pricing_bodies = [json.dumps(pricing) for pricing in pricings]
+
+    def respond(content: bytes) -> bytes:
+        request = json.loads(content)
+
+        if isinstance(request, list):
+            results = [
+                pricing_bodies[i % len(pricing_bodies)] for i in range(len(request))
+            ]
+            body = (
+                '{"results":[%s],"success_count":%d,"error_count":0,"status_code":200}'
+                % (",".join(results), len(results))
+            )
+        else:
+            body = '{"result":%s,"status":200}' % pricing_bodies[0]
+
+        return body.encode()
+
+    return respond
+
+
+def serve_pricing(pricings: list[dict[str, Any]]) -> ThreadingHTTPServer:
+    """Serves canned pricing results from localhost, standing in for the pricing API."""
+
+    respond = canned_pricing(pricings)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # The headers and body are written separately, so with Nagle's algorithm the body of a
+        # response on a reused connection waits for the client's delayed ACK (~40ms on Linux).
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            content = respond(self.rfile.read(int(self.headers["Content-Length"])))
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,64 @@
+"""
+Compares two benchmark result files, e.g. from before and after a change.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--fail-above PERCENT]
+
+With `--fail-above`, exits with a non-zero status when any metric's median got slower by more than
+the given percentage, so it can be used to guard against regressions.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load_medians(path: Path) -> dict[str, float]:
+    with path.open() as f:
+        result = json.load(f)
+
+    return {name: metric["median"] for name, metric in result["metrics"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares two benchmark result files.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--fail-above", type=float, default=None)
+    args = parser.parse_args()
+
+    baseline = load_medians(args.baseline)
+    current = load_medians(args.current)
+
+    names = [name for name in current if name in baseline]
+    width = max((len(name) for name in names), default=0)
+
+    regressions: list[str] = []
+
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for name in names:
+        change = (current[name] - baseline[name]) / baseline[name] * 100
+        print(
+            f"{name:<{width}}  {baseline[name]:>12.3e}  {current[name]:>12.3e}  {change:>+7.1f}%"
+        )
+
+        if args.fail_above is not None and change > args.fail_above:
+            regressions.append(name)
+
+    for name in sorted(set(baseline) ^ set(current)):
+        print(
+            f"{name:<{width}}  only in {'baseline' if name in baseline else 'current'}"
+        )
+
+    if regressions:
+        print(
+            f"\n{len(regressions)} metric(s) regressed by more than {args.fail_above}%: "
+            + ", ".join(regressions),
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
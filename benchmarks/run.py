@@ -0,0 +1,183 @@
+"""
+Benchmarks the CPU-bound parts of pricing claims, plus end-to-end batch pricing.
+
+Each metric is reported as seconds per operation, where an operation is a single claim, result,
+or value depending on the case. The end-to-end case prices batches against canned responses
+served from localhost so the network and API aren't measured. The in-memory case answers the same
+requests without a socket, measuring only the client.
+
+Usage:
+    python -m benchmarks.run [--filter SUBSTRING] [--output results.json]
+
+Compare results between versions with `python -m benchmarks.compare`.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+
+from mphapi import (
+    Claim,
+    Client,
+    Date,
+    Decimal,
+    InMemoryTransport,
+    PriceConfig,
+    Pricing,
+    Responses,
+    serialize_list,
+)
+
+from .common import (
+    canned_pricing,
+    claim_kinds,
+    claim_mix,
+    load_claim_data,
+    measure,
+    pricing_mix,
+    responses_body,
+    serve_pricing,
+    server_url,
+    write_results,
+)
+
+batch_size = 100
+"""Number of claims in batch cases"""
+
+Case = Callable[[], dict[str, float]]
+
+
+def claim_validation_cases() -> dict[str, Case]:
+    cases: dict[str, Case] = {}
+
+    for kind in claim_kinds:
+        data = load_claim_data(kind)
+        content = json.dumps(data).encode()
+
+        def validate_json(content: bytes = content):
+            return measure(lambda: Claim.model_validate_json(content))
+
+        def validate_python(data: dict[str, Any] = data):
+            return measure(lambda: Claim.model_validate(data))
+
+        cases[f"claim_validate_json[{kind}]"] = validate_json
+        cases[f"claim_validate_python[{kind}]"] = validate_python
+
+    return cases
+
+
+def serialization_cases() -> dict[str, Case]:
+    claims = tuple(Claim.model_validate(data) for data in claim_mix(batch_size))
+
+    def serialize_batch():
+        return measure(lambda: serialize_list(claims), batch_size)
+
+    def serialize_claim():
+        claim = claims[2]
+
+        return measure(lambda: claim.model_dump_json(by_alias=True, exclude_none=True))
+
+    return {
+        "request_serialize[batch]": serialize_batch,
+        "request_serialize[outpatient]": serialize_claim,
+    }
+
+
+def decode_cases() -> dict[str, Case]:
+    content = responses_body(pricing_mix(batch_size))
+
+    def decode_batch():
+        return measure(
+            lambda: Responses[Pricing]
+            .model_validate_json(content, strict=True)
+            .results(),
+            batch_size,
+        )
+
+    return {"responses_decode[batch]": decode_batch}
+
+
+def scalar_cases() -> dict[str, Case]:
+    date_adapter = TypeAdapter(Date)
+    decimal_adapter = TypeAdapter(Decimal)
+
+    def parse_date():
+        return measure(lambda: date_adapter.validate_json(b'"20221031"'))
+
+    def parse_decimal_str():
+        return measure(lambda: decimal_adapter.validate_json(b'"12345.67"'))
+
+    def parse_decimal_float():
+        return measure(lambda: decimal_adapter.validate_json(b"12345.67"))
+
+    return {
+        "date_parse": parse_date,
+        "decimal_parse[str]": parse_decimal_str,
+        "decimal_parse[float]": parse_decimal_float,
+    }
+
+
+def end_to_end_cases() -> dict[str, Case]:
+    def price_batch():
+        claims = [Claim.model_validate(data) for data in claim_mix(batch_size)]
+
+        server = serve_pricing(pricing_mix(len(claim_kinds)))
+        try:
+            client = Client("benchmark", api_url=server_url(server))
+            config = PriceConfig()
+
+            return measure(lambda: client.price_batch(config, *claims), batch_size)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def price_batch_in_memory():
+        claims = [Claim.model_validate(data) for data in claim_mix(batch_size)]
+
+        respond = canned_pricing(pricing_mix(len(claim_kinds)))
+        transport = InMemoryTransport(
+            lambda request: (200, respond(request.body)), record_requests=False
+        )
+        client = Client("benchmark", transport=transport)
+        config = PriceConfig()
+
+        return measure(lambda: client.price_batch(config, *claims), batch_size)
+
+    return {
+        "price_batch[end_to_end]": price_batch,
+        "price_batch[in_memory]": price_batch_in_memory,
+    }
+
+
+def all_cases() -> dict[str, Case]:
+    return {
+        **claim_validation_cases(),
+        **serialization_cases(),
+        **decode_cases(),
+        **scalar_cases(),
+        **end_to_end_cases(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the CPU-bound parts of pricing claims."
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run cases containing this substring"
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    metrics = {
+        name: case() for name, case in all_cases().items() if args.filter in name
+    }
+
+    write_results("suite", metrics, args.output)
+
+
+if __name__ == "__main__":
+    main()
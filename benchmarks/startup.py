@@ -0,0 +1,130 @@
+"""
+Measures how long short-lived processes spend getting `mphapi` ready.
+
+Every sample runs in a fresh interpreter so nothing is cached between runs. The following
+is recorded for each sample:
+
+- `import_seconds`: `import mphapi`
+- `client_import_seconds`: resolving `Claim`, `Client`, and `PriceConfig` from the package
+- `first_call_seconds`: the first `Client.price` call, including any deferred schema building
+- `second_call_seconds`: a second `Client.price` call, for comparison with the first
+
+Calls are made against a canned response served from localhost so the network isn't measured.
+Each sample also checks that importing `Client` doesn't import the modules only some clients
+need, which would slow every process down.
+
+Usage:
+    python -m benchmarks.startup [--samples N] [--output results.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from .common import (
+    load_pricing_data,
+    root_dir,
+    serve_pricing,
+    server_url,
+    summarize,
+    testdata_dir,
+    write_results,
+)
+
+# Modules which must only be imported by the clients which use them.
+lazy_modules = [
+    "mphapi.fingerprint",
+    "sqlite3",
+    "mphapi.profiling",
+    "cProfile",
+    "mphapi.http2",
+    "httpx",
+]
+
+sample_script = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import mphapi
+imported = time.perf_counter()
+from mphapi import Claim, Client, PriceConfig
+client_imported = time.perf_counter()
+
+eager = [module for module in json.loads(sys.argv[3]) if module in sys.modules]
+if eager:
+    sys.exit(f"importing Client imported {', '.join(eager)}")
+
+with open(sys.argv[2]) as f:
+    claim = Claim.model_validate_json(f.read())
+
+client = Client("benchmark", api_url=sys.argv[1])
+config = PriceConfig()
+
+first_start = time.perf_counter()
+client.price(config, claim)
+first_end = time.perf_counter()
+client.price(config, claim)
+second_end = time.perf_counter()
+
+json.dump(
+    {
+        "import_seconds": imported - start,
+        "client_import_seconds": client_imported - imported,
+        "first_call_seconds": first_end - first_start,
+        "second_call_seconds": second_end - first_end,
+    },
+    sys.stdout,
+)
+"""
+
+
+def run_sample(api_url: str) -> dict[str, float]:
+    sample = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            sample_script,
+            api_url,
+            str(testdata_dir.joinpath("hcfa.json")),
+            json.dumps(lazy_modules),
+        ],
+        cwd=root_dir,
+        capture_output=True,
+        text=True,
+    )
+    if sample.returncode != 0:
+        raise SystemExit(f"sample failed: {sample.stderr.strip()}")
+
+    return json.loads(sample.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures how long short-lived processes spend getting mphapi ready."
+    )
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    server = serve_pricing([load_pricing_data("hcfa")])
+    api_url = server_url(server)
+
+    try:
+        samples = [run_sample(api_url) for _ in range(args.samples)]
+    finally:
+        server.shutdown()
+
+    metrics = {
+        metric: summarize([sample[metric] for sample in samples])
+        for metric in samples[0]
+    }
+
+    write_results("startup", metrics, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,477 @@
-from .claim import *  # noqa: F403, F401
-from .client import *  # noqa: F403, F401
-from .credentials import *  # noqa: F403, F401
-from .date import *  # noqa: F403, F401
-from .fields import *  # noqa: F403, F401
-from .pricing import *  # noqa: F403, F401
-from .response import *  # noqa: F403, F401
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .balancer import (  # noqa: F401
+        Backend,
+        Balancer,
+        URLSpec,
+    )
+    from .breaker import (  # noqa: F401
+        BreakerPolicy,
+        BreakerState,
+        CircuitBreaker,
+        CircuitOpen,
+    )
+    from .claim import (  # noqa: F401
+        BillTypeSequence,
+        Claim,
+        Decimal,
+        Diagnosis,
+        FormType,
+        Provider,
+        RateSheet,
+        RateSheetService,
+        Service,
+        SexType,
+        ValueCode,
+    )
+    from .client import (  # noqa: F401
+        Client,
+        Header,
+        StatusFailure,
+        decode_responses,
+        hedged_endpoints,
+        no_phase,
+        pack_batches,
+        profile_dir_env,
+        serialize_items,
+        serialize_list,
+    )
+    from .config import (  # noqa: F401
+        PriceConfig,
+    )
+    from .credentials import (  # noqa: F401
+        Credentials,
+        CredentialsHolder,
+        GoogleError,
+        GoogleException,
+        GoogleResponse,
+        GoogleResponseError,
+        RawCredentials,
+        RefreshTokenResult,
+        SignInResult,
+        StoredCredentials,
+        Token,
+        base64url_decode,
+        decode_jwt,
+        get_credentials,
+        get_credentials_path,
+        get_stored_credentials,
+        lock_credentials,
+        refresh_token,
+        sign_in,
+        write_credentials,
+    )
+    from .date import (  # noqa: F401
+        AbstractDateTime,
+        Date,
+        DateTime,
+    )
+    from .deadline import (  # noqa: F401
+        Deadline,
+        DeadlineExceeded,
+    )
+    from .executor import (  # noqa: F401
+        PricedClaim,
+        ProcessPoolPricer,
+    )
+    from .fields import (  # noqa: F401
+        camel_case_model_config,
+        deferred_model_config,
+        field_name,
+    )
+    from .fingerprint import (  # noqa: F401
+        FingerprintStore,
+        fingerprint,
+        fingerprint_config,
+    )
+    from .flatfile import (  # noqa: F401
+        CSVLayout,
+        FlatFileError,
+        read_claims_csv,
+    )
+    from .hedging import (  # noqa: F401
+        HedgePolicy,
+        Hedger,
+    )
+    from .hooks import (  # noqa: F401
+        Hook,
+        RequestEvent,
+    )
+    from .http2 import (  # noqa: F401
+        HTTP2Response,
+        HTTP2Transport,
+    )
+    from .ndjson import (  # noqa: F401
+        ClaimFile,
+        ClaimIndex,
+        build_index,
+    )
+    from .pricing import (  # noqa: F401
+        AllowedRepricingFormula,
+        ClaimEdits,
+        ClaimRepricingCode,
+        ClaimStatus,
+        HospitalType,
+        InpatientPriceDetail,
+        LineEdits,
+        LineRepricingCode,
+        MedicareSource,
+        OutpatientPriceDetail,
+        PricedService,
+        Pricing,
+        ProviderDetail,
+        RuralIndicator,
+        Status,
+        Step,
+        StepAndStatus,
+        status_edit_complete,
+        status_error,
+        status_held,
+        status_input_validated,
+        status_medicare_priced,
+        status_network_allowed_priced,
+        status_new,
+        status_out_of_network,
+        status_pending_claim_edit_review,
+        status_pending_claim_input_validation,
+        status_pending_medicare_calculation,
+        status_pending_medicare_review,
+        status_pending_network_allowed_determination,
+        status_pending_network_allowed_review,
+        status_pending_primary_allowed_determination,
+        status_pending_primary_allowed_review,
+        status_pending_provider_matching,
+        status_priced,
+        status_primary_allowed_priced,
+        status_provider_matched,
+        status_received,
+        status_request_more_info,
+        status_returned,
+    )
+    from .profiling import (  # noqa: F401
+        PhaseStats,
+        Profiler,
+    )
+    from .ratematrix import (  # noqa: F401
+        RateCode,
+        RateMatrix,
+        RateMatrixFailure,
+        estimate_rate_matrix,
+    )
+    from .response import (  # noqa: F401
+        APIError,
+        GatewayError,
+        Response,
+        ResponseError,
+        ResponseFailure,
+        Responses,
+        ResponsesSuccess,
+        ResponseSuccess,
+    )
+    from .resultlog import (  # noqa: F401
+        ResultLog,
+        ResultLogError,
+    )
+    from .retry import (  # noqa: F401
+        backend_failed,
+        backoff_seconds,
+        is_transient,
+        item_failed_with,
+        transient_status_codes,
+    )
+    from .stats import (  # noqa: F401
+        ClientStats,
+        EndpointStats,
+        LatencyHistogram,
+        StatsRecorder,
+        counter_fields,
+        endpoint_name,
+        latency_bucket_bounds,
+    )
+    from .transport import (  # noqa: F401
+        InMemoryRequest,
+        InMemoryResponse,
+        InMemoryTransport,
+        RequestsTransport,
+        Timeout,
+        Transport,
+        TransportResponse,
+    )
+    from .validation import (  # noqa: F401
+        ClaimIssue,
+        Preflight,
+        RejectedClaim,
+        preflight,
+        validate_claim,
+        validate_claims,
+    )
+    from .x12 import (  # noqa: F401
+        Delimiters,
+        Segment,
+        X12Error,
+        claim_pricing_methodologies,
+        detect_delimiters,
+        line_pricing_methodologies,
+        read_837,
+        read_segments,
+        write_repriced_837,
+        write_repriced_segments,
+    )
+
+# Submodules are only imported when one of their names is first accessed. Eagerly importing
+# everything pulls in `requests` and friends, which is a noticeable cost for short-lived
+# processes that only need a couple of models.
+_submodule_exports: dict[str, tuple[str, ...]] = {
+    "balancer": (
+        "Backend",
+        "Balancer",
+        "URLSpec",
+    ),
+    "breaker": (
+        "BreakerPolicy",
+        "BreakerState",
+        "CircuitBreaker",
+        "CircuitOpen",
+    ),
+    "claim": (
+        "FormType",
+        "BillTypeSequence",
+        "SexType",
+        "Provider",
+        "Decimal",
+        "ValueCode",
+        "Diagnosis",
+        "Service",
+        "Claim",
+        "RateSheetService",
+        "RateSheet",
+    ),
+    "client": (
+        "Client",
+        "Header",
+        "decode_responses",
+        "serialize_list",
+        "StatusFailure",
+        "pack_batches",
+        "serialize_items",
+        "hedged_endpoints",
+        "profile_dir_env",
+        "no_phase",
+    ),
+    "config": ("PriceConfig",),
+    "credentials": (
+        "RawCredentials",
+        "StoredCredentials",
+        "Credentials",
+        "CredentialsHolder",
+        "GoogleException",
+        "GoogleError",
+        "GoogleResponseError",
+        "GoogleResponse",
+        "SignInResult",
+        "RefreshTokenResult",
+        "Token",
+        "get_credentials",
+        "get_credentials_path",
+        "get_stored_credentials",
+        "lock_credentials",
+        "write_credentials",
+        "refresh_token",
+        "sign_in",
+        "decode_jwt",
+        "base64url_decode",
+    ),
+    "date": (
+        "AbstractDateTime",
+        "Date",
+        "DateTime",
+    ),
+    "deadline": (
+        "Deadline",
+        "DeadlineExceeded",
+    ),
+    "executor": (
+        "PricedClaim",
+        "ProcessPoolPricer",
+    ),
+    "fields": (
+        "camel_case_model_config",
+        "deferred_model_config",
+        "field_name",
+    ),
+    "fingerprint": (
+        "FingerprintStore",
+        "fingerprint",
+        "fingerprint_config",
+    ),
+    "flatfile": (
+        "CSVLayout",
+        "FlatFileError",
+        "read_claims_csv",
+    ),
+    "hedging": (
+        "HedgePolicy",
+        "Hedger",
+    ),
+    "hooks": (
+        "Hook",
+        "RequestEvent",
+    ),
+    "http2": (
+        "HTTP2Transport",
+        "HTTP2Response",
+    ),
+    "ndjson": (
+        "ClaimFile",
+        "ClaimIndex",
+        "build_index",
+    ),
+    "pricing": (
+        "ClaimRepricingCode",
+        "LineRepricingCode",
+        "HospitalType",
+        "RuralIndicator",
+        "MedicareSource",
+        "InpatientPriceDetail",
+        "OutpatientPriceDetail",
+        "AllowedRepricingFormula",
+        "ProviderDetail",
+        "ClaimEdits",
+        "LineEdits",
+        "PricedService",
+        "Pricing",
+        "Step",
+        "Status",
+        "StepAndStatus",
+        "ClaimStatus",
+        "status_new",
+        "status_received",
+        "status_held",
+        "status_error",
+        "status_input_validated",
+        "status_provider_matched",
+        "status_edit_complete",
+        "status_medicare_priced",
+        "status_primary_allowed_priced",
+        "status_network_allowed_priced",
+        "status_out_of_network",
+        "status_request_more_info",
+        "status_priced",
+        "status_returned",
+        "status_pending_claim_input_validation",
+        "status_pending_claim_edit_review",
+        "status_pending_provider_matching",
+        "status_pending_medicare_review",
+        "status_pending_medicare_calculation",
+        "status_pending_primary_allowed_review",
+        "status_pending_network_allowed_review",
+        "status_pending_primary_allowed_determination",
+        "status_pending_network_allowed_determination",
+    ),
+    "profiling": (
+        "PhaseStats",
+        "Profiler",
+    ),
+    "ratematrix": (
+        "RateCode",
+        "RateMatrix",
+        "RateMatrixFailure",
+        "estimate_rate_matrix",
+    ),
+    "response": (
+        "APIError",
+        "ResponseError",
+        "ResponseSuccess",
+        "ResponseFailure",
+        "GatewayError",
+        "Response",
+        "ResponsesSuccess",
+        "Responses",
+    ),
+    "resultlog": (
+        "ResultLog",
+        "ResultLogError",
+    ),
+    "retry": (
+        "backoff_seconds",
+        "is_transient",
+        "transient_status_codes",
+        "item_failed_with",
+        "backend_failed",
+    ),
+    "stats": (
+        "ClientStats",
+        "EndpointStats",
+        "LatencyHistogram",
+        "StatsRecorder",
+        "endpoint_name",
+        "latency_bucket_bounds",
+        "counter_fields",
+    ),
+    "transport": (
+        "Transport",
+        "TransportResponse",
+        "Timeout",
+        "RequestsTransport",
+        "InMemoryTransport",
+        "InMemoryRequest",
+        "InMemoryResponse",
+    ),
+    "validation": (
+        "ClaimIssue",
+        "RejectedClaim",
+        "Preflight",
+        "validate_claim",
+        "validate_claims",
+        "preflight",
+    ),
+    "x12": (
+        "read_837",
+        "read_segments",
+        "detect_delimiters",
+        "Delimiters",
+        "Segment",
+        "X12Error",
+        "write_repriced_837",
+        "write_repriced_segments",
+        "claim_pricing_methodologies",
+        "line_pricing_methodologies",
+    ),
+}
+
+_export_modules = {
+    name: module for module, names in _submodule_exports.items() for name in names
+}
+
+__all__ = list(_export_modules)
+
+# Submodules used to be attributes of the package as soon as it was imported, so `mphapi.pricing`
+# and the like still work by importing them when they're first accessed.
+_submodules = frozenset(
+    {
+        *_submodule_exports,
+        "env",
+        "files",
+        "stub",
+    }
+)
+
+
+def __getattr__(name: str) -> Any:
+    module = _export_modules.get(name)
+    if module is None:
+        if name in _submodules:
+            return importlib.import_module(f".{name}", __name__)
+
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,137 @@
+"""
+Spreads requests over several API base URLs, favoring those that are quick and not busy, and
+steering around those that are failing.
+"""
+
+import random
+import threading
+import time
+import urllib.parse
+from typing import Sequence
+
+URLSpec = str | tuple[str, float]
+"""A base URL, optionally paired with its weight (e.g. `("https://api.example", 2)`)"""
+
+
+class Backend:
+    """Backend is one of the base URLs a `Balancer` chooses between, along with its health."""
+
+    url: str
+    origin: str
+    """Scheme and host of the URL, which requests are sent to"""
+    weight: float
+    outstanding: int
+    """Number of requests currently in flight"""
+    latency: float | None
+    """Exponentially weighted average time to first byte in seconds, once known"""
+    consecutive_failures: int
+    ejected_until: float
+    """Time (from `time.monotonic()`) until which the backend isn't chosen while others are healthy"""
+
+    def __init__(self, url: str, weight: float = 1):
+        if weight <= 0:
+            raise ValueError(f"weight of {url} must be positive")
+
+        parts = urllib.parse.urlsplit(url)
+        self.url = url
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.weight = weight
+        self.outstanding = 0
+        self.latency = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return f"Backend({self.url!r}, weight={self.weight})"
+
+
+class Balancer:
+    """
+    Balancer chooses which base URL each request goes to. The score of each backend is its
+    expected wait (requests in flight, plus this one, times its average latency) divided by its
+    weight, and the lowest score wins. Backends which fail `max_failures` times in a row are
+    ejected for `eject_seconds`, unless every backend is ejected.
+    """
+
+    backends: list[Backend]
+
+    def __init__(
+        self,
+        urls: Sequence[URLSpec],
+        max_failures: int = 3,
+        eject_seconds: float = 30,
+        latency_decay: float = 0.3,
+    ):
+        if not urls:
+            raise ValueError("at least one URL is required")
+
+        self.backends = [
+            Backend(url) if isinstance(url, str) else Backend(*url) for url in urls
+        ]
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.latency_decay = latency_decay
+
+        self._lock = threading.Lock()
+
+    def choose(self, exclude: Sequence[Backend] = ()) -> Backend | None:
+        """
+        Chooses the backend for the next request, skipping those in `exclude` (e.g. ones already
+        tried). Returns None once every backend has been excluded.
+        """
+
+        with self._lock:
+            candidates = [
+                backend for backend in self.backends if backend not in exclude
+            ]
+            if not candidates:
+                return None
+
+            now = time.monotonic()
+            healthy = [
+                backend for backend in candidates if backend.ejected_until <= now
+            ]
+            if not healthy:
+                # Everything is ejected, so try whichever is due back first.
+                return min(candidates, key=lambda backend: backend.ejected_until)
+
+            known = [
+                backend.latency for backend in healthy if backend.latency is not None
+            ]
+            # Backends without a latency yet are assumed to be as quick as the quickest so they
+            # get tried.
+            default_latency = min(known, default=1.0)
+
+            def score(backend: Backend) -> tuple[float, float]:
+                latency = (
+                    default_latency if backend.latency is None else backend.latency
+                )
+                return (
+                    (backend.outstanding + 1) * latency / backend.weight,
+                    random.random(),
+                )
+
+            return min(healthy, key=score)
+
+    def start(self, backend: Backend) -> None:
+        with self._lock:
+            backend.outstanding += 1
+
+    def finish(self, backend: Backend, seconds: float, failed: bool) -> None:
+        """Records the outcome of a request started with `start`."""
+
+        with self._lock:
+            backend.outstanding -= 1
+
+            if failed:
+                backend.consecutive_failures += 1
+                if backend.consecutive_failures >= self.max_failures:
+                    backend.ejected_until = time.monotonic() + self.eject_seconds
+                return
+
+            backend.consecutive_failures = 0
+            backend.ejected_until = 0.0
+            if backend.latency is None:
+                backend.latency = seconds
+            else:
+                backend.latency += self.latency_decay * (seconds - backend.latency)
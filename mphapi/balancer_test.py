@@ -0,0 +1,103 @@
+import contextlib
+import socket
+import time
+from typing import Callable, Iterator
+
+import pytest
+
+from .balancer import Backend, Balancer
+from .claim import Claim
+from .client import Client, PriceConfig
+from .deadline import DeadlineExceeded
+from .stub import Latency, StubConfig, StubServer
+
+
+def unused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+@contextlib.contextmanager
+def silent_url() -> Iterator[str]:
+    """Yields the URL of a server which accepts connections but never responds."""
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        s.listen()
+        yield f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def test_choose():
+    balancer = Balancer([("http://a", 1), ("http://b", 3)], max_failures=2)
+    a, b = balancer.backends
+
+    # With the same latency, the heavier backend takes more outstanding requests.
+    for backend in [a, b]:
+        balancer.start(backend)
+        balancer.finish(backend, 0.1, failed=False)
+    for _ in range(3):
+        balancer.start(b)
+    assert balancer.choose() is a
+    balancer.start(a)
+    assert balancer.choose() is b
+
+    # Backends are ejected after failing too many times in a row.
+    for _ in range(2):
+        balancer.start(b)
+        balancer.finish(b, 0.1, failed=True)
+    assert balancer.choose() is a
+    assert balancer.choose(exclude=[a]) is b
+    assert balancer.choose(exclude=[a, b]) is None
+
+
+def test_failover(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with (
+        StubServer(StubConfig(gateway_error_rate=1)) as failing,
+        StubServer() as healthy,
+    ):
+        with Client(
+            "api-key", api_url=[unused_url(), failing.url, healthy.url]
+        ) as client:
+            for _ in range(10):
+                assert client.price(PriceConfig(), claim).claim_id == claim.claim_id
+                client.price_batch(PriceConfig(), claim)
+
+        # Failing URLs are ejected rather than tried on every request.
+        assert failing.request_count == 3
+        assert healthy.request_count == 20
+
+
+def test_failover_deadline(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with silent_url() as first, silent_url() as second:
+        with Client("api-key", api_url=[first, second]) as client:
+            # The first URL uses up the deadline, so the second isn't tried.
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                client.price(PriceConfig(), claim, deadline=0.3)
+            assert time.perf_counter() - start < 1
+
+
+def test_latency_aware(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with (
+        StubServer(StubConfig(latency=Latency(seconds=0.05))) as slow,
+        StubServer() as fast,
+    ):
+        with Client("api-key", api_url=[slow.url, fast.url]) as client:
+            for _ in range(20):
+                client.price(PriceConfig(), claim)
+
+        assert fast.request_count > slow.request_count
+        assert slow.request_count >= 1
+
+
+def test_backend():
+    backend = Backend("https://api.example.com/v1", 2)
+    assert backend.origin == "https://api.example.com"
+    assert backend.weight == 2
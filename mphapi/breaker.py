@@ -0,0 +1,159 @@
+"""
+Circuit breakers stop requests to an endpoint that's failing so a struggling backend isn't buried
+under retries, then let a few requests through now and then to find out when it's recovered.
+"""
+
+import collections
+import threading
+import time
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+from .fields import deferred_model_config
+from .response import APIError
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    """Requests are sent normally"""
+
+    OPEN = "open"
+    """Requests fail immediately with `CircuitOpen`"""
+
+    HALF_OPEN = "half_open"
+    """A few probe requests are sent to find out whether the endpoint has recovered"""
+
+
+class CircuitOpen(APIError):
+    """Raised instead of sending a request to an endpoint whose circuit breaker is open."""
+
+    endpoint: str
+    retry_after: float
+    """Seconds until the breaker lets probe requests through"""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(
+            f"circuit breaker for {endpoint} is open, retry in {retry_after:.1f}s"
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class BreakerPolicy(BaseModel):
+    """BreakerPolicy configures when `Client` stops sending requests to a failing endpoint"""
+
+    model_config = deferred_model_config
+
+    failure_rate: float = Field(default=0.5, gt=0, le=1)
+    """The breaker opens once this fraction of recent requests have failed"""
+
+    window: int = Field(default=50, gt=0)
+    """Number of recent requests the failure rate is taken over"""
+
+    min_requests: int = 20
+    """The breaker never opens until it's seen at least this many requests"""
+
+    open_seconds: float = 30
+    """How long the breaker stays open before letting probe requests through"""
+
+    half_open_probes: int = Field(default=3, gt=0)
+    """Number of probe requests which must succeed in a row to close the breaker"""
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker tracks the outcomes of requests to one endpoint. Call `acquire` before sending
+    a request and `record` with its outcome afterwards.
+
+    Failures are the requests a healthy backend shouldn't fail: 5xx and 429 responses, timeouts,
+    and connection errors (see `backend_failed`). Errors returned by the API for a bad request
+    show it's working, so they count as successes.
+    """
+
+    endpoint: str
+    policy: BreakerPolicy
+
+    def __init__(self, endpoint: str, policy: BreakerPolicy):
+        self.endpoint = endpoint
+        self.policy = policy
+
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._outcomes: collections.deque[bool] = collections.deque(
+            maxlen=policy.window
+        )
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._update()
+            return self._state
+
+    def _update(self) -> None:
+        if (
+            self._state == BreakerState.OPEN
+            and time.monotonic() - self._opened_at >= self.policy.open_seconds
+        ):
+            self._state = BreakerState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _open(self) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+
+    def acquire(self) -> None:
+        """Raises `CircuitOpen` if a request can't be sent right now."""
+
+        with self._lock:
+            self._update()
+
+            if self._state == BreakerState.OPEN:
+                raise CircuitOpen(
+                    self.endpoint,
+                    self._opened_at + self.policy.open_seconds - time.monotonic(),
+                )
+
+            if self._state == BreakerState.HALF_OPEN:
+                if self._probes_in_flight >= self.policy.half_open_probes:
+                    raise CircuitOpen(self.endpoint, 0)
+
+                self._probes_in_flight += 1
+
+    def record(self, failed: bool) -> None:
+        """Records the outcome of a request allowed by `acquire`."""
+
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed:
+                    self._open()
+                    return
+
+                self._probe_successes += 1
+                if self._probe_successes >= self.policy.half_open_probes:
+                    self._state = BreakerState.CLOSED
+                    self._outcomes.clear()
+                    self._failures = 0
+                return
+
+            if self._state == BreakerState.OPEN:
+                # A request which started before the breaker opened.
+                return
+
+            if len(self._outcomes) == self._outcomes.maxlen:
+                self._failures -= self._outcomes[0]
+            self._outcomes.append(failed)
+            self._failures += failed
+
+            count = len(self._outcomes)
+            if (
+                count >= self.policy.min_requests
+                and self._failures >= self.policy.failure_rate * count
+            ):
+                self._open()
@@ -0,0 +1,109 @@
+import time
+from typing import Callable
+
+import pytest
+import requests
+
+from .breaker import BreakerPolicy, BreakerState, CircuitBreaker, CircuitOpen
+from .claim import Claim
+from .client import Client, PriceConfig
+from .deadline import DeadlineExceeded
+from .response import GatewayError
+from .retry import backend_failed
+from .stub import StubConfig, StubServer, failure
+from .transport import InMemoryTransport
+
+
+def test_breaker_states():
+    breaker = CircuitBreaker(
+        "endpoint",
+        BreakerPolicy(failure_rate=0.5, window=10, min_requests=4, open_seconds=0.05),
+    )
+
+    for failed in [False, True, False, True]:
+        breaker.acquire()
+        breaker.record(failed)
+    assert breaker.state == BreakerState.OPEN
+
+    with pytest.raises(CircuitOpen):
+        breaker.acquire()
+
+    # Once open long enough, a limited number of probes are let through.
+    time.sleep(0.05)
+    assert breaker.state == BreakerState.HALF_OPEN
+    for _ in range(3):
+        breaker.acquire()
+    with pytest.raises(CircuitOpen):
+        breaker.acquire()
+
+    # A failed probe opens the breaker again.
+    breaker.record(True)
+    assert breaker.state == BreakerState.OPEN
+
+    time.sleep(0.05)
+    for _ in range(3):
+        breaker.acquire()
+        breaker.record(False)
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_client_breaker(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+    policy = BreakerPolicy(min_requests=5, open_seconds=0.1, half_open_probes=1)
+
+    with StubServer(StubConfig(gateway_error_rate=1)) as server:
+        with Client("api-key", api_url=server.url, circuit_breaker=policy) as client:
+            for _ in range(5):
+                with pytest.raises(GatewayError):
+                    client.price(PriceConfig(), claim)
+
+            # Requests fail fast without reaching the server while the breaker is open.
+            with pytest.raises(CircuitOpen):
+                client.price(PriceConfig(), claim)
+            assert server.request_count == 5
+
+            stats = client.stats().endpoints["/v1/medicare/price/claim"]
+            assert stats.circuit_state == BreakerState.OPEN
+            assert stats.short_circuited == 1
+            assert stats.requests == 5
+            assert 'state="open"} 1' in client.stats().to_prometheus()
+
+            # Once the service recovers, a probe succeeds and the breaker closes.
+            server.config.gateway_error_rate = 0
+            time.sleep(0.1)
+            client.price(PriceConfig(), claim)
+
+            stats = client.stats().endpoints["/v1/medicare/price/claim"]
+            assert stats.circuit_state == BreakerState.CLOSED
+
+
+def test_breaker_counts_5xx_bodies(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+    policy = BreakerPolicy(min_requests=5, open_seconds=60)
+    responses = [
+        (502, b"<html><body>502 Bad Gateway</body></html>"),
+        failure(500, "Internal Server Error", "pricing failed"),
+    ]
+
+    for status_code, body in responses:
+        transport = InMemoryTransport(lambda request: (status_code, body))
+        with Client("api-key", transport=transport, circuit_breaker=policy) as client:
+            # However the body fails to decode, a 5xx counts against the backend.
+            for _ in range(5):
+                with pytest.raises(Exception) as error:
+                    client.price(PriceConfig(), claim)
+                assert not isinstance(error.value, CircuitOpen)
+
+            with pytest.raises(CircuitOpen):
+                client.price(PriceConfig(), claim)
+            assert len(transport.requests) == 5
+
+
+def test_backend_failed():
+    assert backend_failed(503, None)
+    assert backend_failed(429, None)
+    assert not backend_failed(400, None)
+    assert not backend_failed(200, None)
+    assert backend_failed(None, requests.ReadTimeout())
+    assert backend_failed(None, DeadlineExceeded("deadline exceeded"))
+    assert not backend_failed(None, ValueError())
@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field, GetCoreSchemaHandler
 from pydantic_core import CoreSchema, core_schema
 
 from .date import Date
-from .fields import camel_case_model_config, field_name
+from .fields import camel_case_model_config, deferred_model_config, field_name
 
 
 class FormType(str, Enum):
@@ -337,6 +337,8 @@ class RateSheetService(BaseModel):
 
 
 class RateSheet(BaseModel):
+    model_config = deferred_model_config
+
     npi: str
     """National Provider Identifier of the provider (from NM109, required)"""
 
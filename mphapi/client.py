@@ -1,97 +1,189 @@
+import contextlib
+import os
+import threading
+import time
 import urllib.parse
-from typing import Annotated, Any, Mapping, Optional, Sequence
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Self,
+    Sequence,
+    cast,
+)
 
 import requests
-from pydantic import BaseModel, StrictBool, TypeAdapter
+from pydantic import BaseModel
 
+from . import validation
+from .balancer import Backend, Balancer, URLSpec
+from .breaker import BreakerPolicy, CircuitBreaker, CircuitOpen
 from .claim import Claim, RateSheet
-from .credentials import Credentials, get_credentials
-from .fields import camel_case_model_config, field_name
-from .response import Response, Responses
+from .config import PriceConfig
+from .credentials import Credentials, CredentialsHolder, get_credentials
+from .deadline import Deadline, DeadlineExceeded
+from .hedging import HedgePolicy, Hedger
+from .hooks import Hook, RequestEvent
+from .pricing import ClaimStatus, Pricing
+from .response import Response, Responses, ResponsesSuccess
+from .retry import (
+    backend_failed,
+    backoff_seconds,
+    is_transient,
+    transient_status_codes,
+)
+from .stats import ClientStats, EndpointStats, StatsRecorder, endpoint_name
+from .transport import (
+    RequestsTransport,
+    Transport,
+    TransportResponse,
+    take_connect_seconds,
+)
+
+if TYPE_CHECKING:
+    from .fingerprint import FingerprintStore
+    from .profiling import Profiler
 
 Header = Mapping[str, str | bytes | None]
 
 
-class PriceConfig(BaseModel):
-    """PriceConfig is used to configure the behavior of the pricing API"""
+class StatusFailure(NamedTuple):
+    """StatusFailure is a claim status update which failed in `Client.insert_claim_statuses`."""
 
-    model_config = camel_case_model_config
+    claim_id: str
+    error: Exception
 
-    contract_ruleset: Optional[str] = None
-    """set to the name of the ruleset to use for contract pricing"""
 
-    price_zero_billed: Optional[StrictBool] = False
-    """set to true to price claims with zero billed amounts (default is false)"""
+json_headers: Header = {"Content-Type": "application/json"}
 
-    is_commercial: Optional[StrictBool] = False
-    """set to true to crosswalk codes from commercial codes Medicare won't pay for to substitute codes they do pay for (e.g. 99201 to G0463)"""
+profile_dir_env = "MPH_PROFILE_DIR"
+"""Set this environment variable to a directory to profile every `Client` without code changes"""
 
-    disable_cost_based_reimbursement: Optional[StrictBool] = False
-    """set to true to disable cost-based reimbursement for line items paid as a percent of cost"""
+no_phase = contextlib.nullcontext()
+"""Used in place of a phase when not profiling, so marking phases costs next to nothing"""
 
-    use_commercial_synthetic_for_not_allowed: Optional[StrictBool] = False
-    """set to true to use a synthetic Medicare price for line-items that are not allowed by Medicare"""
+hedged_endpoints = frozenset(
+    {
+        "/v1/medicare/price/claim",
+        "/v1/medicare/estimate/claims",
+        "/v1/medicare/estimate/rate-sheet",
+    }
+)
+"""Endpoints whose requests are hedged when `Client` has a `HedgePolicy`"""
 
-    use_drg_from_grouper: Annotated[
-        Optional[StrictBool], field_name("useDRGFromGrouper")
-    ] = False
-    """set to true to always use the DRG from the inpatient grouper"""
 
-    use_best_drg_price: Annotated[Optional[StrictBool], field_name("useBestDRGPrice")] = False
-    """set to true to use the best DRG price between the price on the claim and the price from the grouper"""
+def serialize_items(body: Sequence[BaseModel]) -> list[bytes]:
+    """Serializes each model the way it's sent to the API."""
 
-    override_threshold: Optional[float] = 0
-    """set to a value greater than 0 to allow the pricer flexibility to override NCCI edits and other overridable errors and return a price"""
+    return [
+        item.model_dump_json(by_alias=True, exclude_none=True).encode() for item in body
+    ]
 
-    include_edits: Optional[StrictBool] = False
-    """set to true to include edit details in the response"""
 
-    continue_on_edit_fail: Optional[StrictBool] = False
-    """set to true to continue to price the claim even if there are edit failures"""
+def serialize_list(body: Sequence[BaseModel]) -> bytes:
+    """Serializes models into a JSON array the same way they're serialized on their own."""
 
-    continue_on_provider_match_fail: Optional[StrictBool] = False
-    """set to true to continue with a average provider for the geographic area if the provider cannot be matched"""
+    return b"[%s]" % b",".join(serialize_items(body))
 
-    disable_machine_learning_estimates: Optional[StrictBool] = False
-    """set to true to disable machine learning estimates (applies to estimates only)"""
 
-    assume_impossible_anesthesia_units_are_minutes: Optional[StrictBool] = False
-    """set to true to divide impossible anesthesia units by 15 (max of 96 anesthesia units per day) (default is false)"""
+def pack_batches(sizes: Sequence[int], max_bytes: int) -> list[tuple[int, int]]:
+    """
+    Groups consecutive items into batches whose JSON array is at most `max_bytes` long, given the
+    serialized size of each item. Returns the [start, end) range of each batch. An item too big to
+    fit in any batch is put in a batch on its own.
+    """
 
-    fallback_to_max_anesthesia_units_per_day: Optional[StrictBool] = False
-    """set to true to fallback to the maximum anesthesia units per day (default is false which will error if there are more than 96 anesthesia units per day)"""
+    batches: list[tuple[int, int]] = []
+    start = 0
+    # The array's brackets.
+    batch_bytes = 2
 
-    allow_partial_results: Optional[StrictBool] = False
-    """set to true to return partially repriced claims. This can be useful to get pricing on non-erroring line items, but should be used with caution"""
+    for end, size in enumerate(sizes):
+        # Every item after the first is preceded by a comma.
+        item_bytes = size if end == start else size + 1
+        if end > start and batch_bytes + item_bytes > max_bytes:
+            batches.append((start, end))
+            start = end
+            batch_bytes = 2 + size
+        else:
+            batch_bytes += item_bytes
+
+    if start < len(sizes):
+        batches.append((start, len(sizes)))
+
+    return batches
+
+
+def decode_responses[Model: BaseModel](
+    response_model: type[Model], content: bytes
+) -> tuple[list[Model], int]:
+    """Decodes a batch response, returning the results and how many of them failed."""
 
+    responses = Responses[response_model].model_validate_json(content, strict=True)
+    results = responses.results()
 
-# It may be a bit jarring to see these imports not at the top of the file. This is
-# intentional as `.pricing` depends on `PriceConfig`.
-from .pricing import ClaimStatus  # noqa: E402
-from .pricing import Pricing  # noqa: E402
+    return results, cast(ResponsesSuccess[Model], responses.root).error_count
 
 
 class Client:
     api_url: str
     headers: Header
+    hooks: list[Hook]
+    """Called with timings after every request"""
+    profiler: "Profiler | None"
+    """Set while profiling"""
+    connect_timeout: float | None
+    """Seconds to wait for a connection to open before giving up"""
+    read_timeout: float | None
+    """Seconds to wait for the server to send data before giving up"""
+    transport: Transport
+    """Sends the client's requests"""
+    max_request_bytes: int | None
+    """
+    Batch requests larger than this are split into several requests, each under this size (unless
+    a single item is larger). When unset, each batch is sent as a single request.
+    """
 
     def __init__(
         self,
         apiKey: str,
         isTest: bool = False,
-        api_url: str | None = None,
+        api_url: str | Sequence[URLSpec] | None = None,
         app_url: str | None = None,
         app_api_key: str | None = None,
         app_referer: str | None = None,
         app_credentials: Credentials | None = None,
+        refresh_credentials_in_background: bool = False,
+        hooks: Sequence[Hook] = (),
+        profiler: "Profiler | None" = None,
+        max_connections: int = 10,
+        max_request_bytes: int | None = None,
+        hedging: HedgePolicy | None = None,
+        connect_timeout: float | None = 10,
+        read_timeout: float | None = 300,
+        circuit_breaker: BreakerPolicy | None = None,
+        http2: bool = False,
+        transport: Transport | None = None,
     ):
+        self._balancer = None
         if api_url is None:
             if isTest:
                 self.api_url = "https://api-test.myprice.health"
             else:
                 self.api_url = "https://api.myprice.health"
-        else:
+        elif isinstance(api_url, str):
             self.api_url = api_url
+        else:
+            # Requests are addressed to the first URL and redirected by the balancer.
+            self._balancer = Balancer(api_url)
+            self.api_url = self._balancer.backends[0].url
 
         if app_url is None:
             if isTest:
@@ -109,42 +201,401 @@ class Client:
             )
 
         self.app_api_key = app_api_key
-        self.app_credentials = app_credentials
         self.app_referer = app_referer
 
         if (
-            self.app_credentials is None
+            app_credentials is None
             and app_api_key is not None
             and app_referer is not None
         ):
-            self.app_credentials = get_credentials(app_api_key, app_referer)
+            app_credentials = get_credentials(app_api_key, app_referer)
+
+        # Shared by every thread using this client so credentials are only refreshed once.
+        # Refreshing in the background is opt-in since it keeps calling the API for as long as the
+        # client is open.
+        self._refresh_credentials_in_background = refresh_credentials_in_background
+        self._app_credentials_holder: CredentialsHolder | None = None
+        self.app_credentials = app_credentials
 
         self.headers = {"x-api-key": apiKey}
+        self.hooks = list(hooks)
+        self.max_request_bytes = max_request_bytes
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._hedger = None if hedging is None else Hedger(hedging)
+        self._breaker_policy = circuit_breaker
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self._stats = StatsRecorder()
+
+        # The default transports pool connections between requests rather than opening one per
+        # request. A transport passed in is left open for its owner to close.
+        self._owns_transport = transport is None
+        if transport is None and http2:
+            from .http2 import HTTP2Transport
+
+            transport = HTTP2Transport(max_connections)
+        elif transport is None:
+            transport = RequestsTransport(max_connections)
+        self.transport = transport
+
+        # Profiling can be turned on for a run through the environment, without code changes.
+        self.profiler = profiler
+        self._owns_profiler = False
+        profile_dir = os.getenv(profile_dir_env)
+        if self.profiler is None and profile_dir:
+            from .profiling import acquire_shared_profiler
+
+            self.profiler = acquire_shared_profiler(profile_dir)
+            self._owns_profiler = True
+
+    @property
+    def app_credentials(self) -> Credentials | None:
+        if self._app_credentials_holder is None:
+            return None
+
+        return self._app_credentials_holder.credentials
+
+    @app_credentials.setter
+    def app_credentials(self, credentials: Credentials | None) -> None:
+        if self._app_credentials_holder is not None:
+            self._app_credentials_holder.close()
+
+        self._app_credentials_holder = (
+            None
+            if credentials is None
+            else CredentialsHolder(
+                credentials,
+                background_refresh=self._refresh_credentials_in_background,
+            )
+        )
+
+    def close(self) -> None:
+        """Closes pooled connections and stops any background work started by the client."""
+
+        if self._owns_transport:
+            self.transport.close()
+
+        if self._hedger is not None:
+            self._hedger.close()
+
+        if self._app_credentials_holder is not None:
+            self._app_credentials_holder.close()
+
+        if self._owns_profiler:
+            self._owns_profiler = False
+
+            from .profiling import release_shared_profiler
+
+            release_shared_profiler()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def stats(self) -> ClientStats:
+        """
+        Returns a snapshot of the metrics collected for every request made by this client. Use
+        `ClientStats.to_prometheus` to export them to Prometheus.
+        """
+
+        stats = self._stats.snapshot()
+
+        with self._breakers_lock:
+            breakers = list(self._breakers.items())
+
+        for endpoint, breaker in breakers:
+            endpoint_stats = stats.endpoints.get(endpoint) or EndpointStats()
+            stats.endpoints[endpoint] = endpoint_stats.model_copy(
+                update={"circuit_state": breaker.state}
+            )
+
+        return stats
+
+    def reset_stats(self) -> None:
+        self._stats.reset()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """
+        Attributes the time and allocations within the block to the named phase when profiling
+        (e.g. `with client.phase("claim building"):`). Does nothing otherwise.
+        """
+
+        if self.profiler is None:
+            return no_phase
+
+        return self.profiler.phase(name)
+
+    @contextlib.contextmanager
+    def profile(
+        self, output_dir: str | os.PathLike[str], name: str = "job"
+    ) -> Iterator["Profiler"]:
+        """
+        Profiles the requests made within the block, writing the reports to a new directory under
+        `output_dir`. See `Profiler`.
+        """
+
+        from .profiling import Profiler
+
+        previous = self.profiler
+        profiler = Profiler(output_dir, name)
+        self.profiler = profiler
+
+        try:
+            with profiler:
+                yield profiler
+        finally:
+            self.profiler = previous
+
+    def add_hook(self, hook: Hook) -> None:
+        """Registers a hook to be called with timings after every request. See `RequestEvent`."""
+
+        self.hooks.append(hook)
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker | None:
+        if self._breaker_policy is None:
+            return None
+
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    endpoint, self._breaker_policy
+                )
+
+        return breaker
 
     def _get_id_token(self) -> str:
-        if self.app_credentials is None:
+        if self._app_credentials_holder is None:
             raise Exception("App credentials must be set to run this!")
 
-        refreshed = self.app_credentials.refresh_if_needed()
-        if refreshed is not None:
-            self.app_credentials = refreshed
+        return self._app_credentials_holder.id_token()
+
+    def _timeouts(self, deadline: Deadline | None) -> tuple[float | None, float | None]:
+        """
+        Returns the connect and read timeouts of a request. Raises `DeadlineExceeded` if the
+        deadline has passed, as there's no time left to send one.
+        """
 
-        return self.app_credentials.id_token
+        connect_timeout = self.connect_timeout
+        read_timeout = self.read_timeout
+        if deadline is not None:
+            # Requests never wait past the deadline, although a response which keeps trickling in
+            # can still take longer since the read timeout applies to each read.
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                raise DeadlineExceeded("deadline exceeded")
+            connect_timeout = min(connect_timeout or remaining, remaining)
+            read_timeout = min(read_timeout or remaining, remaining)
+
+        return connect_timeout, read_timeout
 
     def _do_request(
         self,
         url: str,
-        json: Any | None,
+        content: bytes,
         method: str = "POST",
         headers: Header = {},
-    ) -> requests.Response:
-        return requests.request(
-            method,
-            url,
-            json=json,
-            headers={**self.headers, **headers},
+        deadline: Deadline | None = None,
+    ) -> TransportResponse:
+        # Headers set to None are left out, the way requests treats them.
+        headers = {
+            name: value.decode() if isinstance(value, bytes) else value
+            for name, value in {**self.headers, **json_headers, **headers}.items()
+            if value is not None
+        }
+
+        if self._balancer is not None:
+            origin = self._balancer.backends[0].origin
+            if url.startswith(origin + "/"):
+                return self._do_balanced_request(
+                    url[len(origin) :], content, method, headers, deadline
+                )
+
+        return self.transport.request(
+            method, url, content, headers, self._timeouts(deadline)
         )
 
+    def _do_balanced_request(
+        self,
+        path: str,
+        content: bytes,
+        method: str,
+        headers: Mapping[str, str],
+        deadline: Deadline | None,
+    ) -> TransportResponse:
+        """
+        Sends a request to the API URL chosen by the balancer. Pricing requests are idempotent, so
+        when one fails transiently it's sent to the next best URL until each has been tried.
+        """
+
+        balancer = self._balancer
+        assert balancer is not None
+
+        tried: list[Backend] = []
+        while (backend := balancer.choose(tried)) is not None:
+            tried.append(backend)
+
+            balancer.start(backend)
+            start = time.perf_counter()
+            try:
+                response = self.transport.request(
+                    method,
+                    backend.origin + path,
+                    content,
+                    headers,
+                    self._timeouts(deadline),
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                balancer.finish(backend, time.perf_counter() - start, failed=True)
+                if self._out_of_backends(tried, deadline):
+                    raise
+                continue
+
+            failed = response.status_code in transient_status_codes
+            balancer.finish(backend, time.perf_counter() - start, failed)
+            if failed and not self._out_of_backends(tried, deadline):
+                response.close()
+                continue
+
+            return response
+
+        raise AssertionError("the balancer has no URLs")
+
+    def _out_of_backends(self, tried: list[Backend], deadline: Deadline | None) -> bool:
+        """
+        Returns whether a failed attempt is the last, as every URL has been tried or the deadline
+        passed during it.
+        """
+
+        assert self._balancer is not None
+
+        return len(tried) == len(self._balancer.backends) or (
+            deadline is not None and deadline.expired
+        )
+
+    def _send[Result](
+        self,
+        url: str,
+        content: bytes,
+        decode: Callable[[bytes], tuple[Result, int]],
+        claim_count: int,
+        serialize_seconds: float,
+        method: str = "POST",
+        headers: Header = {},
+        deadline: Deadline | None = None,
+    ) -> Result:
+        """
+        Sends an already serialized request body and decodes the response, recording stats and
+        reporting how long each phase took to any hooks. `decode` returns the result along with
+        the number of items in it that failed.
+
+        Raises `DeadlineExceeded` without sending anything if the deadline has already passed, and
+        `CircuitOpen` if the endpoint's circuit breaker is open.
+        """
+
+        if deadline is not None:
+            deadline.check()
+
+        endpoint = endpoint_name(urllib.parse.urlsplit(url).path)
+        hedger = self._hedger if endpoint in hedged_endpoints else None
+
+        breaker = self._breaker(endpoint)
+        if breaker is not None:
+            try:
+                breaker.acquire()
+            except CircuitOpen:
+                self._stats.record_short_circuit(endpoint)
+                raise
+
+        take_connect_seconds()
+        start = time.perf_counter()
+        headers_received = downloaded = decoded = None
+        response_bytes = 0
+        item_errors = 0
+        status_code = None
+        error = None
+        hedged = False
+
+        def fetch() -> tuple[TransportResponse, float, bytes]:
+            response = self._do_request(url, content, method, headers, deadline)
+            return response, time.perf_counter(), response.content
+
+        try:
+            with self.phase("network"):
+                if hedger is None:
+                    response = self._do_request(url, content, method, headers, deadline)
+                    headers_received = time.perf_counter()
+                    status_code = response.status_code
+
+                    body = response.content
+                else:
+                    (response, headers_received, body), hedged = hedger.run(
+                        endpoint,
+                        fetch,
+                        lambda fetched: fetched[0].status_code
+                        not in transient_status_codes,
+                    )
+                    status_code = response.status_code
+
+                downloaded = time.perf_counter()
+                response_bytes = len(body)
+
+            with self.phase("decode"):
+                result, item_errors = decode(body)
+                decoded = time.perf_counter()
+
+            return result
+        except (requests.Timeout, requests.ConnectionError) as e:
+            # Timeouts shortened to end at the deadline are reported as the deadline passing. A
+            # timeout while the body is streamed in is raised as a ConnectionError by requests.
+            if deadline is not None and deadline.expired:
+                error = DeadlineExceeded("deadline exceeded")
+                raise error from e
+
+            error = e
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            end = time.perf_counter()
+            connect_seconds = take_connect_seconds()
+
+            event = RequestEvent(
+                method=method,
+                url=url,
+                endpoint=endpoint,
+                claim_count=claim_count,
+                request_bytes=len(content),
+                response_bytes=response_bytes,
+                status_code=status_code,
+                serialize_seconds=serialize_seconds,
+                connect_seconds=connect_seconds,
+                ttfb_seconds=(headers_received or end) - start - connect_seconds,
+                download_seconds=(
+                    0
+                    if headers_received is None
+                    else (downloaded or end) - headers_received
+                ),
+                decode_seconds=(
+                    0 if downloaded is None else (decoded or end) - downloaded
+                ),
+                total_seconds=end - start + serialize_seconds,
+                error=error,
+                hedged=hedged,
+            )
+
+            self._stats.record(event, item_errors)
+
+            if breaker is not None:
+                breaker.record(backend_failed(status_code, error))
+
+            for hook in self.hooks:
+                hook(event)
+
     def _receive_response[Model: BaseModel](
         self,
         url: str,
@@ -152,6 +603,7 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> Model:
         """
         Raises:
@@ -161,17 +613,25 @@ class Client:
                 The error returned when the api returns an error.
         """
 
-        response = self._do_request(
+        start = time.perf_counter()
+        with self.phase("serialization"):
+            content = body.model_dump_json(by_alias=True, exclude_none=True).encode()
+        serialize_seconds = time.perf_counter() - start
+
+        return self._send(
             url,
-            body.model_dump(mode="json", by_alias=True, exclude_none=True),
+            content,
+            lambda content: (
+                Response[response_model]
+                .model_validate_json(content, strict=True)
+                .result(),
+                0,
+            ),
+            1,
+            serialize_seconds,
             method,
             headers,
-        )
-
-        return (
-            Response[response_model]
-            .model_validate_json(response.content, strict=True)
-            .result()
+            deadline,
         )
 
     def _receive_api_response[Model: BaseModel](
@@ -181,6 +641,7 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> Model:
         return self._receive_response(
             urllib.parse.urljoin(self.api_url, url),
@@ -188,6 +649,7 @@ class Client:
             response_model,
             method,
             headers,
+            deadline,
         )
 
     def _receive_app_response[Model: BaseModel](
@@ -197,6 +659,7 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> Model:
         id_token = self._get_id_token()
 
@@ -207,6 +670,7 @@ class Client:
             response_model,
             method,
             {"Authorization": f"Bearer {id_token}", **headers},
+            deadline,
         )
 
     def _receive_responses[Model: BaseModel](
@@ -216,8 +680,12 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> list[Model]:
         """
+        Sends the items in as few requests as `max_request_bytes` allows, returning the results in
+        the same order as `body`.
+
         Raises:
             ValueError
                 When response cannot be decoded.
@@ -225,20 +693,40 @@ class Client:
                 The error returned when the api returns an error.
         """
 
-        response = self._do_request(
-            url,
-            TypeAdapter(type(body)).dump_python(
-                body, mode="json", by_alias=True, exclude_none=True
-            ),
-            method,
-            headers,
-        )
+        start = time.perf_counter()
+        with self.phase("serialization"):
+            items = serialize_items(body)
+        serialize_seconds = time.perf_counter() - start
 
-        return (
-            Responses[response_model]
-            .model_validate_json(response.content, strict=True)
-            .results()
-        )
+        if self.max_request_bytes is None:
+            batches = [(0, len(items))]
+        else:
+            batches = pack_batches(
+                [len(item) for item in items], self.max_request_bytes
+            )
+
+        total_bytes = sum(len(item) for item in items) or 1
+        results: list[Model] = []
+
+        for batch_start, batch_end in batches:
+            batch = items[batch_start:batch_end]
+            content = b"[%s]" % b",".join(batch)
+
+            results.extend(
+                self._send(
+                    url,
+                    content,
+                    lambda content: decode_responses(response_model, content),
+                    len(batch),
+                    # Serialization time is shared out between requests by size.
+                    serialize_seconds * sum(len(item) for item in batch) / total_bytes,
+                    method,
+                    headers,
+                    deadline,
+                )
+            )
+
+        return results
 
     def _receive_api_responses[Model: BaseModel](
         self,
@@ -247,6 +735,7 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> list[Model]:
         return self._receive_responses(
             urllib.parse.urljoin(self.api_url, url),
@@ -254,6 +743,7 @@ class Client:
             response_model,
             method,
             headers,
+            deadline,
         )
 
     def _receive_app_responses[Model: BaseModel](
@@ -263,6 +753,7 @@ class Client:
         response_model: type[Model],
         method: str = "POST",
         headers: Header = {},
+        deadline: Deadline | None = None,
     ) -> list[Model]:
         id_token = self._get_id_token()
 
@@ -273,10 +764,15 @@ class Client:
             response_model,
             method,
             {"Authorization": f"Bearer {id_token}", **headers},
+            deadline,
         )
 
-    def estimate_rate_sheet(self, *inputs: RateSheet) -> list[Pricing]:
+    def estimate_rate_sheet(
+        self, *inputs: RateSheet, deadline: Deadline | float | None = None
+    ) -> list[Pricing]:
         """
+        `deadline` works as in `price_batch`.
+
         Raises:
             ValueError
                 When response cannot be decoded.
@@ -288,10 +784,20 @@ class Client:
             "/v1/medicare/estimate/rate-sheet",
             inputs,
             Pricing,
+            deadline=Deadline.of(deadline),
         )
 
-    def estimate_claims(self, config: PriceConfig, *inputs: Claim) -> list[Pricing]:
+    def estimate_claims(
+        self,
+        config: PriceConfig,
+        *inputs: Claim,
+        item_retries: int = 0,
+        retry_item: Callable[[Pricing], bool] | None = None,
+        deadline: Deadline | float | None = None,
+    ) -> list[Pricing]:
         """
+        `item_retries`, `retry_item`, and `deadline` work as in `price_batch`.
+
         Raises:
             ValueError
                 When response cannot be decoded.
@@ -299,15 +805,29 @@ class Client:
                 The error returned when the api returns an error.
         """
 
-        return self._receive_api_responses(
-            "/v1/medicare/estimate/claims",
-            inputs,
-            Pricing,
-            headers=self._get_price_headers(config),
+        def send(claims: Sequence[Claim]) -> list[Pricing]:
+            return self._receive_api_responses(
+                "/v1/medicare/estimate/claims",
+                claims,
+                Pricing,
+                headers=self._get_price_headers(config),
+                deadline=call_deadline,
+            )
+
+        call_deadline = Deadline.of(deadline)
+        return self._retry_failed_items(
+            send, inputs, item_retries, retry_item, call_deadline
         )
 
-    def price(self, config: PriceConfig, input: Claim) -> Pricing:
+    def price(
+        self,
+        config: PriceConfig,
+        input: Claim,
+        deadline: Deadline | float | None = None,
+    ) -> Pricing:
         """
+        `deadline` works as in `price_batch`.
+
         Raises:
             ValueError
                 When response cannot be decoded.
@@ -320,24 +840,151 @@ class Client:
             input,
             Pricing,
             headers=self._get_price_headers(config),
+            deadline=Deadline.of(deadline),
         )
 
-    def price_batch(self, config: PriceConfig, *input: Claim) -> list[Pricing]:
+    def price_batch(
+        self,
+        config: PriceConfig,
+        *input: Claim,
+        preflight: bool = False,
+        store: "FingerprintStore | None" = None,
+        item_retries: int = 0,
+        retry_item: Callable[[Pricing], bool] | None = None,
+        deadline: Deadline | float | None = None,
+    ) -> list[Pricing]:
         """
+        When `preflight` is set, claims are first checked locally with `validate_claim` and those
+        the API would certainly reject aren't sent. They're returned in place with an `IFO` code
+        and an `edit_error` listing the problems, just as the API would return them.
+
+        When a `store` is given, only claims which are new or have changed since they were last
+        priced with the same configuration are sent, and stored results are returned for the rest.
+
+        With `item_retries`, claims whose results `retry_item` returns true for are sent again in
+        smaller batches, up to `item_retries` more times, and their results put in place of the
+        failures. The API doesn't say which item errors are transient, so without `retry_item` no
+        claim is retried; `item_failed_with` makes one which retries errors with given titles.
+
+        `deadline` is a `Deadline` or a number of seconds from now by which the whole call must
+        finish, including every request it's split into and every retry. No request is started
+        after it's passed, and each request's timeouts are cut short to end by it. Retries simply
+        stop at the deadline, leaving the failures in place.
+
         Raises:
             ValueError
                 When response cannot be decoded.
             mphapi.APIError
                 The error returned when the api returns an error.
+            mphapi.DeadlineExceeded
+                When the deadline passes before every claim was sent.
         """
 
-        return self._receive_api_responses(
-            "/v1/medicare/price/claims",
-            input,
-            Pricing,
-            headers=self._get_price_headers(config),
+        call_deadline = Deadline.of(deadline)
+
+        if not preflight and store is None:
+            return self._price_claims(
+                config, input, item_retries, retry_item, call_deadline
+            )
+
+        claims: Sequence[Claim] = input
+        checked = None
+        if preflight:
+            with self.phase("preflight"):
+                checked = validation.preflight(input)
+            claims = checked.valid
+
+        if store is not None:
+            results = store.price(
+                config,
+                claims,
+                lambda changed: self._price_claims(
+                    config, changed, item_retries, retry_item, call_deadline
+                ),
+            )
+        elif claims:
+            results = self._price_claims(
+                config, claims, item_retries, retry_item, call_deadline
+            )
+        else:
+            results = []
+
+        return results if checked is None else checked.merge(results)
+
+    def _price_claims(
+        self,
+        config: PriceConfig,
+        claims: Sequence[Claim],
+        item_retries: int = 0,
+        retry_item: Callable[[Pricing], bool] | None = None,
+        deadline: Deadline | None = None,
+    ) -> list[Pricing]:
+        def send(claims: Sequence[Claim]) -> list[Pricing]:
+            return self._receive_api_responses(
+                "/v1/medicare/price/claims",
+                claims,
+                Pricing,
+                headers=self._get_price_headers(config),
+                deadline=deadline,
+            )
+
+        return self._retry_failed_items(
+            send, claims, item_retries, retry_item, deadline
         )
 
+    def _retry_failed_items(
+        self,
+        send: Callable[[Sequence[Claim]], list[Pricing]],
+        claims: Sequence[Claim],
+        retries: int,
+        retry_item: Callable[[Pricing], bool] | None,
+        deadline: Deadline | None = None,
+    ) -> list[Pricing]:
+        """
+        Sends claims, then resends only those whose results `retry_item` selects. Each round splits them into
+        batches half the size of the last round's so one slow or failing claim affects fewer others.
+        Retrying stops once the deadline has passed.
+        """
+
+        results = send(claims)
+        if retry_item is None:
+            return results
+
+        batch_size = len(claims)
+
+        for attempt in range(retries):
+            failed = [
+                position
+                for position, result in enumerate(results)
+                if retry_item(result)
+            ]
+            if not failed:
+                break
+
+            delay = backoff_seconds(attempt)
+            if deadline is not None and deadline.remaining() <= delay:
+                break
+
+            time.sleep(delay)
+            batch_size = max(1, batch_size // 2)
+
+            for i in range(0, len(failed), batch_size):
+                positions = failed[i : i + batch_size]
+                try:
+                    retried = send([claims[position] for position in positions])
+                except DeadlineExceeded:
+                    return results
+                except Exception as e:
+                    # The previous failures are kept and retried in the next round.
+                    if is_transient(e):
+                        continue
+                    raise
+
+                for position, result in zip(positions, retried):
+                    results[position] = result
+
+        return results
+
     def _get_price_headers(self, config: PriceConfig) -> Header:
         headers: Header = {}
         if config.price_zero_billed:
@@ -375,9 +1022,90 @@ class Client:
 
         return headers
 
-    def insert_claim_status(self, claim_id: str, claim_status: ClaimStatus) -> None:
+    def insert_claim_status(
+        self,
+        claim_id: str,
+        claim_status: ClaimStatus,
+        idempotency_key: str | None = None,
+        deadline: Deadline | float | None = None,
+    ) -> None:
+        """
+        `idempotency_key` identifies this update so that sending it more than once (e.g. when
+        retrying) only applies it once. `deadline` works as in `price_batch`.
+        """
+
         self._receive_app_response(
             f"/v1/claim/{claim_id}/status",
             claim_status,
             BaseModel,
+            headers=(
+                {} if idempotency_key is None else {"Idempotency-Key": idempotency_key}
+            ),
+            deadline=Deadline.of(deadline),
         )
+
+    def insert_claim_statuses(
+        self,
+        statuses: Iterable[tuple[str, ClaimStatus]],
+        concurrency: int = 8,
+        retries: int = 3,
+        deadline: Deadline | float | None = None,
+    ) -> list[StatusFailure]:
+        """
+        Inserts many claim statuses, with up to `concurrency` requests in flight over pooled
+        connections. Keep `concurrency` at or below the client's `max_connections` so connections
+        are reused.
+
+        Each update is sent with its own idempotency key, so updates which failed transiently
+        (see `is_transient`) are retried up to `retries` times without risk of applying them
+        twice. Rather than raising, the updates which still failed are returned.
+
+        Once `deadline` has passed no more updates are started, and those not yet sent are returned
+        as failures with a `DeadlineExceeded` error.
+        """
+
+        call_deadline = Deadline.of(deadline)
+        failures: list[StatusFailure] = []
+
+        def insert(claim_id: str, claim_status: ClaimStatus) -> None:
+            idempotency_key = str(uuid.uuid4())
+
+            for attempt in range(retries + 1):
+                try:
+                    self.insert_claim_status(
+                        claim_id, claim_status, idempotency_key, call_deadline
+                    )
+                    return
+                except Exception as e:
+                    if attempt == retries or not is_transient(e):
+                        failures.append(StatusFailure(claim_id, e))
+                        return
+
+                delay = backoff_seconds(attempt)
+                if call_deadline is not None and call_deadline.remaining() <= delay:
+                    failures.append(
+                        StatusFailure(claim_id, DeadlineExceeded("deadline exceeded"))
+                    )
+                    return
+
+                time.sleep(delay)
+
+        # Only a few updates are queued beyond those in flight so large inputs aren't all
+        # submitted at once.
+        max_pending = concurrency * 2
+        pending: set[Future[None]] = set()
+
+        with ThreadPoolExecutor(concurrency) as threads:
+            for claim_id, claim_status in statuses:
+                if call_deadline is not None and call_deadline.expired:
+                    failures.append(
+                        StatusFailure(claim_id, DeadlineExceeded("deadline exceeded"))
+                    )
+                    continue
+
+                pending.add(threads.submit(insert, claim_id, claim_status))
+
+                if len(pending) >= max_pending:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        return failures
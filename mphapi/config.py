@@ -0,0 +1,60 @@
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, StrictBool
+
+from .fields import camel_case_model_config, field_name
+
+
+class PriceConfig(BaseModel):
+    """PriceConfig is used to configure the behavior of the pricing API"""
+
+    model_config = camel_case_model_config
+
+    contract_ruleset: Optional[str] = None
+    """set to the name of the ruleset to use for contract pricing"""
+
+    price_zero_billed: Optional[StrictBool] = False
+    """set to true to price claims with zero billed amounts (default is false)"""
+
+    is_commercial: Optional[StrictBool] = False
+    """set to true to crosswalk codes from commercial codes Medicare won't pay for to substitute codes they do pay for (e.g. 99201 to G0463)"""
+
+    disable_cost_based_reimbursement: Optional[StrictBool] = False
+    """set to true to disable cost-based reimbursement for line items paid as a percent of cost"""
+
+    use_commercial_synthetic_for_not_allowed: Optional[StrictBool] = False
+    """set to true to use a synthetic Medicare price for line-items that are not allowed by Medicare"""
+
+    use_drg_from_grouper: Annotated[
+        Optional[StrictBool], field_name("useDRGFromGrouper")
+    ] = False
+    """set to true to always use the DRG from the inpatient grouper"""
+
+    use_best_drg_price: Annotated[
+        Optional[StrictBool], field_name("useBestDRGPrice")
+    ] = False
+    """set to true to use the best DRG price between the price on the claim and the price from the grouper"""
+
+    override_threshold: Optional[float] = 0
+    """set to a value greater than 0 to allow the pricer flexibility to override NCCI edits and other overridable errors and return a price"""
+
+    include_edits: Optional[StrictBool] = False
+    """set to true to include edit details in the response"""
+
+    continue_on_edit_fail: Optional[StrictBool] = False
+    """set to true to continue to price the claim even if there are edit failures"""
+
+    continue_on_provider_match_fail: Optional[StrictBool] = False
+    """set to true to continue with a average provider for the geographic area if the provider cannot be matched"""
+
+    disable_machine_learning_estimates: Optional[StrictBool] = False
+    """set to true to disable machine learning estimates (applies to estimates only)"""
+
+    assume_impossible_anesthesia_units_are_minutes: Optional[StrictBool] = False
+    """set to true to divide impossible anesthesia units by 15 (max of 96 anesthesia units per day) (default is false)"""
+
+    fallback_to_max_anesthesia_units_per_day: Optional[StrictBool] = False
+    """set to true to fallback to the maximum anesthesia units per day (default is false which will error if there are more than 96 anesthesia units per day)"""
+
+    allow_partial_results: Optional[StrictBool] = False
+    """set to true to return partially repriced claims. This can be useful to get pricing on non-erroring line items, but should be used with caution"""
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from .claim import Claim
+
+
+@pytest.fixture
+def testdata_dir() -> Path:
+    return Path(__file__).parent.joinpath("testdata")
+
+
+@pytest.fixture
+def read_testdata(testdata_dir: Path) -> Callable[[str], str]:
+    """Returns a function which reads a test data file by name, e.g. `read_testdata("837p.x12")`."""
+
+    def read(name: str) -> str:
+        return testdata_dir.joinpath(name).read_text()
+
+    return read
+
+
+@pytest.fixture
+def load_claim(testdata_dir: Path) -> Callable[[str], Claim]:
+    """Returns a function which loads a test claim by name, e.g. `load_claim("hcfa")`."""
+
+    def load(test: str) -> Claim:
+        with testdata_dir.joinpath(f"{test}.json").open() as f:
+            return Claim.model_validate(json.load(f))
+
+    return load
+
+
+@pytest.fixture
+def sample_claims(load_claim: Callable[[str], Claim]) -> list[Claim]:
+    """The professional, inpatient, and outpatient test claims."""
+
+    return [load_claim(test) for test in ["hcfa", "inpatient", "outpatient"]]
+
+
+@pytest.fixture
+def numbered_claims(sample_claims: list[Claim]) -> Callable[[int], list[Claim]]:
+    """
+    Returns a function which makes a number of claims, cycling through the sample claims, with
+    claim IDs numbered from 0.
+    """
+
+    def make(count: int) -> list[Claim]:
+        return [
+            sample_claims[i % len(sample_claims)].model_copy(
+                update={"claim_id": str(i)}
+            )
+            for i in range(count)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def numbered_claim_records(
+    numbered_claims: Callable[[int], list[Claim]],
+) -> Callable[[int], list[bytes]]:
+    """Like `numbered_claims`, but returns the JSON of each claim, as in a claim file."""
+
+    def make(count: int) -> list[bytes]:
+        return [
+            claim.model_dump_json(by_alias=True, exclude_none=True).encode()
+            for claim in numbered_claims(count)
+        ]
+
+    return make
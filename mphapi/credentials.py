@@ -1,16 +1,32 @@
 import base64
 import binascii
+import contextlib
 import getpass
 import json
 import os
+import sys
+import tempfile
+import threading
 import time
+import weakref
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import requests
 from pydantic import BaseModel, Field, RootModel
 
-from .fields import camel_case_model_config
+from .fields import camel_case_model_config, deferred_model_config
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+refresh_margin_seconds = 5 * 60
+"""How long before expiring credentials are refreshed when a request needs them"""
+
+background_refresh_retry_seconds = 30
+"""How long to wait before retrying a failed background refresh"""
 
 
 class RawCredentials(BaseModel):
@@ -33,15 +49,8 @@ class RawCredentials(BaseModel):
             expires_at=self.expires_at,
         )
 
-        os.makedirs(os.path.dirname(credentials_path), exist_ok=True)
-
-        with credentials_path.open("w+") as f:
-            json.dump(
-                stored_credentials.model_dump(
-                    mode="json", by_alias=True, exclude_none=True
-                ),
-                f,
-            )
+        with lock_credentials(credentials_path):
+            write_credentials(stored_credentials, credentials_path)
 
         return Credentials(
             referer=referer,
@@ -62,13 +71,160 @@ class StoredCredentials(RawCredentials):
 class Credentials(StoredCredentials):
     credentials_path: Path = Field(..., exclude=True)
 
-    def refresh_if_needed(self) -> "Credentials | None":
-        # # There's more than 5 minutes until the credentials need refreshing. Don't bother.
-        if self.expires_at > time.time() + 5 * 60:
+    def token_expires_at(self) -> float:
+        """
+        Returns when the credentials expire. This is the earlier of `expires_at` and the `exp` claim
+        of the ID token, as the ID token is what's actually checked by the server.
+        """
+
+        try:
+            expiration = decode_jwt(self.id_token).expiration
+        except Exception:
+            return self.expires_at
+
+        # Tokens without an `exp` claim decode to 0.
+        if expiration <= 0:
+            return self.expires_at
+
+        return min(self.expires_at, expiration)
+
+    def refresh_if_needed(
+        self, margin: float = refresh_margin_seconds
+    ) -> "Credentials | None":
+        # There's more than `margin` seconds until the credentials need refreshing. Don't bother.
+        if self.token_expires_at() > time.time() + margin:
             return None
 
-        new_credentials = refresh_token(self.api_key, self.referer, self.refresh_token)
-        return new_credentials.store(self.api_key, self.referer, self.credentials_path)
+        with lock_credentials(self.credentials_path):
+            # Another process may have refreshed the credentials while we were waiting on the lock.
+            stored_credentials = get_stored_credentials(self.credentials_path)
+            if (
+                stored_credentials is not None
+                and stored_credentials.api_key == self.api_key
+                and stored_credentials.token_expires_at() > time.time() + margin
+            ):
+                return stored_credentials
+
+            new_credentials = refresh_token(
+                self.api_key, self.referer, self.refresh_token
+            )
+
+            # Refreshing doesn't return the email, so carry it over.
+            stored_credentials = StoredCredentials(
+                api_key=self.api_key,
+                referer=self.referer,
+                email=new_credentials.email or self.email,
+                id_token=new_credentials.id_token,
+                refresh_token=new_credentials.refresh_token,
+                expires_at=new_credentials.expires_at,
+            )
+            write_credentials(stored_credentials, self.credentials_path)
+
+        return Credentials(
+            credentials_path=self.credentials_path,
+            **stored_credentials.model_dump(),
+        )
+
+
+class CredentialsHolder:
+    """
+    CredentialsHolder keeps app credentials in memory so they can be shared between threads.
+
+    Only one thread refreshes the credentials at a time. With `background_refresh`, a timer also
+    refreshes them well before they expire so requests don't have to wait on a refresh. The timer
+    stops when the holder is closed or garbage collected.
+    """
+
+    credentials: Credentials
+
+    def __init__(
+        self,
+        credentials: Credentials,
+        refresh_margin: float = refresh_margin_seconds,
+        background_refresh: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        credentials
+            The credentials to start with.
+        refresh_margin
+            Requests refresh the credentials themselves when they expire within this many seconds.
+            The background refresh happens twice as far ahead of expiry.
+        background_refresh
+            Set to refresh the credentials in the background rather than only when a request needs
+            them.
+        """
+
+        self.credentials = credentials
+        self.refresh_margin = refresh_margin
+
+        self._expires_at = credentials.token_expires_at()
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._closed = False
+
+        if background_refresh:
+            self._schedule_refresh(self._expires_at - 2 * refresh_margin - time.time())
+
+    def id_token(self) -> str:
+        """Returns a valid ID token, refreshing the credentials first if needed."""
+
+        if self._expires_at > time.time() + self.refresh_margin:
+            return self.credentials.id_token
+
+        with self._lock:
+            self._refresh(self.refresh_margin)
+
+            return self.credentials.id_token
+
+    def close(self) -> None:
+        """Stops refreshing the credentials in the background."""
+
+        with self._lock:
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+
+    def _refresh(self, margin: float) -> None:
+        refreshed = self.credentials.refresh_if_needed(margin)
+        if refreshed is not None:
+            self.credentials = refreshed
+            self._expires_at = refreshed.token_expires_at()
+
+    def _background_refresh(self) -> None:
+        delay = background_refresh_retry_seconds
+
+        with self._lock:
+            if self._closed:
+                return
+
+            try:
+                self._refresh(2 * self.refresh_margin)
+                delay = self._expires_at - 2 * self.refresh_margin - time.time()
+            except Exception:
+                # Requests will still refresh the credentials themselves when they're close to
+                # expiring, so just try again later.
+                pass
+
+            self._schedule_refresh(delay)
+
+    def _schedule_refresh(self, delay: float) -> None:
+        # The timer wakes up early when the delay doesn't fit, which is harmless as refreshing is
+        # skipped until it's actually needed.
+        delay = min(max(delay, 0), threading.TIMEOUT_MAX)
+
+        self._timer = threading.Timer(delay, _background_refresh, (weakref.ref(self),))
+        self._timer.daemon = True
+        self._timer.start()
+
+
+def _background_refresh(holder_ref: "weakref.ref[CredentialsHolder]") -> None:
+    # The timer only holds a weak reference, so a holder which is no longer used (e.g. its client
+    # was never closed) stops refreshing once it's garbage collected.
+    holder = holder_ref()
+    if holder is not None:
+        holder._background_refresh()
 
 
 class GoogleException(Exception):
@@ -77,6 +233,8 @@ class GoogleException(Exception):
 
 
 class GoogleError(BaseModel):
+    model_config = deferred_model_config
+
     code: int
     message: str
     # errors omitted as unused
@@ -123,6 +281,7 @@ class RefreshTokenResult(BaseModel):
     """
 
     # NOT camelCase
+    model_config = deferred_model_config
 
     expires_in: int
     """The number of seconds in which the ID token expires."""
@@ -148,6 +307,8 @@ class Token(BaseModel):
     The decoded ID token from SignInResult or RefreshTokenResult.
     """
 
+    model_config = deferred_model_config
+
     issuer: str
     email: str
     subject: str
@@ -166,7 +327,9 @@ def get_credentials(api_key: str, referer: str) -> Credentials:
     credentials = get_stored_credentials(credentials_path)
     if credentials is not None:
         try:
-            credentials.refresh_if_needed()
+            refreshed = credentials.refresh_if_needed()
+            if refreshed is not None:
+                credentials = refreshed
         except GoogleException as e:
             # `INVALID_ID_TOKEN` means the user must login again.
             if e.message != "INVALID_ID_TOKEN":
@@ -217,6 +380,72 @@ def get_stored_credentials(credentials_path: Path) -> Credentials | None:
     return credentials
 
 
+@contextlib.contextmanager
+def lock_credentials(credentials_path: Path) -> Iterator[None]:
+    """
+    Holds an exclusive lock on the credentials file so that only one process reads and writes it
+    at a time. The lock is taken on a separate `.lock` file since the credentials file itself is
+    replaced on every write.
+    """
+
+    os.makedirs(os.path.dirname(credentials_path) or ".", exist_ok=True)
+
+    lock_path = credentials_path.with_name(credentials_path.name + ".lock")
+    with lock_path.open("a+") as f:
+        if sys.platform == "win32":
+            f.seek(0)
+            while True:
+                try:
+                    # Blocks for about 10 seconds before raising, so keep retrying.
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_credentials(
+    stored_credentials: StoredCredentials, credentials_path: Path
+) -> None:
+    """
+    Atomically replaces the credentials file so readers never see a partially written file.
+    Callers should hold `lock_credentials` so concurrent writers don't clobber each other.
+    """
+
+    directory = os.path.dirname(credentials_path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=credentials_path.name, suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(
+                stored_credentials.model_dump(
+                    mode="json", by_alias=True, exclude_none=True
+                ),
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, credentials_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
 def refresh_token(api_key: str, referer: str, refresh_token: str) -> RawCredentials:
     response = requests.post(
         "https://securetoken.googleapis.com/v1/token",
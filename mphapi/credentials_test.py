@@ -0,0 +1,193 @@
+import base64
+import gc
+import json
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pytest
+
+from . import credentials as credentials_module
+from .client import Client
+from .credentials import (
+    Credentials,
+    CredentialsHolder,
+    RawCredentials,
+    get_stored_credentials,
+)
+
+
+def make_jwt(expiration: int) -> str:
+    def encode(value: dict[str, object]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'none'})}.{encode({'exp': expiration})}.signature"
+
+
+def make_credentials(credentials_path: Path, expires_at: float) -> Credentials:
+    return Credentials(
+        api_key="api-key",
+        referer="referer",
+        credentials_path=credentials_path,
+        email="test-user@mypricehealth.com",
+        id_token=make_jwt(int(expires_at)),
+        refresh_token="refresh-token",
+        expires_at=expires_at,
+    )
+
+
+def test_store(tmp_path: Path):
+    credentials_path = tmp_path.joinpath(".mph", "credentials.json")
+
+    raw_credentials = RawCredentials(
+        email="test-user@mypricehealth.com",
+        id_token="id-token",
+        refresh_token="refresh-token",
+        expires_at=123,
+    )
+    credentials = raw_credentials.store("api-key", "referer", credentials_path)
+
+    assert get_stored_credentials(credentials_path) == credentials
+
+    # Only the credentials and the lock file should be left behind.
+    assert sorted(path.name for path in credentials_path.parent.iterdir()) == [
+        "credentials.json",
+        "credentials.json.lock",
+    ]
+
+
+def test_token_expires_at(tmp_path: Path):
+    credentials = make_credentials(tmp_path.joinpath("credentials.json"), 1000)
+
+    credentials.id_token = make_jwt(500)
+    assert credentials.token_expires_at() == 500
+
+    credentials.id_token = "not-a-jwt"
+    assert credentials.token_expires_at() == 1000
+
+
+def test_refresh_uses_stored_credentials(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    def refresh_token(api_key: str, referer: str, refresh_token: str):
+        raise AssertionError("credentials should not be refreshed")
+
+    monkeypatch.setattr(credentials_module, "refresh_token", refresh_token)
+
+    credentials_path = tmp_path.joinpath("credentials.json")
+    expired = make_credentials(credentials_path, time.time())
+
+    # Simulate another process having already refreshed the credentials.
+    refreshed = make_credentials(credentials_path, time.time() + 3600)
+    RawCredentials.model_validate(refreshed.model_dump()).store(
+        refreshed.api_key, refreshed.referer, credentials_path
+    )
+
+    assert expired.refresh_if_needed() == refreshed
+
+
+def test_holder_refreshes_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    refresh_count = 0
+
+    def refresh_token(api_key: str, referer: str, refresh_token: str):
+        nonlocal refresh_count
+        refresh_count += 1
+
+        # Give the other threads a chance to pile up on the lock.
+        time.sleep(0.05)
+
+        expires_at = time.time() + 3600
+        return RawCredentials(
+            email="",
+            id_token=make_jwt(int(expires_at)),
+            refresh_token="new-refresh-token",
+            expires_at=expires_at,
+        )
+
+    monkeypatch.setattr(credentials_module, "refresh_token", refresh_token)
+
+    credentials_path = tmp_path.joinpath("credentials.json")
+    holder = CredentialsHolder(
+        make_credentials(credentials_path, time.time()), background_refresh=False
+    )
+
+    id_tokens: list[str] = []
+
+    def get_id_token():
+        id_tokens.append(holder.id_token())
+
+    threads = [threading.Thread(target=get_id_token) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert refresh_count == 1
+    assert len(set(id_tokens)) == 1
+    assert holder.credentials.refresh_token == "new-refresh-token"
+    assert holder.credentials.email == "test-user@mypricehealth.com"
+
+    stored_credentials = get_stored_credentials(credentials_path)
+    assert stored_credentials is not None
+    assert stored_credentials.id_token == id_tokens[0]
+
+
+def test_background_refresh(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    refresh_count = 0
+
+    def refresh_token(api_key: str, referer: str, refresh_token: str):
+        nonlocal refresh_count
+        refresh_count += 1
+
+        expires_at = time.time() + 3600
+        return RawCredentials(
+            email="",
+            id_token=make_jwt(int(expires_at)),
+            refresh_token="new-refresh-token",
+            expires_at=expires_at,
+        )
+
+    monkeypatch.setattr(credentials_module, "refresh_token", refresh_token)
+
+    credentials_path = tmp_path.joinpath("credentials.json")
+    expiring = make_credentials(credentials_path, time.time() + 1)
+
+    # Credentials are only refreshed in the background when asked.
+    holder = CredentialsHolder(expiring, refresh_margin=1)
+    time.sleep(0.3)
+    assert refresh_count == 0
+    holder.close()
+
+    holder = CredentialsHolder(expiring, refresh_margin=1, background_refresh=True)
+    time.sleep(0.3)
+    assert refresh_count == 1
+    assert holder.credentials.refresh_token == "new-refresh-token"
+    holder.close()
+
+    # The timer doesn't keep a holder which is never closed alive, and stops once it's collected.
+    holder = CredentialsHolder(
+        make_credentials(credentials_path, time.time() + 3600),
+        background_refresh=True,
+    )
+    holder_ref = weakref.ref(holder)
+    del holder
+    gc.collect()
+    assert holder_ref() is None
+    credentials_module._background_refresh(holder_ref)
+    assert refresh_count == 1
+
+
+def test_client_app_credentials(tmp_path: Path):
+    credentials = make_credentials(tmp_path.joinpath("credentials.json"), 1000)
+
+    client = Client("api-key", app_credentials=credentials)
+    assert client.app_credentials == credentials
+
+    replacement = credentials.model_copy(update={"refresh_token": "replacement"})
+    client.app_credentials = replacement
+    assert client.app_credentials == replacement
+
+    client.app_credentials = None
+    assert client.app_credentials is None
+    client.close()
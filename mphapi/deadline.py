@@ -0,0 +1,52 @@
+import time
+from typing import Self
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call's deadline passes before it could finish."""
+
+
+class Deadline:
+    """
+    Deadline is the point in time by which a call, including all of its retries and requests,
+    should be finished. Once it's passed, no more requests are started.
+    """
+
+    expires_at: float
+    """Time the deadline expires, from `time.monotonic()`"""
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> Self:
+        """Returns a deadline `seconds` from now."""
+
+        return cls(time.monotonic() + seconds)
+
+    @classmethod
+    def of(cls, deadline: "Deadline | float | None") -> "Deadline | None":
+        """Accepts either a deadline or a number of seconds from now."""
+
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+
+        return cls.after(deadline)
+
+    def remaining(self) -> float:
+        """Returns the seconds left until the deadline, or 0 if it's passed."""
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """Raises `DeadlineExceeded` if the deadline has passed."""
+
+        if self.expired:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f})"
@@ -0,0 +1,156 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from . import client as client_module
+from .claim import Claim
+from .client import Client, PriceConfig
+from .credentials import Credentials
+from .deadline import Deadline, DeadlineExceeded
+from .pricing import ClaimStatus, status_new
+from .retry import item_failed_with
+from .stub import Latency, StubConfig, StubServer
+
+
+def test_deadline():
+    deadline = Deadline.after(10)
+    assert 9 < deadline.remaining() <= 10
+    assert not deadline.expired
+    assert Deadline.of(deadline) is deadline
+    assert Deadline.of(None) is None
+
+    expired = Deadline.of(0)
+    assert expired is not None and expired.expired
+    with pytest.raises(DeadlineExceeded):
+        expired.check()
+
+
+def test_timeouts():
+    client = Client("api-key", connect_timeout=10, read_timeout=None)
+    assert client._timeouts(None) == (10, None)
+
+    connect_timeout, read_timeout = client._timeouts(Deadline.after(5))
+    assert connect_timeout is not None and 4 < connect_timeout <= 5
+    assert read_timeout is not None and 4 < read_timeout <= 5
+
+    # Requests are never sent with no time left, which transports reject or treat as no limit.
+    with pytest.raises(DeadlineExceeded):
+        client._timeouts(Deadline.after(0))
+    client.close()
+
+
+def test_price_deadline(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with StubServer(StubConfig(latency=Latency(seconds=1))) as server:
+        with Client("api-key", api_url=server.url) as client:
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                client.price(PriceConfig(), claim, deadline=0.1)
+            assert time.perf_counter() - start < 0.5
+
+            # Requests which can't start before the deadline aren't sent at all.
+            with pytest.raises(DeadlineExceeded):
+                client.price_batch(PriceConfig(), claim, deadline=Deadline.after(0))
+            assert server.request_count == 1
+
+
+class SlowBodyHandler(BaseHTTPRequestHandler):
+    """Sends the response's headers right away, but its body only after a second."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+
+        time.sleep(1)
+        try:
+            self.wfile.write(b"{}")
+        except OSError:
+            pass
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def test_slow_body_deadline(load_claim: Callable[[str], Claim]):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowBodyHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        host, port = server.server_address[:2]
+        with Client("api-key", api_url=f"http://{host}:{port}") as client:
+            # The body times out while it's streamed in, after the headers have arrived.
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                client.price(PriceConfig(), load_claim("hcfa"), deadline=0.2)
+            assert time.perf_counter() - start < 0.7
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retries_stop_at_deadline(
+    load_claim: Callable[[str], Claim], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(client_module, "backoff_seconds", lambda attempt: 0.2)
+    claims = [load_claim("hcfa")] * 5
+
+    with StubServer(StubConfig(item_error_rate=1)) as server:
+        with Client("api-key", api_url=server.url) as client:
+            start = time.perf_counter()
+            pricings = client.price_batch(
+                PriceConfig(),
+                *claims,
+                item_retries=100,
+                retry_item=item_failed_with("Pricing failed"),
+                deadline=0.5,
+            )
+            # Requests already in flight at the deadline may run a little past it.
+            assert time.perf_counter() - start < 0.7
+
+    assert all(pricing.edit_error is not None for pricing in pricings)
+    assert 1 < server.request_count < 100
+
+
+def test_claim_statuses_deadline():
+    statuses = [
+        (str(i), ClaimStatus(step=status_new.step, status=status_new.status))
+        for i in range(10)
+    ]
+
+    with StubServer() as server:
+        client = Client(
+            "api-key",
+            api_url=server.url,
+            app_url=server.url,
+            app_api_key="app-api-key",
+            app_referer=server.url,
+            app_credentials=Credentials(
+                api_key="app-api-key",
+                referer=server.url,
+                credentials_path=Path("fake-credentials-path"),
+                email="test-user@mypricehealth.com",
+                id_token="fake-id-token",
+                refresh_token="fake-refresh-token",
+                expires_at=sys.float_info.max,
+            ),
+        )
+        failures = client.insert_claim_statuses(statuses, deadline=Deadline.after(0))
+        client.close()
+
+    assert [failure.claim_id for failure in failures] == [str(i) for i in range(10)]
+    assert all(isinstance(failure.error, DeadlineExceeded) for failure in failures)
+    assert server.request_count == 0
@@ -0,0 +1,317 @@
+"""
+Prices claims across several processes so validating, serializing, and decoding claims isn't
+limited to a single core by the GIL.
+"""
+
+import multiprocessing.context
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from pydantic import ValidationError
+
+from .claim import Claim
+from .client import Client
+from .config import PriceConfig
+from .fingerprint import FingerprintStore
+from .pricing import Pricing
+from .stats import ClientStats
+
+
+class PricedClaim(NamedTuple):
+    """
+    PricedClaim is the result of pricing a single claim in another process. The pricing is kept as
+    JSON so it's cheap to send between processes; decode it with `pricing()` when needed.
+    """
+
+    position: int
+    """Index of the claim in the input sequence, or byte offset of its line in the input file"""
+
+    claim_id: str | None
+    """The claim's ID, if it had one"""
+
+    pricing_json: bytes | None
+    """The pricing result as JSON, or None if the claim couldn't be priced"""
+
+    error: str | None
+    """Why the claim couldn't be priced (e.g. it was invalid or its batch failed)"""
+
+    def pricing(self) -> Pricing | None:
+        if self.pricing_json is None:
+            return None
+
+        return Pricing.model_validate_json(self.pricing_json)
+
+
+class _Shard(NamedTuple):
+    config: PriceConfig
+    batch_size: int
+    concurrency: int
+    # Either a byte range of a file...
+    path: str | None = None
+    start: int = 0
+    end: int = 0
+    # ...or claims to price with their positions.
+    claims: list[tuple[int, bytes | str]] | None = None
+
+
+class _ShardResult(NamedTuple):
+    results: list[PricedClaim]
+    stats: ClientStats
+
+
+_worker_client: Client | None = None
+_worker_store: FingerprintStore | None = None
+
+
+def _init_worker(
+    client_factory: Callable[[], Client],
+    store_factory: Callable[[], FingerprintStore] | None,
+) -> None:
+    global _worker_client, _worker_store
+    _worker_client = client_factory()
+    _worker_store = None if store_factory is None else store_factory()
+
+
+def _read_range(path: str, start: int, end: int) -> list[tuple[int, bytes]]:
+    """Reads the lines which start within [start, end) along with their offsets."""
+
+    lines: list[tuple[int, bytes]] = []
+
+    with open(path, "rb") as f:
+        if start > 0:
+            # Skip the line started in the previous range, unless this range starts right on it.
+            f.seek(start - 1)
+            f.readline()
+        offset = f.tell()
+
+        while offset < end:
+            line = f.readline()
+            if not line:
+                break
+
+            if line.strip():
+                lines.append((offset, line))
+            offset += len(line)
+
+    return lines
+
+
+def _price_batch(
+    client: Client, config: PriceConfig, batch: list[tuple[int, bytes | str]]
+) -> list[PricedClaim]:
+    results: list[PricedClaim] = []
+    positions: list[int] = []
+    claims: list[Claim] = []
+
+    with client.phase("claim building"):
+        for position, data in batch:
+            try:
+                claims.append(Claim.model_validate_json(data))
+                positions.append(position)
+            except ValidationError as e:
+                results.append(PricedClaim(position, None, None, f"invalid claim: {e}"))
+
+    if not claims:
+        return results
+
+    try:
+        pricings = client.price_batch(config, *claims, store=_worker_store)
+    except Exception as e:
+        return results + [
+            PricedClaim(position, claim.claim_id, None, str(e))
+            for position, claim in zip(positions, claims)
+        ]
+
+    with client.phase("result handling"):
+        for position, claim, pricing in zip(positions, claims, pricings):
+            results.append(
+                PricedClaim(
+                    position,
+                    claim.claim_id,
+                    pricing.model_dump_json(by_alias=True, exclude_none=True).encode(),
+                    None,
+                )
+            )
+
+    return results
+
+
+def _price_shard(shard: _Shard) -> _ShardResult:
+    client = _worker_client
+    assert client is not None, "worker was not initialized"
+
+    if shard.path is not None:
+        claims: list[tuple[int, bytes | str]] = list(
+            _read_range(shard.path, shard.start, shard.end)
+        )
+    else:
+        claims = shard.claims or []
+
+    batches = [
+        claims[i : i + shard.batch_size]
+        for i in range(0, len(claims), shard.batch_size)
+    ]
+
+    results: list[PricedClaim] = []
+    if shard.concurrency > 1:
+        with ThreadPoolExecutor(shard.concurrency) as threads:
+            for batch_results in threads.map(
+                lambda batch: _price_batch(client, shard.config, batch), batches
+            ):
+                results.extend(batch_results)
+    else:
+        for batch in batches:
+            results.extend(_price_batch(client, shard.config, batch))
+
+    # Each shard reports only its own stats so they can be merged without double counting.
+    stats = client.stats()
+    client.reset_stats()
+
+    return _ShardResult(results, stats)
+
+
+class ProcessPoolPricer:
+    """
+    ProcessPoolPricer prices claims in a pool of worker processes. Each worker has its own `Client`
+    and does its own claim validation, serialization, and response decoding, so throughput scales
+    with the number of cores rather than being limited by the GIL.
+
+    Claims are passed in as JSON so the parent process doesn't spend time validating them, and
+    results come back as `PricedClaim`s holding JSON. Results are yielded as each shard finishes,
+    so they're not in input order; use `PricedClaim.position` to match them up.
+
+        pricer = ProcessPoolPricer(functools.partial(Client, api_key))
+        for result in pricer.price_file(config, "claims.ndjson"):
+            ...
+        print(pricer.stats())
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Client],
+        processes: int | None = None,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        mp_context: multiprocessing.context.BaseContext | None = None,
+        store_factory: Callable[[], FingerprintStore] | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        client_factory
+            Creates each worker's client. Must be picklable, e.g. a module-level function or a
+            `functools.partial` of `Client`.
+        processes
+            Number of worker processes. Defaults to the number of CPUs.
+        batch_size
+            Number of claims sent in each `price_batch` request.
+        concurrency
+            Number of requests each worker has in flight at once.
+        mp_context
+            The multiprocessing context used to start workers.
+        store_factory
+            Opens each worker's `FingerprintStore` to only price claims which have changed since
+            the last run, e.g. `functools.partial(FingerprintStore, path, data_version)`.
+        """
+
+        self.client_factory = client_factory
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.mp_context = mp_context
+        self.store_factory = store_factory
+
+        self._stats: list[ClientStats] = []
+
+    def price_file(
+        self,
+        config: PriceConfig,
+        path: str | os.PathLike[str],
+        shards: int | None = None,
+    ) -> Iterator[PricedClaim]:
+        """
+        Prices a file of newline-delimited JSON claims. The file is split into byte ranges which
+        workers read themselves, so claims are never sent between processes.
+
+        `shards` defaults to four per process so that slow shards don't leave workers idle.
+        """
+
+        path = str(Path(path).resolve())
+        size = os.path.getsize(path)
+        shard_count = max(1, min(shards or self.processes * 4, size))
+        bounds = [size * i // shard_count for i in range(shard_count + 1)]
+
+        return self._run(
+            _Shard(config, self.batch_size, self.concurrency, path, start, end)
+            for start, end in zip(bounds, bounds[1:])
+        )
+
+    def price(
+        self,
+        config: PriceConfig,
+        claims: Iterable[bytes | str],
+        shard_size: int = 1000,
+    ) -> Iterator[PricedClaim]:
+        """
+        Prices claims given as JSON, splitting them into shards of `shard_size` claims.
+        `PricedClaim.position` is the index of the claim in `claims`.
+        """
+
+        def shards() -> Iterator[_Shard]:
+            shard: list[tuple[int, bytes | str]] = []
+            for position, claim in enumerate(claims):
+                shard.append((position, claim))
+                if len(shard) == shard_size:
+                    yield _Shard(
+                        config, self.batch_size, self.concurrency, claims=shard
+                    )
+                    shard = []
+
+            if shard:
+                yield _Shard(config, self.batch_size, self.concurrency, claims=shard)
+
+        return self._run(shards())
+
+    def stats(self) -> ClientStats:
+        """Returns the stats of every worker's client merged together."""
+
+        return ClientStats.merge(*self._stats)
+
+    def _run(self, shards: Iterable[_Shard]) -> Iterator[PricedClaim]:
+        executor = ProcessPoolExecutor(
+            self.processes,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self.client_factory, self.store_factory),
+        )
+
+        # Only a couple of shards per worker are submitted at a time so large inputs aren't all
+        # held in memory at once.
+        max_pending = self.processes * 2
+        pending: set[Future[_ShardResult]] = set()
+
+        with executor:
+            for shard in shards:
+                pending.add(executor.submit(_price_shard, shard))
+
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+
+    def _collect(self, done: set[Future[_ShardResult]]) -> Iterator[PricedClaim]:
+        for future in done:
+            shard_result = future.result()
+            self._stats.append(shard_result.stats)
+            yield from shard_result.results
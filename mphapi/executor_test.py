@@ -0,0 +1,71 @@
+import functools
+import multiprocessing
+from pathlib import Path
+from typing import Callable
+
+from .client import Client, PriceConfig
+from .executor import ProcessPoolPricer
+from .stub import StubServer
+
+
+def test_price_file(
+    numbered_claim_records: Callable[[int], list[bytes]], tmp_path: Path
+):
+    claims = numbered_claim_records(50)
+    claims[7] = b'{"npi": "1234"}'
+
+    path = tmp_path.joinpath("claims.ndjson")
+    path.write_bytes(b"\n".join(claims) + b"\n")
+
+    with StubServer() as server:
+        pricer = ProcessPoolPricer(
+            functools.partial(Client, "api-key", api_url=server.url),
+            processes=2,
+            batch_size=4,
+            concurrency=2,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        results = list(pricer.price_file(PriceConfig(), path, shards=7))
+
+    # Every line is priced exactly once, even when shards split lines.
+    offsets = [0]
+    for claim in claims[:-1]:
+        offsets.append(offsets[-1] + len(claim) + 1)
+    assert sorted(result.position for result in results) == offsets
+
+    failed = [result for result in results if result.error is not None]
+    assert len(failed) == 1
+    assert failed[0].position == offsets[7]
+
+    priced = sorted(
+        (result for result in results if result.error is None),
+        key=lambda result: result.position,
+    )
+    assert [result.claim_id for result in priced] == [
+        str(i) for i in range(50) if i != 7
+    ]
+
+    pricing = priced[0].pricing()
+    assert pricing is not None
+    assert pricing.claim_id == "0"
+
+    stats = pricer.stats().endpoints["/v1/medicare/price/claims"]
+    assert stats.claims == 49
+    assert stats.requests >= 49 / 4
+
+
+def test_price(numbered_claim_records: Callable[[int], list[bytes]], tmp_path: Path):
+    claims = numbered_claim_records(25)
+
+    with StubServer() as server:
+        pricer = ProcessPoolPricer(
+            functools.partial(Client, "api-key", api_url=server.url),
+            processes=2,
+            batch_size=10,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        results = list(pricer.price(PriceConfig(), claims, shard_size=10))
+
+    assert sorted(result.position for result in results) == list(range(25))
+    assert all(result.claim_id == str(result.position) for result in results)
+    assert pricer.stats().endpoints["/v1/medicare/price/claims"].requests == 3
@@ -8,8 +8,12 @@ camel_case_model_config = ConfigDict(
         validation_alias=to_camel, serialization_alias=to_camel
     ),
     populate_by_name=True,
+    # Schemas are built on first use rather than at import so `import mphapi` stays cheap.
+    defer_build=True,
 )
 
+deferred_model_config = ConfigDict(defer_build=True)
+
 
 # The return value of Field itself is typed as Any even though it's technically always of type `FieldInfo`.
 # For once this unsoundness is desired, as it's meant to be assignable to any field type.
@@ -0,0 +1,29 @@
+"""Helpers for the readers of claim files."""
+
+import contextlib
+import io
+import os
+from typing import IO, Iterator
+
+Source = str | os.PathLike[str] | IO[str] | IO[bytes]
+"""A path to a file, or a file opened in text or binary mode"""
+
+
+@contextlib.contextmanager
+def open_text(source: Source, encoding: str = "utf-8") -> Iterator[IO[str]]:
+    """
+    Opens a path for reading as text, or wraps a binary file so it reads as text. Line endings are
+    left as they are. Files passed in are left open.
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding, newline="") as f:
+            yield f
+    elif isinstance(source, io.TextIOBase):
+        yield source  # type: ignore
+    else:
+        f = io.TextIOWrapper(source, encoding=encoding, newline="")  # type: ignore
+        try:
+            yield f
+        finally:
+            f.detach()
@@ -0,0 +1,179 @@
+"""
+Remembers the pricing of claims between runs so that claims which haven't changed don't need to be
+priced again.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Self, Sequence, cast
+
+from .claim import Claim
+from .config import PriceConfig
+from .pricing import Pricing
+
+# SQLite limits how many parameters a single statement can have.
+_lookup_chunk_size = 500
+
+
+def fingerprint_config(config: PriceConfig, data_version: str = "") -> bytes:
+    """Returns the part of a fingerprint shared by every claim priced with the same settings."""
+
+    return b"%s\x00%s\x00" % (
+        data_version.encode(),
+        config.model_dump_json(by_alias=True, exclude_none=True).encode(),
+    )
+
+
+def fingerprint(claim: Claim, config: PriceConfig, data_version: str = "") -> str:
+    """
+    Returns a hash of everything that determines a claim's pricing: the claim's contents, the
+    pricing configuration, and the version of the pricing data.
+    """
+
+    return _fingerprint(claim, fingerprint_config(config, data_version))
+
+
+def _fingerprint(claim: Claim, prefix: bytes) -> str:
+    content = claim.model_dump_json(by_alias=True, exclude_none=True).encode()
+    return hashlib.blake2b(prefix + content, digest_size=16).hexdigest()
+
+
+class FingerprintStore:
+    """
+    FingerprintStore keeps the last pricing of each claim in a SQLite database along with the
+    claim's fingerprint. Claims are keyed by their ID (or by their fingerprint if they don't have
+    one), so a changed claim replaces its previous result rather than adding to the store.
+
+    `data_version` should change whenever results could change for the same input, e.g. when new
+    Medicare data is released, so that every claim is priced again.
+
+    Only results without an `edit_error` are kept, so claims which failed are retried next time.
+    The store may be shared by threads, and by processes each opening the same path.
+    """
+
+    path: str
+    data_version: str
+    hits: int
+    """Number of claims whose pricing was reused"""
+    misses: int
+    """Number of claims which had to be priced"""
+
+    def __init__(self, path: str | os.PathLike[str], data_version: str = ""):
+        self.path = os.fspath(path)
+        self.data_version = data_version
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pricing ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, pricing BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pricing").fetchone()[0]
+
+    def lookup(self, keys: Sequence[str]) -> dict[str, tuple[str, bytes]]:
+        """Returns the stored fingerprint and pricing JSON for each of the keys that's stored."""
+
+        found: dict[str, tuple[str, bytes]] = {}
+
+        with self._lock:
+            for i in range(0, len(keys), _lookup_chunk_size):
+                chunk = keys[i : i + _lookup_chunk_size]
+                rows = self._db.execute(
+                    "SELECT key, fingerprint, pricing FROM pricing WHERE key IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    chunk,
+                )
+                for key, claim_fingerprint, pricing in rows:
+                    found[key] = (claim_fingerprint, pricing)
+
+        return found
+
+    def save(self, entries: Sequence[tuple[str, str, bytes]]) -> None:
+        """Stores (key, fingerprint, pricing JSON) entries, replacing any with the same key."""
+
+        if not entries:
+            return
+
+        with self._lock:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO pricing (key, fingerprint, pricing) VALUES (?, ?, ?)",
+                    entries,
+                )
+
+    def price(
+        self,
+        config: PriceConfig,
+        claims: Sequence[Claim],
+        send: Callable[[list[Claim]], list[Pricing]],
+    ) -> list[Pricing]:
+        """
+        Prices claims, calling `send` with only the claims that are new or have changed since they
+        were stored and reusing the stored pricing for the rest. Results are in input order.
+        """
+
+        prefix = fingerprint_config(config, self.data_version)
+        fingerprints = [_fingerprint(claim, prefix) for claim in claims]
+        keys = [
+            claim.claim_id or claim_fingerprint
+            for claim, claim_fingerprint in zip(claims, fingerprints)
+        ]
+        stored = self.lookup(keys)
+
+        results: list[Pricing | None] = [None] * len(claims)
+        changed_positions: list[int] = []
+        for position, (key, claim_fingerprint) in enumerate(zip(keys, fingerprints)):
+            entry = stored.get(key)
+            if entry is not None and entry[0] == claim_fingerprint:
+                results[position] = Pricing.model_validate_json(entry[1])
+            else:
+                changed_positions.append(position)
+
+        with self._lock:
+            self.hits += len(claims) - len(changed_positions)
+            self.misses += len(changed_positions)
+
+        if changed_positions:
+            priced = send([claims[position] for position in changed_positions])
+            if len(priced) != len(changed_positions):
+                raise ValueError(
+                    f"expected {len(changed_positions)} results but received {len(priced)}"
+                )
+
+            entries: list[tuple[str, str, bytes]] = []
+            for position, pricing in zip(changed_positions, priced):
+                results[position] = pricing
+                if pricing.edit_error is None:
+                    entries.append(
+                        (
+                            keys[position],
+                            fingerprints[position],
+                            pricing.model_dump_json(
+                                by_alias=True, exclude_none=True
+                            ).encode(),
+                        )
+                    )
+
+            self.save(entries)
+
+        # Each position was filled from the store or by send.
+        return cast(list[Pricing], results)
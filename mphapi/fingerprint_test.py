@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Callable
+
+from .claim import Claim
+from .client import Client, PriceConfig
+from .fingerprint import FingerprintStore, fingerprint
+from .stub import StubConfig, StubServer
+
+
+def test_fingerprint(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+    config = PriceConfig()
+
+    assert fingerprint(claim, config) == fingerprint(claim.model_copy(), config)
+    assert fingerprint(claim, config) != fingerprint(claim, config, "2025-q1")
+    assert fingerprint(claim, config) != fingerprint(
+        claim, PriceConfig(is_commercial=True)
+    )
+    assert fingerprint(claim, config) != fingerprint(
+        claim.model_copy(update={"billed_amount": 1.0}), config
+    )
+
+
+def test_incremental_price_batch(load_claim: Callable[[str], Claim], tmp_path: Path):
+    claims = [load_claim("hcfa"), load_claim("outpatient"), load_claim("inpatient")]
+    config = PriceConfig()
+
+    with StubServer(StubConfig()) as server:
+        with Client("api-key", api_url=server.url) as client:
+            with FingerprintStore(tmp_path / "store.db", "v1") as store:
+                first = client.price_batch(config, *claims, store=store)
+                assert len(store) == 3
+                assert (store.hits, store.misses) == (0, 3)
+
+                # Nothing changed so nothing is sent.
+                second = client.price_batch(config, *claims, store=store)
+                assert server.request_count == 1
+                assert [p.claim_id for p in second] == [p.claim_id for p in first]
+
+                # Only the changed claim is sent, and its result replaces the stored one.
+                claims[1] = claims[1].model_copy(update={"billed_amount": 1.0})
+                client.price_batch(config, *claims, store=store)
+                assert server.request_count == 2
+                assert client.stats().endpoints["/v1/medicare/price/claims"].claims == 4
+                assert len(store) == 3
+
+            # A new data version reprices everything.
+            with FingerprintStore(tmp_path / "store.db", "v2") as store:
+                client.price_batch(config, *claims, store=store)
+                assert (store.hits, store.misses) == (0, 3)
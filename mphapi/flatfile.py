@@ -0,0 +1,327 @@
+"""
+Reads claims from line-level CSV exports, which have one row per service line with the claim's own
+fields repeated on each of its rows. Rows are grouped into claims as they're read, so the file is
+never loaded into memory:
+
+    layout = CSVLayout(columns={"claim_id": "CLAIM_NO", "npi": "NPI", ...})
+    for batch in itertools.batched(read_claims_csv("claims.csv", layout), 100):
+        pricings = client.price_batch(config, *batch)
+"""
+
+import contextlib
+import csv
+import heapq
+import itertools
+import json
+import tempfile
+import types
+import typing
+from datetime import datetime
+from enum import Enum
+from typing import IO, Any, Callable, Iterable, Iterator, NamedTuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+from .claim import Claim, Diagnosis, Provider, Service
+from .date import Date
+from .fields import deferred_model_config
+from .files import Source, open_text
+
+
+class FlatFileError(ValueError):
+    """Raised when a CSV file can't be read or a claim in it isn't valid."""
+
+    line: int
+    """Line of the file the offending claim or row starts on, counting from 1"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class _Kind(Enum):
+    SCALAR = "scalar"
+    DATE = "date"
+    STRINGS = "strings"
+    DIAGNOSIS = "diagnosis"
+    DIAGNOSES = "diagnoses"
+
+
+def _field_kind(model: type[BaseModel], name: str) -> _Kind:
+    """Returns how the CSV values of a field are turned into the field's value."""
+
+    if name not in model.model_fields or name == "services":
+        raise ValueError(f"{model.__name__} has no field {name!r} for a column")
+
+    annotation = model.model_fields[name].annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        (annotation,) = [
+            arg for arg in typing.get_args(annotation) if arg is not type(None)
+        ]
+
+    if annotation is Date:
+        return _Kind.DATE
+    if annotation is Diagnosis:
+        return _Kind.DIAGNOSIS
+    if typing.get_origin(annotation) is list:
+        (item,) = typing.get_args(annotation)
+        if item is str:
+            return _Kind.STRINGS
+        if item is Diagnosis:
+            return _Kind.DIAGNOSES
+    elif not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+        return _Kind.SCALAR
+
+    raise ValueError(f"{model.__name__}.{name} can't be read from CSV columns")
+
+
+def _resolve(path: str) -> tuple[str, str, _Kind]:
+    """Splits a field path into the model it's on (claim, service, or provider) and its name."""
+
+    match path.split("."):
+        case ["services", "provider", name]:
+            return "provider", name, _field_kind(Provider, name)
+        case ["services", name]:
+            return "service", name, _field_kind(Service, name)
+        case [name]:
+            return "claim", name, _field_kind(Claim, name)
+        case _:
+            raise ValueError(f"unknown field {path!r}")
+
+
+class CSVLayout(BaseModel):
+    """CSVLayout describes which CSV columns hold which claim fields"""
+
+    model_config = deferred_model_config
+
+    columns: dict[str, str | list[str]]
+    """
+    The column holding each field, keyed by the field's name. Service fields are prefixed with
+    `services.` and service provider fields with `services.provider.`. List fields (e.g.
+    `other_diagnoses` or `services.procedure_modifiers`) take a list of columns, whose blank values
+    are skipped. Diagnoses are read from their codes. `claim_id` is required to group rows.
+
+        {"claim_id": "CLAIM_NO", "principal_diagnosis": "DX1", "other_diagnoses": ["DX2", "DX3"],
+         "services.procedure_code": "CPT", "services.date_from": "FROM_DATE"}
+    """
+
+    date_format: str = "%Y%m%d"
+    """Format of date columns (see `datetime.strptime`)"""
+
+    delimiter: str = ","
+    """Character separating columns"""
+
+    @field_validator("columns")
+    @classmethod
+    def _check_columns(
+        cls, columns: dict[str, str | list[str]]
+    ) -> dict[str, str | list[str]]:
+        if "claim_id" not in columns:
+            raise ValueError("claim_id must have a column so rows can be grouped")
+
+        for path, column in columns.items():
+            _, name, kind = _resolve(path)
+            is_list = kind in (_Kind.STRINGS, _Kind.DIAGNOSES)
+            if is_list != isinstance(column, list):
+                expected = "a list of columns" if is_list else "a single column"
+                raise ValueError(f"{path} must be read from {expected}")
+
+        return columns
+
+
+class _Field(NamedTuple):
+    model: str
+    name: str
+    kind: _Kind
+    indexes: list[int]
+
+
+Row = tuple[int, list[str]]
+"""A row along with the line it starts on"""
+
+
+class _ClaimBuilder:
+    def __init__(self, layout: CSVLayout, header: list[str]):
+        self.layout = layout
+
+        positions = {column: index for index, column in enumerate(header)}
+        missing = [
+            column
+            for columns in layout.columns.values()
+            for column in ([columns] if isinstance(columns, str) else columns)
+            if column not in positions
+        ]
+        if missing:
+            raise FlatFileError(f"missing columns {', '.join(missing)}", 1)
+
+        self.fields: dict[str, list[_Field]] = {
+            "claim": [],
+            "service": [],
+            "provider": [],
+        }
+        for path, columns in layout.columns.items():
+            model, name, kind = _resolve(path)
+            indexes = [
+                positions[column]
+                for column in ([columns] if isinstance(columns, str) else columns)
+            ]
+            self.fields[model].append(_Field(model, name, kind, indexes))
+
+        self.claim_id_index = positions[typing.cast(str, layout.columns["claim_id"])]
+
+    def _values(self, row: list[str], fields: list[_Field]) -> dict[str, Any]:
+        values: dict[str, Any] = {}
+
+        for field in fields:
+            cells = [
+                row[index].strip()
+                for index in field.indexes
+                if index < len(row) and row[index].strip()
+            ]
+            if not cells:
+                continue
+
+            match field.kind:
+                case _Kind.SCALAR:
+                    values[field.name] = cells[0]
+                case _Kind.DATE:
+                    values[field.name] = datetime.strptime(
+                        cells[0], self.layout.date_format
+                    ).strftime("%Y%m%d")
+                case _Kind.STRINGS:
+                    values[field.name] = cells
+                case _Kind.DIAGNOSIS:
+                    values[field.name] = {"code": cells[0]}
+                case _Kind.DIAGNOSES:
+                    values[field.name] = [{"code": cell} for cell in cells]
+
+        return values
+
+    def build(self, rows: list[Row]) -> Claim:
+        line, first = rows[0]
+        try:
+            claim = self._values(first, self.fields["claim"])
+
+            services: list[dict[str, Any]] = []
+            for _, row in rows:
+                service = self._values(row, self.fields["service"])
+                provider = self._values(row, self.fields["provider"])
+                if provider:
+                    service["provider"] = provider
+                services.append(service)
+            claim["services"] = services
+
+            return Claim.model_validate(claim)
+        except (ValueError, ValidationError) as e:
+            raise FlatFileError(
+                f"invalid claim {first[self.claim_id_index]!r}: {e}", line
+            ) from e
+
+
+def _rows(reader: Iterable[list[str]], lines: Callable[[], int]) -> Iterator[Row]:
+    line = lines() + 1
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield line, row
+        line = lines() + 1
+
+
+def _contiguous_groups(rows: Iterator[Row], claim_id_index: int) -> Iterator[list[Row]]:
+    for _, group in itertools.groupby(rows, key=lambda row: row[1][claim_id_index]):
+        yield list(group)
+
+
+def _spill(rows: list[tuple[str, int, list[str]]], directory: str | None) -> IO[str]:
+    run = tempfile.TemporaryFile("w+", encoding="utf-8", dir=directory)
+    for row in rows:
+        run.write(json.dumps(row))
+        run.write("\n")
+    run.seek(0)
+
+    return run
+
+
+def _read_run(run: IO[str]) -> Iterator[tuple[str, int, list[str]]]:
+    for line in run:
+        claim_id, row_line, row = json.loads(line)
+        yield claim_id, row_line, row
+
+
+def _sorted_groups(
+    rows: Iterator[Row],
+    claim_id_index: int,
+    max_rows_in_memory: int,
+    spill_dir: str | None,
+) -> Iterator[list[Row]]:
+    """
+    Groups rows by claim ID wherever they are in the file. Rows are sorted in memory
+    `max_rows_in_memory` at a time, spilling each sorted run to a temporary file, and the runs are
+    merged. Claims come out in order of claim ID, with their rows in file order.
+    """
+
+    def key(row: tuple[str, int, list[str]]) -> tuple[str, int]:
+        return row[0], row[1]
+
+    with contextlib.ExitStack() as stack:
+        runs: list[IO[str]] = []
+        buffer: list[tuple[str, int, list[str]]] = []
+
+        for line, row in rows:
+            buffer.append((row[claim_id_index], line, row))
+            if len(buffer) >= max_rows_in_memory:
+                buffer.sort(key=key)
+                runs.append(stack.enter_context(_spill(buffer, spill_dir)))
+                buffer = []
+
+        buffer.sort(key=key)
+        merged = heapq.merge(*(_read_run(run) for run in runs), buffer, key=key)
+
+        for _, group in itertools.groupby(merged, key=lambda row: row[0]):
+            yield [(line, row) for _, line, row in group]
+
+
+def read_claims_csv(
+    source: Source,
+    layout: CSVLayout,
+    on_error: Callable[[FlatFileError], None] | None = None,
+    contiguous: bool = True,
+    max_rows_in_memory: int = 100_000,
+    spill_dir: str | None = None,
+    encoding: str = "utf-8",
+) -> Iterator[Claim]:
+    """
+    Yields the claims in a CSV file with a header row and one row per service line. The claim's
+    fields are read from its first row, and each row adds a service.
+
+    With `contiguous` (the default), each claim's rows must be next to each other, and claims are
+    yielded in file order as soon as their last row is read. Otherwise rows are grouped by claim ID
+    wherever they are, holding at most `max_rows_in_memory` rows in memory and spilling the rest to
+    temporary files in `spill_dir`. Claims are then yielded in order of claim ID.
+
+    A claim which isn't valid raises `FlatFileError`, unless `on_error` is given, in which case
+    it's called with the error and reading carries on with the next claim.
+    """
+
+    with open_text(source, encoding) as f:
+        reader = csv.reader(f, delimiter=layout.delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        builder = _ClaimBuilder(layout, [column.strip() for column in header])
+        rows = _rows(reader, lambda: reader.line_num)
+
+        if contiguous:
+            groups = _contiguous_groups(rows, builder.claim_id_index)
+        else:
+            groups = _sorted_groups(
+                rows, builder.claim_id_index, max_rows_in_memory, spill_dir
+            )
+
+        for group in groups:
+            try:
+                yield builder.build(group)
+            except FlatFileError as e:
+                if on_error is None:
+                    raise
+                on_error(e)
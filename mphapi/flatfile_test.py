@@ -0,0 +1,109 @@
+import io
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pydantic import ValidationError
+
+from .claim import FormType, SexType
+from .flatfile import CSVLayout, FlatFileError, read_claims_csv
+
+layout = CSVLayout(
+    columns={
+        "claim_id": "CLAIM_NO",
+        "npi": "BILLING_NPI",
+        "provider_zip": "PROV_ZIP",
+        "form_type": "FORM",
+        "bill_type_or_pos": "POS",
+        "patient_date_of_birth": "DOB",
+        "patient_sex": "SEX",
+        "principal_diagnosis": "DX1",
+        "other_diagnoses": ["DX2", "DX3"],
+        "services.line_number": "LINE",
+        "services.procedure_code": "CPT",
+        "services.procedure_modifiers": ["MOD1", "MOD2"],
+        "services.date_from": "FROM_DATE",
+        "services.date_through": "TO_DATE",
+        "services.billed_amount": "CHARGE",
+        "services.quantity": "UNITS",
+        "services.provider.npi": "RENDERING_NPI",
+    },
+    date_format="%m/%d/%Y",
+)
+
+
+def test_read_claims(testdata_dir: Path):
+    claims = list(read_claims_csv(testdata_dir.joinpath("claims.csv"), layout))
+    assert [claim.claim_id for claim in claims] == ["1234", "5678", "9012"]
+
+    claim = claims[0]
+    assert claim.npi == "1679184618"
+    assert claim.form_type == FormType.HCFA
+    assert claim.patient_sex == SexType.MALE
+    assert str(claim.patient_date_of_birth) == "19600115"
+    assert claim.principal_diagnosis is not None
+    assert claim.principal_diagnosis.code == "E113293"
+    assert [diagnosis.code for diagnosis in claim.other_diagnoses or []] == ["Z794"]
+
+    first, second = claims[1].services
+    assert first.procedure_modifiers == ["25"]
+    assert first.provider is None
+    assert (str(second.date_from), str(second.date_through)) == ("20221102", "20221103")
+    assert second.billed_amount == 100
+    assert second.provider is not None
+    assert second.provider.npi == "1003000126"
+
+    assert claims[2].services[0].procedure_modifiers == ["25", "59"]
+
+
+def test_out_of_order(read_testdata: Callable[[str], str], tmp_path: Path):
+    header, *rows = read_testdata("claims.csv").strip().splitlines()
+    shuffled = "\n".join([header, rows[2], rows[0], rows[4], rows[1]])
+
+    # Contiguous grouping splits a claim whose rows aren't next to each other.
+    claims = read_claims_csv(io.StringIO(shuffled), layout)
+    assert [claim.claim_id for claim in claims] == ["5678", "1234", "9012", "5678"]
+
+    claims = list(
+        read_claims_csv(
+            io.StringIO(shuffled),
+            layout,
+            contiguous=False,
+            max_rows_in_memory=1,
+            spill_dir=str(tmp_path),
+        )
+    )
+    assert [claim.claim_id for claim in claims] == ["1234", "5678", "9012"]
+    assert [service.line_number for service in claims[1].services] == ["2", "1"]
+
+    # Spilled runs are removed once read.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_errors(read_testdata: Callable[[str], str]):
+    content = read_testdata("claims.csv").replace("11/01/2022", "2022-11-01")
+
+    with pytest.raises(FlatFileError, match="line 3: invalid claim '5678'"):
+        list(read_claims_csv(io.StringIO(content), layout))
+
+    errors: list[FlatFileError] = []
+    claims = read_claims_csv(io.StringIO(content), layout, on_error=errors.append)
+    assert [claim.claim_id for claim in claims] == ["1234", "9012"]
+    assert [error.line for error in errors] == [3]
+
+    with pytest.raises(FlatFileError, match="missing columns NPI"):
+        list(
+            read_claims_csv(
+                io.StringIO("CLAIM_NO\n1\n"),
+                CSVLayout(columns={"claim_id": "CLAIM_NO", "npi": "NPI"}),
+            )
+        )
+
+    with pytest.raises(ValidationError, match="list of columns"):
+        CSVLayout(columns={"claim_id": "ID", "other_diagnoses": "DX2"})
+
+    with pytest.raises(ValidationError, match="no field 'cpt'"):
+        CSVLayout(columns={"claim_id": "ID", "services.cpt": "CPT"})
+
+    with pytest.raises(ValidationError, match="claim_id"):
+        CSVLayout(columns={"npi": "NPI"})
@@ -0,0 +1,170 @@
+"""
+Hedged requests: when a request is slower than usual, a duplicate is sent and whichever finishes
+first is used. This trades a little extra load for much lower tail latency.
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from pydantic import BaseModel, Field
+
+from .fields import deferred_model_config
+
+
+class HedgePolicy(BaseModel):
+    """HedgePolicy configures when `Client` sends a duplicate of a slow request"""
+
+    model_config = deferred_model_config
+
+    percentile: float = Field(default=95, gt=0, lt=100)
+    """A duplicate is sent once a request has taken longer than this percentile of recent ones"""
+
+    max_extra_load: float = Field(default=0.05, ge=0)
+    """At most this fraction of requests are duplicated (e.g. 0.05 adds at most 5% load)"""
+
+    min_delay_seconds: float = 0.005
+    """Duplicates are never sent sooner than this"""
+
+    min_samples: int = 20
+    """Requests aren't duplicated until this many latencies have been seen for the endpoint"""
+
+    window: int = 1000
+    """Number of recent latencies per endpoint the percentile is taken over"""
+
+    max_threads: int = 32
+    """Maximum number of requests in flight at once for hedged calls"""
+
+
+class _LatencyWindow:
+    """The most recent latencies of an endpoint, with a cached percentile."""
+
+    def __init__(self, size: int):
+        self.latencies: collections.deque[float] = collections.deque(maxlen=size)
+        self.threshold: float | None = None
+        self.stale = 0
+
+    def observe(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+        self.stale += 1
+
+    def percentile(self, percentile: float) -> float:
+        # Sorting the window is cheap but not free, so it's only redone every so often.
+        if self.threshold is None or self.stale > len(self.latencies) // 10:
+            ordered = sorted(self.latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+            self.threshold = ordered[index]
+            self.stale = 0
+
+        return self.threshold
+
+
+class Hedger:
+    """
+    Hedger runs requests, sending a duplicate of any that's slower than the policy allows. Requests
+    which have already started can't be interrupted, so the slower of the two finishes in the
+    background and its result is discarded.
+    """
+
+    policy: HedgePolicy
+    calls: int
+    """Number of calls run"""
+    hedges: int
+    """Number of calls a duplicate was sent for"""
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self.calls = 0
+        self.hedges = 0
+
+        self._lock = threading.Lock()
+        self._windows: dict[str, _LatencyWindow] = {}
+        self._threads = ThreadPoolExecutor(
+            policy.max_threads, thread_name_prefix="mphapi-hedge"
+        )
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def delay(self, key: str) -> float | None:
+        """Returns how long to wait for a request to `key` before hedging, if it may be hedged."""
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or len(window.latencies) < self.policy.min_samples:
+                return None
+
+            if self.hedges + 1 > self.policy.max_extra_load * self.calls:
+                return None
+
+            return max(
+                self.policy.min_delay_seconds, window.percentile(self.policy.percentile)
+            )
+
+    def _observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _LatencyWindow(self.policy.window)
+            window.observe(seconds)
+
+    def _timed[Result](self, key: str, send: Callable[[], Result]) -> Result:
+        start = time.perf_counter()
+        result = send()
+        self._observe(key, time.perf_counter() - start)
+
+        return result
+
+    def run[Result](
+        self,
+        key: str,
+        send: Callable[[], Result],
+        is_success: Callable[[Result], bool],
+    ) -> tuple[Result, bool]:
+        """
+        Calls `send`, calling it again concurrently if the first call is slow, and returns the
+        first successful result along with whether a duplicate was sent. If neither succeeds, the
+        first failure is returned or raised.
+        """
+
+        with self._lock:
+            self.calls += 1
+
+        delay = self.delay(key)
+        if delay is None:
+            return self._timed(key, send), False
+
+        primary = self._threads.submit(self._timed, key, send)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result(), False
+
+        # Check the budget again since other threads may have hedged in the meantime.
+        with self._lock:
+            if self.hedges + 1 > self.policy.max_extra_load * self.calls:
+                hedge = None
+            else:
+                self.hedges += 1
+                hedge = self._threads.submit(self._timed, key, send)
+
+        if hedge is None:
+            return primary.result(), False
+
+        pending: set[Future[Result]] = {primary, hedge}
+        first_failure: Future[Result] | None = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and is_success(future.result()):
+                    for other in pending:
+                        other.cancel()
+                    return future.result(), True
+
+                if first_failure is None:
+                    first_failure = future
+
+        assert first_failure is not None
+        return first_failure.result(), True
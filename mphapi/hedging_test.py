@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Callable
+
+from .claim import Claim
+from .client import Client, PriceConfig
+from .hedging import HedgePolicy, Hedger
+from .stub import StubServer
+
+
+def test_hedger():
+    hedger = Hedger(HedgePolicy(min_samples=5, max_extra_load=1))
+    lock = threading.Lock()
+    calls = 0
+
+    def send() -> int:
+        nonlocal calls
+        with lock:
+            calls += 1
+            call = calls
+
+        # The first call after warming up is very slow, but its duplicate isn't.
+        time.sleep(1 if call == 11 else 0.001)
+        return call
+
+    for _ in range(10):
+        assert hedger.run("endpoint", send, lambda result: True)[1] is False
+
+    start = time.perf_counter()
+    result, hedged = hedger.run("endpoint", send, lambda result: True)
+    assert hedged
+    assert result == 12
+    assert time.perf_counter() - start < 0.5
+    assert hedger.hedges == 1
+
+    hedger.close()
+
+
+def test_hedge_budget():
+    hedger = Hedger(HedgePolicy(min_samples=5, max_extra_load=0))
+
+    for _ in range(10):
+        hedger.run("endpoint", lambda: time.sleep(0.001), lambda result: True)
+
+    _, hedged = hedger.run("endpoint", lambda: time.sleep(0.05), lambda result: True)
+    assert not hedged
+    assert hedger.hedges == 0
+
+    hedger.close()
+
+
+class SlowOnceServer(StubServer):
+    """Answers one request slowly, and the rest right away."""
+
+    def __init__(self, slow_request: int):
+        super().__init__()
+        self.slow_request = slow_request
+        self.slow_request_done = threading.Event()
+        self._requests = 0
+        self._requests_lock = threading.Lock()
+
+    def handle(self, path: str, body: bytes) -> tuple[int, bytes]:
+        with self._requests_lock:
+            self._requests += 1
+            request = self._requests
+
+        if request != self.slow_request:
+            return super().handle(path, body)
+
+        try:
+            time.sleep(1)
+            return super().handle(path, body)
+        finally:
+            self.slow_request_done.set()
+
+
+def test_hedged_price(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with SlowOnceServer(slow_request=21) as server:
+        with Client(
+            "api-key",
+            api_url=server.url,
+            hedging=HedgePolicy(min_samples=5, min_delay_seconds=0.25),
+        ) as client:
+            for i in range(40):
+                start = time.perf_counter()
+                assert client.price(PriceConfig(), claim).claim_id == claim.claim_id
+                if i == 20:
+                    assert time.perf_counter() - start < 1
+
+            stats = client.stats().endpoints["/v1/medicare/price/claim"]
+            assert stats.requests == 40
+            assert stats.hedged_requests == 1
+
+        # The slow request finishes in the background after its duplicate has answered.
+        assert server.slow_request_done.wait(5)
+        assert server.request_count == 41
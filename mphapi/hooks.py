@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass
+class RequestEvent:
+    """
+    RequestEvent describes a single HTTP request made by `Client` and how long each phase of it
+    took. All durations are in seconds.
+    """
+
+    method: str
+    """HTTP method of the request"""
+
+    url: str
+    """Full URL the request was sent to"""
+
+    endpoint: str
+    """Path of the endpoint (e.g. /v1/medicare/price/claims)"""
+
+    claim_count: int
+    """Number of claims (or other inputs) in the request body"""
+
+    request_bytes: int
+    """Size of the serialized request body"""
+
+    response_bytes: int = 0
+    """Size of the response body"""
+
+    status_code: int | None = None
+    """HTTP status of the response, if one was received"""
+
+    serialize_seconds: float = 0
+    """Time spent serializing the request body"""
+
+    connect_seconds: float = 0
+    """Time spent opening a connection (including TLS). Zero when a pooled connection was reused"""
+
+    ttfb_seconds: float = 0
+    """Time from sending the request until the response headers arrived, excluding connecting"""
+
+    download_seconds: float = 0
+    """Time spent reading the response body"""
+
+    decode_seconds: float = 0
+    """Time spent decoding and validating the response body"""
+
+    total_seconds: float = 0
+    """Time for the whole request, from serializing to decoding"""
+
+    error: BaseException | None = None
+    """The error raised by the request, if it failed"""
+
+    hedged: bool = False
+    """
+    Whether a duplicate request was sent because this one was slow (see `HedgePolicy`). Timings
+    are of whichever request finished first, and connect time isn't measured.
+    """
+
+
+Hook = Callable[[RequestEvent], None]
+"""
+A Hook is called with a RequestEvent after every request made by `Client`, whether it succeeded
+or not. Hooks run on the thread that made the request, so they should be quick and must not raise.
+"""
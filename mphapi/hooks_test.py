@@ -0,0 +1,58 @@
+from typing import Callable
+
+import pytest
+
+from .claim import Claim
+from .client import Client, PriceConfig
+from .hooks import RequestEvent
+from .response import GatewayError
+from .stub import Latency, StubConfig, StubServer
+
+
+def test_request_events(load_claim: Callable[[str], Claim]):
+    claims = [load_claim("hcfa"), load_claim("outpatient")]
+    events: list[RequestEvent] = []
+
+    with StubServer(StubConfig(latency=Latency(seconds=0.05))) as server:
+        with Client("api-key", api_url=server.url, hooks=[events.append]) as client:
+            client.price(PriceConfig(), claims[0])
+            client.price_batch(PriceConfig(), *claims)
+
+    assert [event.endpoint for event in events] == [
+        "/v1/medicare/price/claim",
+        "/v1/medicare/price/claims",
+    ]
+    assert [event.claim_count for event in events] == [1, 2]
+
+    for event in events:
+        assert event.error is None
+        assert event.status_code == 200
+        assert event.request_bytes > 0
+        assert event.response_bytes > 0
+        assert event.ttfb_seconds >= 0.05
+        assert event.total_seconds >= (
+            event.serialize_seconds
+            + event.connect_seconds
+            + event.ttfb_seconds
+            + event.download_seconds
+            + event.decode_seconds
+        )
+
+    # The second request reuses the first request's connection.
+    assert events[0].connect_seconds > 0
+    assert events[1].connect_seconds == 0
+
+
+def test_request_event_errors(load_claim: Callable[[str], Claim]):
+    events: list[RequestEvent] = []
+
+    with StubServer(StubConfig(throttle_rate=1)) as server:
+        client = Client("api-key", api_url=server.url)
+        client.add_hook(events.append)
+
+        with pytest.raises(GatewayError):
+            client.price(PriceConfig(), load_claim("hcfa"))
+
+    assert len(events) == 1
+    assert events[0].status_code == 429
+    assert isinstance(events[0].error, GatewayError)
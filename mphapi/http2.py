@@ -0,0 +1,154 @@
+"""
+An HTTP/2 alternative to the default `requests` transport, which multiplexes concurrent requests over
+a few connections instead of opening a connection for each. Requires the `http2` extra
+(`pip install 'mphapi[http2]'`), which installs httpx.
+"""
+
+import time
+from typing import TYPE_CHECKING, Any, Iterator, Mapping
+
+import requests
+
+from .transport import Timeout, record_connect_seconds
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _import_httpx() -> Any:
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError(
+            "HTTP/2 support requires the http2 extra: pip install 'mphapi[http2]'"
+        ) from e
+
+    return httpx
+
+
+class _ConnectTrace:
+    """Records the time spent connecting (including TLS) like the default transport does."""
+
+    def __init__(self):
+        self.started: float | None = None
+
+    def __call__(self, event: str, info: dict[str, Any]) -> None:
+        if event in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self.started = time.perf_counter()
+        elif self.started is not None and (
+            event.startswith("connection.connect_tcp.")
+            or event.startswith("connection.start_tls.")
+        ):
+            record_connect_seconds(time.perf_counter() - self.started)
+            self.started = None
+
+
+def _translate(error: Exception) -> Exception:
+    """Converts an httpx error into the `requests` error the default transport would raise."""
+
+    httpx = _import_httpx()
+
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.ConnectTimeout(str(error))
+    if isinstance(error, httpx.TimeoutException):
+        return requests.ReadTimeout(str(error))
+    if isinstance(error, httpx.TransportError):
+        return requests.ConnectionError(str(error))
+
+    return error
+
+
+class HTTP2Response:
+    """HTTP2Response is a `TransportResponse` received with httpx."""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+        self._content: bytes | None = None
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self._response.headers
+
+    @property
+    def http_version(self) -> str:
+        return self._response.http_version
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            try:
+                self._content = self._response.read()
+            except Exception as e:
+                raise _translate(e) from e
+            finally:
+                self._response.close()
+
+        return self._content
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except Exception as e:
+            raise _translate(e) from e
+        finally:
+            self._response.close()
+
+    def close(self) -> None:
+        self._response.close()
+
+
+class HTTP2Transport:
+    """
+    HTTP2Transport sends requests over HTTP/2 where the server supports it (negotiated with TLS
+    ALPN, so plain `http://` URLs still use HTTP/1.1). Concurrent requests share up to
+    `max_connections` connections. httpx errors are raised as the `requests` exceptions the default
+    transport raises, so errors and timeouts are handled the same way.
+    """
+
+    def __init__(self, max_connections: int = 10):
+        httpx = _import_httpx()
+
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: bytes,
+        headers: Mapping[str, str],
+        timeout: Timeout | None = None,
+    ) -> HTTP2Response:
+        httpx = _import_httpx()
+
+        connect_timeout, read_timeout = timeout or (None, None)
+        request = self._client.build_request(
+            method,
+            url,
+            content=data,
+            headers=headers,
+            timeout=httpx.Timeout(
+                connect=connect_timeout,
+                read=read_timeout,
+                write=read_timeout,
+                pool=connect_timeout,
+            ),
+            extensions={"trace": _ConnectTrace()},
+        )
+
+        try:
+            return HTTP2Response(self._client.send(request, stream=True))
+        except Exception as e:
+            raise _translate(e) from e
+
+    def close(self) -> None:
+        self._client.close()
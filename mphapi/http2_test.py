@@ -0,0 +1,174 @@
+import socket
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import pytest
+import requests
+
+from .claim import Claim
+from .client import Client, PriceConfig
+from .deadline import DeadlineExceeded
+from .http2 import HTTP2Transport
+from .stub import Latency, StubAPI, StubConfig, StubServer
+
+pytest.importorskip("httpx")
+h2 = pytest.importorskip("h2.connection")
+h2_config = pytest.importorskip("h2.config")
+h2_events = pytest.importorskip("h2.events")
+
+
+def unused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+class H2Server:
+    """
+    A TLS server which only speaks HTTP/2 and answers with a `StubAPI`, counting the connections
+    made to it. `cert` holds the key and a self-signed certificate for 127.0.0.1.
+    """
+
+    def __init__(self, cert: Path):
+        self.api = StubAPI()
+        self.connections = 0
+        self._lock = threading.Lock()
+
+        self._context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._context.load_cert_chain(cert)
+        self._context.set_alpn_protocols(["h2"])
+
+        self._socket = socket.create_server(("127.0.0.1", 0))
+        self.url = f"https://127.0.0.1:{self._socket.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self) -> None:
+        self._socket.shutdown(socket.SHUT_RDWR)
+        self._socket.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+
+            threading.Thread(
+                target=self._serve, args=(connection,), daemon=True
+            ).start()
+
+    def _serve(self, connection: socket.socket) -> None:
+        try:
+            with self._context.wrap_socket(connection, server_side=True) as tls:
+                if tls.selected_alpn_protocol() != "h2":
+                    return
+
+                with self._lock:
+                    self.connections += 1
+
+                self._serve_h2(tls)
+        except (OSError, ssl.SSLError):
+            pass
+
+    def _serve_h2(self, tls: ssl.SSLSocket) -> None:
+        conn = h2.H2Connection(h2_config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        tls.sendall(conn.data_to_send())
+
+        paths: dict[int, str] = {}
+        bodies: dict[int, bytes] = {}
+        while data := tls.recv(65536):
+            for event in conn.receive_data(data):
+                if isinstance(event, h2_events.RequestReceived):
+                    headers = dict(event.headers)
+                    paths[event.stream_id] = headers[b":path"].decode()
+                    bodies[event.stream_id] = b""
+                elif isinstance(event, h2_events.DataReceived):
+                    bodies[event.stream_id] += event.data
+                    conn.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, h2_events.StreamEnded):
+                    stream_id = event.stream_id
+                    status, content = self.api.handle(
+                        paths.pop(stream_id), bodies.pop(stream_id)
+                    )
+                    conn.send_headers(
+                        stream_id,
+                        [
+                            (":status", str(status)),
+                            ("content-type", "application/json"),
+                            ("content-length", str(len(content))),
+                        ],
+                    )
+                    size = conn.max_outbound_frame_size
+                    for i in range(0, len(content), size):
+                        conn.send_data(stream_id, content[i : i + size])
+                    conn.end_stream(stream_id)
+
+            tls.sendall(conn.data_to_send())
+
+
+def test_price(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with StubServer() as server:
+        with Client("api-key", api_url=server.url, http2=True) as client:
+            assert isinstance(client.transport, HTTP2Transport)
+
+            with ThreadPoolExecutor(4) as executor:
+                pricings = list(
+                    executor.map(lambda _: client.price(PriceConfig(), claim), range(8))
+                )
+            assert all(pricing.claim_id == claim.claim_id for pricing in pricings)
+
+            results = client.price_batch(PriceConfig(), claim, claim)
+            assert len(results) == 2
+
+            stats = client.stats().endpoints["/v1/medicare/price/claim"]
+            assert stats.requests == 8
+            assert stats.other_errors == 0
+
+
+def test_shared_connection(
+    load_claim: Callable[[str], Claim],
+    testdata_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cert = testdata_dir.joinpath("localhost.pem")
+    monkeypatch.setenv("SSL_CERT_FILE", str(cert))
+    claim = load_claim("hcfa")
+    server = H2Server(cert)
+
+    try:
+        with Client("api-key", api_url=server.url, http2=True) as client:
+            with ThreadPoolExecutor(4) as executor:
+                pricings = list(
+                    executor.map(lambda _: client.price(PriceConfig(), claim), range(8))
+                )
+            assert all(pricing.claim_id == claim.claim_id for pricing in pricings)
+
+            results = client.price_batch(PriceConfig(), claim, claim)
+            assert len(results) == 2
+    finally:
+        server.close()
+
+    # The server only answers HTTP/2, and every request was multiplexed over one connection.
+    assert server.api.request_count == 9
+    assert server.connections == 1
+
+
+def test_errors(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+
+    with Client("api-key", api_url=unused_url(), http2=True) as client:
+        with pytest.raises(requests.ConnectionError):
+            client.price(PriceConfig(), claim)
+
+    with StubServer(StubConfig(latency=Latency(seconds=1))) as server:
+        with Client("api-key", api_url=server.url, http2=True) as client:
+            with pytest.raises(DeadlineExceeded):
+                client.price(PriceConfig(), claim, deadline=0.2)
@@ -0,0 +1,270 @@
+"""
+Random access to large files of newline-delimited JSON claims. The file is memory mapped and an
+index of where each claim starts and ends is built once and cached next to the file, so workers
+can split the file into exact shards, resume at any claim, and fetch claims by ID without reading
+the file again:
+
+    with ClaimFile("claims.ndjson") as claims:
+        for shard in claims.shards(8):
+            ...  # in each worker: ClaimFile("claims.ndjson").claims(shard)
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from typing import Any, Iterator, NamedTuple, Self
+
+from .claim import Claim
+
+_index_magic = b"MPHNDJSONIDX1\n"
+
+# Finds the claim ID without decoding the whole claim. Only claims have a claimID field, so the
+# first match is the claim's own.
+_claim_id_pattern = re.compile(rb'"claimID"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+class ClaimIndex(NamedTuple):
+    """ClaimIndex holds where each claim in a file is along with its claim ID."""
+
+    size: int
+    """Size of the indexed file"""
+
+    mtime_ns: int
+    """Modification time of the indexed file"""
+
+    starts: array
+    """Byte offset at which each claim starts"""
+
+    ends: array
+    """Byte offset at which each claim ends, not including its line ending"""
+
+    claim_ids: list[str | None]
+    """Each claim's ID, if it has one"""
+
+
+def build_index(
+    data: bytes | mmap.mmap, size: int = 0, mtime_ns: int = 0
+) -> ClaimIndex:
+    """Indexes the non-blank lines of newline-delimited JSON claims."""
+
+    starts = array("Q")
+    ends = array("Q")
+    claim_ids: list[str | None] = []
+
+    start = 0
+    length = len(data)
+    while start < length:
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = length
+        next_start = end + 1
+
+        if end > start and data[end - 1 : end] == b"\r":
+            end -= 1
+        if data[start:end].strip():
+            starts.append(start)
+            ends.append(end)
+            match = _claim_id_pattern.search(data, start, end)
+            claim_ids.append(None if match is None else json.loads(match.group(1)))
+
+        start = next_start
+
+    return ClaimIndex(size, mtime_ns, starts, ends, claim_ids)
+
+
+def _write_index(path: str, index: ClaimIndex) -> None:
+    header = {
+        "size": index.size,
+        "mtimeNs": index.mtime_ns,
+        "count": len(index.starts),
+        "byteorder": sys.byteorder,
+    }
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_index_magic)
+            f.write(json.dumps(header).encode())
+            f.write(b"\n")
+            index.starts.tofile(f)
+            index.ends.tofile(f)
+            f.write(json.dumps(index.claim_ids).encode())
+        os.replace(temp_path, path)
+    except OSError:
+        # The index is only a cache, so a read-only directory just means it's rebuilt next time.
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _read_index(path: str, size: int, mtime_ns: int) -> ClaimIndex | None:
+    """Reads a cached index, or returns None if there isn't one for this version of the file."""
+
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(_index_magic)) != _index_magic:
+                return None
+
+            header = json.loads(f.readline())
+            if header["size"] != size or header["mtimeNs"] != mtime_ns:
+                return None
+
+            starts = array("Q")
+            ends = array("Q")
+            starts.fromfile(f, header["count"])
+            ends.fromfile(f, header["count"])
+            if header["byteorder"] != sys.byteorder:
+                starts.byteswap()
+                ends.byteswap()
+
+            claim_ids: list[str | None] = json.loads(f.read())
+    except (OSError, EOFError, ValueError, KeyError):
+        return None
+
+    if len(claim_ids) != len(starts):
+        return None
+
+    return ClaimIndex(size, mtime_ns, starts, ends, claim_ids)
+
+
+class ClaimFile:
+    """
+    ClaimFile is a memory-mapped file of newline-delimited JSON claims. Claims are numbered from 0
+    in file order, skipping blank lines, and are decoded straight from the mapped file when
+    they're read.
+
+    The index is cached at `index_path` (the file's path with `.idx` added by default) and rebuilt
+    whenever the file's size or modification time changes. Pass `cache_index=False` to keep it in
+    memory only.
+    """
+
+    path: str
+    index_path: str
+    index: ClaimIndex
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        index_path: str | os.PathLike[str] | None = None,
+        cache_index: bool = True,
+    ):
+        self.path = os.fspath(path)
+        self.index_path = (
+            f"{self.path}.idx" if index_path is None else os.fspath(index_path)
+        )
+
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        # Empty files can't be mapped, but then there's nothing to read anyway.
+        self._data: bytes | mmap.mmap = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if stat.st_size
+            else b""
+        )
+        self._positions: dict[str, int] | None = None
+
+        index = (
+            _read_index(self.index_path, stat.st_size, stat.st_mtime_ns)
+            if cache_index
+            else None
+        )
+        if index is None:
+            index = build_index(self._data, stat.st_size, stat.st_mtime_ns)
+            if cache_index:
+                _write_index(self.index_path, index)
+        self.index = index
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index.starts)
+
+    def __getitem__(self, position: int) -> Claim:
+        return Claim.model_validate_json(self.record(position))
+
+    def record(self, position: int) -> bytes:
+        """Returns the JSON of the claim at a position."""
+
+        return self._data[self.index.starts[position] : self.index.ends[position]]
+
+    def offset(self, position: int) -> int:
+        """Returns the byte offset at which the claim at a position starts."""
+
+        return self.index.starts[position]
+
+    def position(self, claim_id: str) -> int | None:
+        """Returns the position of the first claim with an ID, or None if there isn't one."""
+
+        if self._positions is None:
+            positions: dict[str, int] = {}
+            for position, id_ in enumerate(self.index.claim_ids):
+                if id_ is not None:
+                    positions.setdefault(id_, position)
+            self._positions = positions
+
+        return self._positions.get(claim_id)
+
+    def get(self, claim_id: str) -> Claim | None:
+        """Returns the first claim with an ID, or None if there isn't one."""
+
+        position = self.position(claim_id)
+        return None if position is None else self[position]
+
+    def records(self, positions: range | None = None) -> Iterator[bytes]:
+        """Yields the JSON of the claims at `positions`, or of every claim."""
+
+        if positions is None:
+            positions = range(len(self))
+
+        for position in positions:
+            yield self.record(position)
+
+    def claims(self, positions: range | None = None) -> Iterator[Claim]:
+        """
+        Yields the claims at `positions`, or every claim. Pass a range starting part way through
+        to resume from a claim, or one of `shards` to read a worker's share of the file.
+        """
+
+        for record in self.records(positions):
+            yield Claim.model_validate_json(record)
+
+    def shards(self, count: int) -> list[range]:
+        """
+        Splits the claims into up to `count` consecutive ranges of positions holding about the same
+        number of bytes. Use `offset` to turn a range into the exact bytes it covers.
+        """
+
+        total = len(self)
+        if total == 0:
+            return []
+
+        size = self.index.ends[-1] - self.index.starts[0]
+        shards: list[range] = []
+        start = 0
+        for i in range(1, count + 1):
+            # The first claim starting at or after this shard's share of the bytes begins the next.
+            target = self.index.starts[0] + size * i // count
+            stop = (
+                total
+                if i == count
+                else max(start, bisect.bisect_left(self.index.starts, target))
+            )
+            if stop > start:
+                shards.append(range(start, stop))
+                start = stop
+
+        return shards
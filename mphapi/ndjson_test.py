@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+from typing import Callable
+
+from .ndjson import ClaimFile, build_index
+
+
+def test_claim_file(
+    numbered_claim_records: Callable[[int], list[bytes]], tmp_path: Path
+):
+    claims = numbered_claim_records(20)
+    path = tmp_path.joinpath("claims.ndjson")
+    # Blank lines are skipped, and CRLF line endings and a missing final newline are allowed.
+    path.write_bytes(b"\n".join(claims[:10]) + b"\n\n" + b"\r\n".join(claims[10:]))
+
+    with ClaimFile(path) as claim_file:
+        assert len(claim_file) == 20
+        assert claim_file.record(10) == claims[10]
+        assert claim_file.record(19) == claims[19]
+        assert claim_file.offset(1) == len(claims[0]) + 1
+        assert claim_file[3].claim_id == "3"
+
+        assert claim_file.position("12") == 12
+        claim = claim_file.get("12")
+        assert claim is not None and claim.claim_id == "12"
+        assert claim_file.get("missing") is None
+
+        assert [claim.claim_id for claim in claim_file.claims(range(17, 20))] == [
+            "17",
+            "18",
+            "19",
+        ]
+        assert list(claim_file.records(range(0))) == []
+
+        # Shards cover every claim exactly once.
+        shards = claim_file.shards(6)
+        assert len(shards) == 6
+        assert [position for shard in shards for position in shard] == list(range(20))
+
+    assert os.path.exists(f"{path}.idx")
+
+
+def test_cached_index(
+    numbered_claim_records: Callable[[int], list[bytes]], tmp_path: Path
+):
+    claims = numbered_claim_records(5)
+    path = tmp_path.joinpath("claims.ndjson")
+    path.write_bytes(b"\n".join(claims) + b"\n")
+
+    with ClaimFile(path) as claim_file:
+        index = claim_file.index
+
+    # The cached index is used while the file is unchanged...
+    with ClaimFile(path) as claim_file:
+        assert claim_file.index == index
+
+    # ...and rebuilt once it changes.
+    path.write_bytes(b"\n".join(claims[:3]) + b"\n")
+    with ClaimFile(path) as claim_file:
+        assert claim_file.index.claim_ids == ["0", "1", "2"]
+
+    # A corrupt index is ignored.
+    Path(f"{path}.idx").write_bytes(b"garbage")
+    with ClaimFile(path) as claim_file:
+        assert len(claim_file) == 3
+
+
+def test_build_index():
+    data = b'{"services": [], "claimID": "a\\"b"}\n{"npi": "1"}\n   \n'
+    index = build_index(data)
+    assert list(index.starts) == [0, 36]
+    assert list(index.ends) == [35, 48]
+    assert index.claim_ids == ['a"b', None]
+
+    empty = build_index(b"")
+    assert len(empty.starts) == 0
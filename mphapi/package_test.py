@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from pathlib import Path
+
+script = """
+import sys
+
+import mphapi
+
+assert "mphapi.pricing" not in sys.modules
+assert mphapi.pricing.Pricing is mphapi.Pricing
+assert mphapi.client.Client is mphapi.Client
+assert mphapi.stub.StubServer is not None
+
+try:
+    mphapi.missing
+except AttributeError:
+    pass
+else:
+    raise AssertionError("mphapi.missing exists")
+"""
+
+
+def test_submodule_attributes():
+    # A fresh interpreter, since other tests have already imported the submodules.
+    subprocess.run(
+        [sys.executable, "-c", script], cwd=Path(__file__).parent.parent, check=True
+    )
@@ -0,0 +1,248 @@
+import atexit
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Iterator, Self
+
+# Only one cProfile profiler can be enabled at a time, so starting a profiler pauses the one
+# running before it until it stops.
+_active_lock = threading.Lock()
+_active: list["Profiler"] = []
+"""Running profilers, innermost last"""
+
+_shared_lock = threading.Lock()
+_shared: "Profiler | None" = None
+_shared_users = 0
+
+
+class PhaseStats:
+    """PhaseStats accumulates the cost of every run of a single phase."""
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.allocated_bytes = 0
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "allocated_bytes": self.allocated_bytes,
+        }
+
+
+class Profiler:
+    """
+    Profiler captures a CPU profile (cProfile) and allocation samples (tracemalloc) for a job, and
+    attributes wall time, CPU time, and allocations to named phases of the job.
+
+    `Client` marks its own phases (serialization, network, and decode). Callers can mark theirs
+    (e.g. claim building or result handling) with `phase`.
+
+    When stopped, the reports are written to a new directory under `output_dir`:
+
+    - `cpu.pstats`: the CPU profile, readable with `pstats` or tools like snakeviz
+    - `cpu.txt`: the functions with the highest cumulative time
+    - `allocations.txt`: the lines which allocated the most memory still in use at the end
+    - `phases.json`: the calls, wall time, CPU time, and net allocations of each phase
+
+    cProfile records every thread on Python 3.12+. CPU time is measured per thread, but allocations
+    are process-wide, so allocations of a phase include those made by other threads meanwhile.
+
+    Profilers can be nested: starting one while another is running pauses the CPU profile of the
+    other until the new one stops.
+    """
+
+    output_dir: Path
+    name: str
+    report_dir: Path | None
+    """The directory the reports were written to, once stopped"""
+
+    def __init__(
+        self,
+        output_dir: str | os.PathLike[str],
+        name: str = "job",
+        trace_frames: int = 10,
+        top: int = 50,
+    ):
+        """
+        Parameters
+        ----------
+        output_dir
+            Directory the reports are written under.
+        name
+            Prefix of the report directory.
+        trace_frames
+            Number of frames tracemalloc records for each allocation.
+        top
+            Number of entries in the text reports.
+        """
+
+        self.output_dir = Path(output_dir)
+        self.name = name
+        self.report_dir = None
+
+        self._trace_frames = trace_frames
+        self._top = top
+        self._profile = cProfile.Profile()
+        self._phases: dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> Self:
+        if self._running:
+            raise Exception("Profiler is already running")
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._trace_frames)
+            self._started_tracemalloc = True
+
+        with _active_lock:
+            if _active:
+                _active[-1]._profile.disable()
+            self._profile.enable()
+            _active.append(self)
+        self._running = True
+
+        return self
+
+    def stop(self) -> Path:
+        """Stops profiling and writes the reports, returning the directory they were written to."""
+
+        if not self._running:
+            raise Exception("Profiler is not running")
+
+        with _active_lock:
+            innermost = _active[-1] is self
+            _active.remove(self)
+            if innermost:
+                self._profile.disable()
+                if _active:
+                    _active[-1]._profile.enable()
+
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                self._started_tracemalloc = False
+                if _active:
+                    # Leave tracing on for the profilers still running.
+                    _active[0]._started_tracemalloc = True
+                else:
+                    tracemalloc.stop()
+        self._running = False
+
+        report_dir = self.output_dir.joinpath(
+            f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        )
+        report_dir.mkdir(parents=True, exist_ok=True)
+
+        self._profile.dump_stats(report_dir.joinpath("cpu.pstats"))
+
+        cpu = io.StringIO()
+        pstats.Stats(self._profile, stream=cpu).sort_stats("cumulative").print_stats(
+            self._top
+        )
+        report_dir.joinpath("cpu.txt").write_text(cpu.getvalue())
+
+        allocations = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        ).statistics("lineno")
+        report_dir.joinpath("allocations.txt").write_text(
+            "\n".join(str(statistic) for statistic in allocations[: self._top]) + "\n"
+        )
+
+        with self._lock:
+            phases = {name: stats.to_json() for name, stats in self._phases.items()}
+        report_dir.joinpath("phases.json").write_text(json.dumps(phases, indent=4))
+
+        self.report_dir = report_dir
+
+        return report_dir
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attributes the time and allocations within the block to the named phase."""
+
+        allocated_start = tracemalloc.get_traced_memory()[0]
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.thread_time() - cpu_start
+            allocated_bytes = tracemalloc.get_traced_memory()[0] - allocated_start
+
+            with self._lock:
+                stats = self._phases.get(name)
+                if stats is None:
+                    stats = self._phases[name] = PhaseStats()
+
+                stats.calls += 1
+                stats.wall_seconds += wall_seconds
+                stats.cpu_seconds += cpu_seconds
+                stats.allocated_bytes += allocated_bytes
+
+    def phase_stats(self) -> dict[str, PhaseStats]:
+        with self._lock:
+            return dict(self._phases)
+
+
+def acquire_shared_profiler(output_dir: str | os.PathLike[str]) -> Profiler:
+    """
+    Returns the process-wide profiler used when profiling is turned on through the environment,
+    starting it for its first user. Every client shares it, so its reports cover the whole run.
+    Each call must be matched by a call to `release_shared_profiler`.
+    """
+
+    global _shared, _shared_users
+
+    with _shared_lock:
+        if _shared is None or not _shared.running:
+            if _shared is None:
+                atexit.register(_stop_shared_profiler)
+            _shared = Profiler(output_dir, name="mphapi").start()
+
+        _shared_users += 1
+        return _shared
+
+
+def release_shared_profiler() -> None:
+    """Stops the shared profiler and writes its reports once its last user releases it."""
+
+    global _shared_users
+
+    with _shared_lock:
+        _shared_users -= 1
+        if _shared_users == 0 and _shared is not None and _shared.running:
+            _shared.stop()
+
+
+def _stop_shared_profiler() -> None:
+    # Clients which are never closed still get their reports written when the process exits.
+    with _shared_lock:
+        if _shared is not None and _shared.running:
+            _shared.stop()
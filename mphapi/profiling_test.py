@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from .claim import Claim
+from .client import Client, PriceConfig, profile_dir_env
+from .stub import StubServer
+
+
+def price_claims(client: Client, load_claim: Callable[[str], Claim]) -> None:
+    for test in ["hcfa", "inpatient", "outpatient"]:
+        with client.phase("claim building"):
+            claim = load_claim(test)
+
+        client.price(PriceConfig(), claim)
+
+
+def test_profile(load_claim: Callable[[str], Claim], tmp_path: Path):
+    with StubServer() as server:
+        client = Client("api-key", api_url=server.url)
+
+        with client.profile(tmp_path, "test") as profiler:
+            price_claims(client, load_claim)
+
+    assert client.profiler is None
+    assert profiler.report_dir is not None
+    assert profiler.report_dir.parent == tmp_path
+
+    for report in ["cpu.pstats", "cpu.txt", "allocations.txt", "phases.json"]:
+        assert profiler.report_dir.joinpath(report).stat().st_size > 0
+
+    phases = json.loads(profiler.report_dir.joinpath("phases.json").read_text())
+    assert set(phases) == {"claim building", "serialization", "network", "decode"}
+    assert all(phase["calls"] == 3 for phase in phases.values())
+    assert all(phase["wall_seconds"] > 0 for phase in phases.values())
+
+
+def test_profile_from_environment(
+    load_claim: Callable[[str], Claim], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv(profile_dir_env, str(tmp_path))
+
+    with StubServer() as server:
+        with Client("api-key", api_url=server.url) as client:
+            assert client.profiler is not None
+            price_claims(client, load_claim)
+
+    assert client.profiler.report_dir is not None
+    assert client.profiler.report_dir.joinpath("phases.json").exists()
+
+
+def test_clients_share_environment_profiler(
+    load_claim: Callable[[str], Claim], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv(profile_dir_env, str(tmp_path))
+
+    with StubServer() as server:
+        first = Client("api-key", api_url=server.url)
+        second = Client("api-key", api_url=server.url)
+        assert first.profiler is second.profiler
+        profiler = first.profiler
+        assert profiler is not None
+
+        price_claims(first, load_claim)
+
+        # Profiling a block of work nests inside the environment's profiler.
+        with second.profile(tmp_path.joinpath("job")) as job:
+            price_claims(second, load_claim)
+        assert job.report_dir is not None
+        assert second.profiler is profiler
+
+        # The shared profiler's reports are written once its last client closes.
+        first.close()
+        assert profiler.running
+        second.close()
+        assert not profiler.running
+
+    assert profiler.report_dir is not None
+    phases = json.loads(profiler.report_dir.joinpath("phases.json").read_text())
+    assert phases["network"]["calls"] == 3
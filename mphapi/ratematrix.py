@@ -0,0 +1,174 @@
+"""
+Estimates Medicare rates for every combination of providers and procedure codes at once, e.g. for
+network adequacy analysis or pricing a provider directory. Results are NumPy matrices, which
+requires the `matrix` extra (`pip install 'mphapi[matrix]'`).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple, Sequence
+
+from .claim import RateSheet, RateSheetService
+from .client import Client, pack_batches, serialize_items
+from .deadline import Deadline
+
+if TYPE_CHECKING:
+    import numpy
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Rate matrices require the matrix extra: pip install 'mphapi[matrix]'"
+        ) from e
+
+    return numpy
+
+
+class RateCode(NamedTuple):
+    """RateCode is a procedure code, with any modifiers, to estimate the rate of."""
+
+    procedure_code: str
+    procedure_modifiers: tuple[str, ...] = ()
+
+    def service(self) -> RateSheetService:
+        return RateSheetService(
+            procedure_code=self.procedure_code,
+            procedure_modifiers=list(self.procedure_modifiers) or None,
+        )
+
+
+class RateMatrixFailure(NamedTuple):
+    """RateMatrixFailure describes rates which couldn't be estimated."""
+
+    providers: list[int]
+    """Rows of the providers whose rates are missing"""
+
+    codes: list[int]
+    """Columns of the codes whose rates are missing"""
+
+    error: str
+    """Why the rates couldn't be estimated"""
+
+
+class RateMatrix(NamedTuple):
+    """
+    RateMatrix holds the estimated rates of each provider (rows) for each code (columns). Rates
+    which couldn't be estimated are NaN, and are described in `failures`.
+    """
+
+    providers: list[RateSheet]
+    codes: list[RateCode]
+
+    medicare_amounts: "numpy.ndarray"
+    """Estimated Medicare amount of each provider and code"""
+
+    medicare_std_devs: "numpy.ndarray"
+    """Standard deviation of each estimated Medicare amount"""
+
+    failures: list[RateMatrixFailure]
+
+
+class _Sheet(NamedTuple):
+    """A rate sheet sent for a provider and some of the codes, with where its results go."""
+
+    rows: list[int]
+    columns: list[list[int]]
+    """The columns of the code of each service"""
+    rate_sheet: RateSheet
+
+
+def estimate_rate_matrix(
+    client: Client,
+    providers: Sequence[RateSheet],
+    codes: Sequence[str | RateCode],
+    services_per_sheet: int = 100,
+    max_request_bytes: int = 1_000_000,
+    concurrency: int = 4,
+    deadline: Deadline | float | None = None,
+) -> RateMatrix:
+    """
+    Estimates the rate of every code for every provider. Each provider is given as a `RateSheet`
+    without services (its NPI, ZIP code, form type, and so on).
+
+    Providers which would send the same rate sheet, and codes repeated in `codes`, are only
+    estimated once. Each provider's codes are split into rate sheets of up to `services_per_sheet`
+    services, and the sheets are sent in requests of up to `max_request_bytes`, with up to
+    `concurrency` requests in flight. Keep `concurrency` at or below the client's
+    `max_connections` so connections are reused.
+
+    A request which fails doesn't stop the rest; its rates are left as NaN and listed in
+    `RateMatrix.failures`.
+    """
+
+    numpy = _import_numpy()
+
+    rate_codes = [RateCode(code) if isinstance(code, str) else code for code in codes]
+    amounts = numpy.full((len(providers), len(rate_codes)), numpy.nan)
+    std_devs = numpy.full((len(providers), len(rate_codes)), numpy.nan)
+    failures: list[RateMatrixFailure] = []
+
+    # Duplicates are estimated once and their results copied to each of their rows and columns.
+    provider_rows: dict[str, list[int]] = {}
+    for row, provider in enumerate(providers):
+        key = provider.model_dump_json(
+            by_alias=True, exclude_none=True, exclude={"services"}
+        )
+        provider_rows.setdefault(key, []).append(row)
+    code_columns: dict[RateCode, list[int]] = {}
+    for column, code in enumerate(rate_codes):
+        code_columns.setdefault(code, []).append(column)
+
+    unique_codes = list(code_columns)
+    sheets: list[_Sheet] = []
+    for rows in provider_rows.values():
+        provider = providers[rows[0]]
+        for start in range(0, len(unique_codes), services_per_sheet):
+            chunk = unique_codes[start : start + services_per_sheet]
+            sheets.append(
+                _Sheet(
+                    rows,
+                    [code_columns[code] for code in chunk],
+                    provider.model_copy(
+                        update={"services": [code.service() for code in chunk]}
+                    ),
+                )
+            )
+
+    sizes = [len(item) for item in serialize_items([s.rate_sheet for s in sheets])]
+    batches = [
+        sheets[start:end] for start, end in pack_batches(sizes, max_request_bytes)
+    ]
+    call_deadline = Deadline.of(deadline)
+
+    def estimate(batch: list[_Sheet]) -> None:
+        try:
+            pricings = client.estimate_rate_sheet(
+                *(sheet.rate_sheet for sheet in batch), deadline=call_deadline
+            )
+        except Exception as e:
+            for sheet in batch:
+                fail(sheet, str(e))
+            return
+
+        for sheet, pricing in zip(batch, pricings):
+            if pricing.edit_error is not None:
+                fail(sheet, str(pricing.edit_error))
+                continue
+
+            for columns, service in zip(sheet.columns, pricing.services):
+                cells = numpy.ix_(sheet.rows, columns)
+                if service.medicare_amount is not None:
+                    amounts[cells] = service.medicare_amount
+                if service.medicare_std_dev is not None:
+                    std_devs[cells] = service.medicare_std_dev
+
+    def fail(sheet: _Sheet, error: str) -> None:
+        columns = sorted(column for columns in sheet.columns for column in columns)
+        failures.append(RateMatrixFailure(sheet.rows, columns, error))
+
+    with ThreadPoolExecutor(concurrency) as threads:
+        list(threads.map(estimate, batches))
+
+    return RateMatrix(list(providers), rate_codes, amounts, std_devs, failures)
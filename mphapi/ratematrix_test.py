@@ -0,0 +1,75 @@
+import json
+import math
+import sys
+
+import pytest
+
+from .claim import RateSheet
+from .client import Client
+from .ratematrix import RateCode, estimate_rate_matrix
+from .stub import StubAPI, failure, made_up_amount
+from .transport import InMemoryRequest, InMemoryTransport
+
+
+def provider(npi: str, zip: str = "78596") -> RateSheet:
+    return RateSheet.model_validate({"npi": npi, "providerZIP": zip})
+
+
+def test_estimate_rate_matrix():
+    stub = StubAPI()
+    transport = stub.transport()
+
+    providers = [provider("1111111111"), provider("2222222222"), provider("1111111111")]
+    codes = ["99213", RateCode("99214", ("25",)), "99215", "99213"]
+
+    with Client("api-key", transport=transport) as client:
+        matrix = estimate_rate_matrix(
+            client, providers, codes, services_per_sheet=2, max_request_bytes=300
+        )
+
+    assert matrix.medicare_amounts.shape == (3, 4)
+    assert matrix.failures == []
+    for row, rate_sheet in enumerate(providers):
+        for column, code in enumerate(matrix.codes):
+            assert matrix.medicare_amounts[row, column] == made_up_amount(
+                rate_sheet.npi, code.procedure_code, *code.procedure_modifiers
+            )
+    assert (matrix.medicare_std_devs == 1.5).all()
+
+    # Duplicate providers and codes are only estimated once, in requests of a limited size.
+    sheets = [
+        sheet for request in transport.requests for sheet in json.loads(request.body)
+    ]
+    assert len(sheets) == 4
+    assert all(len(sheet["services"]) <= 2 for sheet in sheets)
+    assert len(transport.requests) > 1
+    assert all(len(request.body) <= 300 for request in transport.requests)
+
+
+def test_failures():
+    stub = StubAPI()
+
+    def handle(request: InMemoryRequest) -> tuple[int, bytes]:
+        if b"2222222222" in request.body:
+            return failure(400, "Bad Request", "unknown provider")
+        return stub.handle("/v1/medicare/estimate/rate-sheet", request.body)
+
+    providers = [provider("1111111111"), provider("2222222222")]
+    with Client("api-key", transport=InMemoryTransport(handle)) as client:
+        matrix = estimate_rate_matrix(
+            client, providers, ["99213", "99214"], max_request_bytes=100
+        )
+
+    assert not math.isnan(matrix.medicare_amounts[0, 0])
+    assert all(math.isnan(amount) for amount in matrix.medicare_amounts[1])
+
+    (failed,) = matrix.failures
+    assert (failed.providers, failed.codes) == ([1], [0, 1])
+    assert "unknown provider" in failed.error
+
+
+def test_requires_numpy(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    with pytest.raises(ImportError, match="mphapi\\[matrix\\]"):
+        estimate_rate_matrix(Client("api-key", transport=StubAPI().transport()), [], [])
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, RootModel
 from pydantic.dataclasses import dataclass
 
+from .fields import deferred_model_config
+
 
 class APIError(Exception):
     message: str
@@ -9,7 +11,7 @@ class APIError(Exception):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(config=deferred_model_config)
 class ResponseError(APIError):
     title: str
     detail: str
@@ -22,16 +24,20 @@ class ResponseError(APIError):
 
 
 class ResponseSuccess[Result: BaseModel](BaseModel):
+    model_config = deferred_model_config
+
     result: Result
     status: int
 
 
 class ResponseFailure(BaseModel):
+    model_config = deferred_model_config
+
     error: ResponseError
     status: int
 
 
-@dataclass
+@dataclass(config=deferred_model_config)
 class GatewayError(APIError):
     message: str
     code: int
@@ -48,6 +54,8 @@ class Response[Result: BaseModel](
     in IETF RFC 7807 https://tools.ietf.org/html/rfc7807 and is a simplification of the Spring Boot error response as described at https://www.baeldung.com/rest-api-error-handling-best-practices
     """
 
+    model_config = deferred_model_config
+
     """
     An error response might look like this:
     {
@@ -93,6 +101,8 @@ class Response[Result: BaseModel](
 
 
 class ResponsesSuccess[Result: BaseModel](BaseModel):
+    model_config = deferred_model_config
+
     results: list[Result]
     success_count: int
     error_count: int
@@ -100,8 +110,10 @@ class ResponsesSuccess[Result: BaseModel](BaseModel):
 
 
 class Responses[Result: BaseModel](
-    RootModel[ResponsesSuccess[Result] | ResponseFailure]
+    RootModel[ResponsesSuccess[Result] | ResponseFailure | GatewayError]
 ):
+    model_config = deferred_model_config
+
     def results(
         self,
     ) -> list[Result]:
@@ -116,9 +128,13 @@ class Responses[Result: BaseModel](
         ------
         ResponseError
             The request's error response.
+        GatewayError
+            The API gateway's error response (e.g. when throttled).
         """
 
         if isinstance(self.root, ResponsesSuccess):
             return self.root.results
-        else:
+        elif isinstance(self.root, ResponseFailure):
             raise self.root.error
+        else:
+            raise self.root
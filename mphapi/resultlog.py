@@ -0,0 +1,314 @@
+"""
+Stores pricing results compactly on disk so that historical results can be reloaded quickly. The
+log is append-only: a result stored again for the same claim ID replaces the earlier one when
+looked up, but both are kept in the file.
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from typing import Any, Iterable, Iterator, Self
+
+from .pricing import Pricing
+
+_index_magic = b"MPHRESULTIDX1\n"
+
+# Each record is a header followed by the claim ID and the compressed pricing JSON. The checksum
+# covers both so torn or corrupt records are noticed.
+_header = struct.Struct(">HII")
+"""Length of the claim ID, length of the compressed pricing, and CRC-32 of both"""
+
+_read_size = 1 << 20
+
+
+class ResultLogError(ValueError):
+    """Raised when a result log is corrupt."""
+
+    offset: int
+    """Byte offset of the corrupt record"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"offset {offset}: {message}")
+        self.offset = offset
+
+
+def _encode(claim_id: str, pricing_json: bytes) -> bytes:
+    id_bytes = claim_id.encode()
+    payload = zlib.compress(pricing_json)
+    checksum = zlib.crc32(payload, zlib.crc32(id_bytes))
+
+    return _header.pack(len(id_bytes), len(payload), checksum) + id_bytes + payload
+
+
+class ResultLog:
+    """
+    ResultLog is an append-only file of `Pricing` results, each compressed and prefixed with its
+    length, with an index from claim ID to where its latest result is.
+
+    Several threads, and several processes each opening the same path, can append at once: each
+    batch of records is written with a single append so records never interleave. Records
+    appended by other processes are picked up whenever a lookup or scan reaches the end of the
+    part of the log already indexed.
+
+    The index is saved to `index_path` (the log's path with `.idx` added by default) on close, so
+    reopening the log only reads the records appended since. A record left partly written at the
+    end of the log by a crash is removed when the log is opened, so open it before any other
+    process starts appending.
+    """
+
+    path: str
+    index_path: str
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        index_path: str | os.PathLike[str] | None = None,
+    ):
+        self.path = os.fspath(path)
+        self.index_path = (
+            f"{self.path}.idx" if index_path is None else os.fspath(index_path)
+        )
+
+        self._lock = threading.Lock()
+        self._fd = os.open(
+            self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        )
+
+        # Offset of the latest record for each claim ID, and how much of the log they cover.
+        self._offsets: dict[str, int] = {}
+        self._indexed_size = 0
+        self._index_changed = False
+        try:
+            self._load_index()
+            self._truncate_incomplete_tail()
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd < 0:
+                return
+
+            if self._index_changed:
+                self._save_index()
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns the number of claim IDs with a result."""
+
+        with self._lock:
+            self._refresh()
+            return len(self._offsets)
+
+    def __contains__(self, claim_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return claim_id in self._offsets
+
+    def append(self, pricings: Iterable[Pricing]) -> None:
+        """Appends results. Results without a claim ID are kept in the log but not indexed."""
+
+        self.append_json(
+            (
+                pricing.claim_id,
+                pricing.model_dump_json(by_alias=True, exclude_none=True).encode(),
+            )
+            for pricing in pricings
+        )
+
+    def append_json(self, results: Iterable[tuple[str | None, bytes]]) -> None:
+        """
+        Appends (claim ID, pricing JSON) results, e.g. the `claim_id` and `pricing_json` of a
+        `PricedClaim`.
+        """
+
+        records = [
+            (claim_id or "", _encode(claim_id or "", pricing_json))
+            for claim_id, pricing_json in results
+        ]
+        if not records:
+            return
+
+        data = b"".join(record for _, record in records)
+
+        with self._lock:
+            # Catch up first so the records just written are the last ones to be indexed.
+            self._refresh()
+
+            written = os.write(self._fd, data)
+            if written != len(data):
+                raise OSError(f"short write to {self.path}")
+            # With O_APPEND, the file position ends up just past what this call wrote, even when
+            # other processes are appending too.
+            end = os.lseek(self._fd, 0, os.SEEK_CUR)
+
+            if end - len(data) == self._indexed_size:
+                offset = self._indexed_size
+                for claim_id, record in records:
+                    if claim_id:
+                        self._offsets[claim_id] = offset
+                    offset += len(record)
+                self._indexed_size = end
+                self._index_changed = True
+            # Otherwise another process appended in between, and the next refresh indexes both.
+
+    def get(self, claim_id: str) -> Pricing | None:
+        """Returns the latest result for a claim ID, or None if there isn't one."""
+
+        pricing_json = self.get_json(claim_id)
+        return (
+            None if pricing_json is None else Pricing.model_validate_json(pricing_json)
+        )
+
+    def get_json(self, claim_id: str) -> bytes | None:
+        """Returns the JSON of the latest result for a claim ID, or None if there isn't one."""
+
+        with self._lock:
+            self._refresh()
+            offset = self._offsets.get(claim_id)
+            if offset is None:
+                return None
+
+            header = self._read_at(offset, _header.size)
+            id_length, payload_length, _ = _header.unpack(header)
+            data = self._read_at(offset + _header.size, id_length + payload_length)
+
+        return self._decode(header + data, offset)[1]
+
+    def scan(self) -> Iterator[Pricing]:
+        """Yields every result in the order they were appended, including replaced ones."""
+
+        for _, pricing_json in self.scan_json():
+            yield Pricing.model_validate_json(pricing_json)
+
+    def scan_json(self) -> Iterator[tuple[str | None, bytes]]:
+        """Yields the claim ID and JSON of every result in the order they were appended."""
+
+        for offset, record in self._records(0):
+            claim_id, pricing_json = self._decode(record, offset)
+            yield claim_id or None, pricing_json
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        """Reads `size` bytes at `offset`. Must hold the lock, as it moves the file position."""
+
+        # os.pread isn't available on Windows. Appends still go to the end of the file as it's
+        # opened with O_APPEND.
+        os.lseek(self._fd, offset, os.SEEK_SET)
+        chunks: list[bytes] = []
+        while size > 0:
+            chunk = os.read(self._fd, size)
+            if not chunk:
+                raise ResultLogError("record is cut short", offset)
+            chunks.append(chunk)
+            size -= len(chunk)
+
+        return b"".join(chunks)
+
+    def _records(self, start: int) -> Iterator[tuple[int, bytes]]:
+        """Yields the offset and bytes of each complete record from `start` to the end of the log."""
+
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            buffer = b""
+
+            while True:
+                chunk = f.read(_read_size)
+                if not chunk:
+                    return
+                buffer += chunk
+
+                position = 0
+                while len(buffer) - position >= _header.size:
+                    id_length, payload_length, _ = _header.unpack_from(buffer, position)
+                    size = _header.size + id_length + payload_length
+                    if len(buffer) - position < size:
+                        break
+
+                    yield offset, buffer[position : position + size]
+
+                    position += size
+                    offset += size
+
+                buffer = buffer[position:]
+
+    def _check(self, record: bytes, offset: int) -> str:
+        id_length, _, checksum = _header.unpack_from(record)
+        if zlib.crc32(record[_header.size :]) != checksum:
+            raise ResultLogError("checksum mismatch", offset)
+
+        return record[_header.size : _header.size + id_length].decode()
+
+    def _decode(self, record: bytes, offset: int) -> tuple[str, bytes]:
+        claim_id = self._check(record, offset)
+        id_length = _header.unpack_from(record)[0]
+
+        return claim_id, zlib.decompress(record[_header.size + id_length :])
+
+    def _refresh(self) -> None:
+        """Indexes records appended since the log was last indexed. Must hold the lock."""
+
+        if os.fstat(self._fd).st_size == self._indexed_size:
+            return
+
+        for offset, record in self._records(self._indexed_size):
+            claim_id = self._check(record, offset)
+            if claim_id:
+                self._offsets[claim_id] = offset
+            self._indexed_size = offset + len(record)
+            self._index_changed = True
+
+    def _truncate_incomplete_tail(self) -> None:
+        """
+        Indexes the log and removes anything after its last complete record, which is left when a
+        crash interrupts an append. Otherwise records appended after it couldn't be read.
+        """
+
+        self._refresh()
+        if os.fstat(self._fd).st_size > self._indexed_size:
+            os.ftruncate(self._fd, self._indexed_size)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, "rb") as f:
+                if f.read(len(_index_magic)) != _index_magic:
+                    return
+
+                header = json.loads(f.readline())
+                offsets: dict[str, int] = json.loads(f.read())
+        except (OSError, ValueError):
+            return
+
+        # An index which covers more than the log has is for a different log.
+        if header.get("logSize", sys.maxsize) > os.fstat(self._fd).st_size:
+            return
+
+        self._offsets = offsets
+        self._indexed_size = header["logSize"]
+
+    def _save_index(self) -> None:
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_index_magic)
+                f.write(json.dumps({"logSize": self._indexed_size}).encode())
+                f.write(b"\n")
+                f.write(json.dumps(self._offsets).encode())
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # The index is only a cache; it's rebuilt from the log when it can't be saved.
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -0,0 +1,147 @@
+import json
+import multiprocessing
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from .claim import Claim
+from .pricing import Pricing
+from .resultlog import ResultLog, ResultLogError
+from .stub import price_claim
+
+
+def price_claims(claims: list[Claim]) -> list[Pricing]:
+    return [Pricing.model_validate_json(price_claim(claim)) for claim in claims]
+
+
+def dump(pricing: Pricing) -> str:
+    return pricing.model_dump_json(by_alias=True, exclude_none=True)
+
+
+def test_result_log(numbered_claims: Callable[[int], list[Claim]], tmp_path: Path):
+    pricings = price_claims(numbered_claims(30))
+    path = tmp_path.joinpath("results.log")
+
+    with ResultLog(path) as log:
+        log.append(pricings[:20])
+        log.append(pricings[20:])
+        log.append([pricings[0].model_copy(update={"claim_id": None})])
+
+        assert len(log) == 30
+        assert "7" in log and "missing" not in log
+        assert log.get("missing") is None
+        pricing = log.get("7")
+        assert pricing is not None and dump(pricing) == dump(pricings[7])
+
+        # A newer result for a claim replaces the old one in lookups but not in scans.
+        log.append([pricings[7].model_copy(update={"medicare_amount": 1.0})])
+        pricing = log.get("7")
+        assert pricing is not None and pricing.medicare_amount == 1.0
+
+        scanned = list(log.scan())
+        assert len(scanned) == 32
+        assert [dump(pricing) for pricing in scanned[:30]] == [
+            dump(pricing) for pricing in pricings
+        ]
+        assert scanned[30].claim_id is None
+
+    # Records are far smaller than pretty-printed JSON.
+    pretty = sum(len(pricing.model_dump_json(indent=4)) for pricing in pricings)
+    assert path.stat().st_size < pretty / 4
+
+    with ResultLog(path) as log:
+        assert len(log) == 30
+        pricing = log.get("7")
+        assert pricing is not None and pricing.medicare_amount == 1.0
+
+
+def test_other_appenders(numbered_claims: Callable[[int], list[Claim]], tmp_path: Path):
+    pricings = price_claims(numbered_claims(10))
+    path = tmp_path.joinpath("results.log")
+
+    with ResultLog(path) as first, ResultLog(path) as second:
+        first.append(pricings[:5])
+        second.append(pricings[5:])
+        changed = pricings[0].model_copy(update={"medicare_amount": 2.0})
+        first.append_json([("0", dump(changed).encode())])
+
+        assert len(first) == 10 and len(second) == 10
+        pricing = second.get("0")
+        assert pricing is not None and pricing.medicare_amount == 2
+
+    # The index is rebuilt from the log when it's missing.
+    Path(f"{path}.idx").unlink()
+    with ResultLog(path) as log:
+        assert len(log) == 10
+
+
+def _append(path: str, start: int) -> None:
+    with ResultLog(path) as log:
+        for i in range(start, start + 50):
+            log.append_json([(str(i), json.dumps({"claimID": str(i)}).encode())])
+
+
+def test_concurrent_processes(tmp_path: Path):
+    path = str(tmp_path.joinpath("results.log"))
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_append, args=(path, start)) for start in (0, 50, 100)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with ResultLog(path) as log:
+        assert sorted(int(claim_id or "") for claim_id, _ in log.scan_json()) == list(
+            range(150)
+        )
+        assert len(log) == 150
+
+
+def test_crashed_append(numbered_claims: Callable[[int], list[Claim]], tmp_path: Path):
+    pricings = price_claims(numbered_claims(3))
+    path = tmp_path.joinpath("results.log")
+    with ResultLog(path) as log:
+        log.append(pricings[:2])
+    size = path.stat().st_size
+
+    # Simulate a crash part way through appending a record.
+    record = dump(pricings[2]).encode()
+    with ResultLog(path) as log:
+        log.append_json([("2", record)])
+    with path.open("r+b") as f:
+        f.truncate(size + 20)
+
+    with ResultLog(path) as log:
+        assert path.stat().st_size == size
+        assert len(log) == 2 and "2" not in log
+
+        log.append(pricings[2:])
+        pricing = log.get("2")
+        assert pricing is not None and dump(pricing) == dump(pricings[2])
+
+    with ResultLog(path) as log:
+        assert [claim_id for claim_id, _ in log.scan_json()] == ["0", "1", "2"]
+
+
+def test_corrupt_log(numbered_claims: Callable[[int], list[Claim]], tmp_path: Path):
+    path = tmp_path.joinpath("results.log")
+    with ResultLog(path) as log:
+        log.append(price_claims(numbered_claims(2)))
+    size = path.stat().st_size
+
+    # A partly written record at the end is ignored until it's complete.
+    with ResultLog(path) as log:
+        with path.open("ab") as f:
+            f.write(b"\x00\x01")
+        assert len(list(log.scan())) == 2
+
+    data = bytearray(path.read_bytes()[:size])
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    Path(f"{path}.idx").unlink()
+    with pytest.raises(ResultLogError, match="mismatch"):
+        ResultLog(path)
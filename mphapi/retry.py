@@ -0,0 +1,72 @@
+"""Deciding which failures are worth retrying and how long to wait before doing so."""
+
+import random
+from typing import Callable
+
+import requests
+
+from .breaker import CircuitOpen
+from .deadline import DeadlineExceeded
+from .pricing import Pricing
+from .response import GatewayError
+
+transient_status_codes = frozenset({429, 500, 502, 503, 504})
+"""Gateway status codes for failures which are likely to succeed if retried"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Returns whether a request which failed with `error` is likely to succeed if retried, e.g. it
+    was throttled, the connection dropped, or it wasn't sent because a circuit breaker was open.
+    Errors returned by the API itself are not transient.
+    """
+
+    if isinstance(error, GatewayError):
+        return error.code in transient_status_codes
+
+    if isinstance(error, CircuitOpen):
+        return True
+
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def backend_failed(status_code: int | None, error: BaseException | None) -> bool:
+    """
+    Returns whether a request failed because the backend is unhealthy: it answered with a 5xx or
+    429 status (whatever the body, since gateways often send HTML), or the request timed out or
+    couldn't connect. Requests the API rejected with a 4xx show it's working.
+    """
+
+    if status_code is not None and (status_code >= 500 or status_code == 429):
+        return True
+
+    return error is not None and (
+        is_transient(error) or isinstance(error, DeadlineExceeded)
+    )
+
+
+def backoff_seconds(
+    attempt: int, base: float = 0.5, cap: float = 30, rng: random.Random | None = None
+) -> float:
+    """
+    Returns how long to wait before retry number `attempt` (starting from 0). The wait grows
+    exponentially and is randomized ("full jitter") so clients retrying together spread out.
+    """
+
+    return (rng or random).uniform(0, min(cap, base * 2**attempt))
+
+
+def item_failed_with(*titles: str) -> Callable[[Pricing], bool]:
+    """
+    Returns a predicate for the `retry_item` parameter of `Client.price_batch` which selects items
+    whose error title is one of `titles`, ignoring case and surrounding whitespace. The detail isn't
+    looked at, since it can describe the claim in any words.
+    """
+
+    wanted = frozenset(title.strip().lower() for title in titles)
+
+    def failed_with(pricing: Pricing) -> bool:
+        error = pricing.edit_error
+        return error is not None and error.title.strip().lower() in wanted
+
+    return failed_with
@@ -0,0 +1,25 @@
+from .pricing import PricedService, Pricing
+from .response import ResponseError
+from .retry import item_failed_with
+
+
+def failed(title: str, detail: str) -> Pricing:
+    return Pricing(
+        services=[PricedService()],
+        edit_error=ResponseError(title=title, detail=detail),
+    )
+
+
+def test_item_failed_with():
+    retry_item = item_failed_with("Pricing failed", "Service Unavailable")
+
+    assert not retry_item(Pricing(services=[PricedService()]))
+    assert retry_item(failed("Pricing failed", "internal error"))
+    assert retry_item(failed(" service unavailable ", "try again later"))
+
+    # Only the title counts, so details mentioning timeouts don't select an error.
+    assert not retry_item(failed("Invalid claim", "npi is required"))
+    assert not retry_item(
+        failed("Invalid claim", "service date is after the connection timed out")
+    )
+    assert not item_failed_with()(failed("Pricing failed", "internal error"))
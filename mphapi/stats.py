@@ -0,0 +1,335 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .breaker import BreakerState
+from .fields import deferred_model_config
+from .hooks import RequestEvent
+from .response import GatewayError, ResponseError
+
+latency_bucket_bounds = [0.001 * 2 ** (i / 2) for i in range(35)]
+"""
+Upper bounds of the latency histogram buckets in seconds, from 1ms to about 2 minutes. Each
+bucket is about 41% wider than the previous one, which bounds the error of estimated percentiles.
+"""
+
+claim_status_path = re.compile(r"^/v1/claim/[^/]+/status$")
+
+
+def endpoint_name(path: str) -> str:
+    """Returns the path with identifiers replaced so it can be used to group requests."""
+
+    if claim_status_path.match(path):
+        return "/v1/claim/{id}/status"
+
+    return path
+
+
+class LatencyHistogram:
+    """LatencyHistogram counts latencies into fixed buckets so percentiles can be estimated."""
+
+    def __init__(self):
+        # The last bucket holds everything above the last bound.
+        self.counts = [0] * (len(latency_bucket_bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(latency_bucket_bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, percentile: float) -> float:
+        """Estimates the given percentile (0-100) by interpolating within its bucket."""
+
+        if self.count == 0:
+            return 0.0
+
+        rank = percentile / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count == 0 or seen + count < rank:
+                seen += count
+                continue
+
+            if i == len(latency_bucket_bounds):
+                return latency_bucket_bounds[-1]
+
+            upper = latency_bucket_bounds[i]
+            lower = latency_bucket_bounds[i - 1] if i > 0 else 0.0
+            fraction = (rank - seen) / count
+
+            # Buckets are spaced exponentially, so interpolate geometrically where possible.
+            if lower == 0:
+                return upper * fraction
+
+            return lower * (upper / lower) ** fraction
+
+        return latency_bucket_bounds[-1]
+
+
+class EndpointStats(BaseModel):
+    """EndpointStats contains the counters and latencies of requests to a single endpoint"""
+
+    model_config = deferred_model_config
+
+    requests: int = 0
+    """Number of requests sent"""
+
+    claims: int = 0
+    """Number of claims (or other inputs) sent"""
+
+    gateway_errors: int = 0
+    """Requests which failed with a `GatewayError` (e.g. throttling or timeouts at the gateway)"""
+
+    response_errors: int = 0
+    """Requests which failed with a `ResponseError` returned by the API"""
+
+    other_errors: int = 0
+    """Requests which failed for any other reason (e.g. connection errors or undecodable responses)"""
+
+    item_errors: int = 0
+    """Items in successful batch responses which failed (the batch `error_count`)"""
+
+    hedged_requests: int = 0
+    """Requests which were duplicated because they were slow (see `HedgePolicy`)"""
+
+    short_circuited: int = 0
+    """Requests which weren't sent because the endpoint's circuit breaker was open"""
+
+    circuit_state: Optional[BreakerState] = None
+    """State of the endpoint's circuit breaker, if the client has one (see `BreakerPolicy`)"""
+
+    bytes_sent: int = 0
+    """Total size of request bodies"""
+
+    bytes_received: int = 0
+    """Total size of response bodies"""
+
+    latency_p50: float = 0
+    """Estimated median latency in seconds"""
+
+    latency_p95: float = 0
+    """Estimated 95th percentile latency in seconds"""
+
+    latency_p99: float = 0
+    """Estimated 99th percentile latency in seconds"""
+
+    latency_sum: float = 0
+    """Total latency of all requests in seconds"""
+
+    latency_buckets: list[tuple[float, int]] = []
+    """Cumulative count of requests at or below each bucket bound (excluding +Inf)"""
+
+    @property
+    def errors(self) -> int:
+        return self.gateway_errors + self.response_errors + self.other_errors
+
+
+counter_fields = [
+    "requests",
+    "claims",
+    "gateway_errors",
+    "response_errors",
+    "other_errors",
+    "item_errors",
+    "hedged_requests",
+    "short_circuited",
+    "bytes_sent",
+    "bytes_received",
+]
+
+
+class ClientStats(BaseModel):
+    """ClientStats is a snapshot of the metrics collected by a `Client`"""
+
+    model_config = deferred_model_config
+
+    endpoints: dict[str, EndpointStats] = {}
+    """Stats for each endpoint, keyed by path"""
+
+    @staticmethod
+    def merge(*stats: "ClientStats") -> "ClientStats":
+        """Combines the stats of several clients (e.g. one per process) into one snapshot."""
+
+        recorder = StatsRecorder()
+        for client_stats in stats:
+            for endpoint, endpoint_stats in client_stats.endpoints.items():
+                recorder.add(endpoint, endpoint_stats)
+
+        return recorder.snapshot()
+
+    def to_prometheus(self, prefix: str = "mphapi") -> str:
+        """Formats the stats in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+
+        def counter(name: str, help: str, field: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for endpoint, stats in self.endpoints.items():
+                lines.append(
+                    f'{prefix}_{name}{{endpoint="{endpoint}"}} {getattr(stats, field)}'
+                )
+
+        counter("requests_total", "Requests sent.", "requests")
+        counter("claims_total", "Claims sent.", "claims")
+        counter("item_errors_total", "Failed items in batch responses.", "item_errors")
+        counter(
+            "hedged_requests_total",
+            "Requests duplicated because they were slow.",
+            "hedged_requests",
+        )
+        counter(
+            "short_circuited_total",
+            "Requests not sent because the circuit breaker was open.",
+            "short_circuited",
+        )
+        counter("sent_bytes_total", "Bytes of request bodies sent.", "bytes_sent")
+        counter(
+            "received_bytes_total",
+            "Bytes of response bodies received.",
+            "bytes_received",
+        )
+
+        lines.append(f"# HELP {prefix}_errors_total Failed requests.")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for endpoint, stats in self.endpoints.items():
+            for kind, count in [
+                ("gateway", stats.gateway_errors),
+                ("response", stats.response_errors),
+                ("other", stats.other_errors),
+            ]:
+                lines.append(
+                    f'{prefix}_errors_total{{endpoint="{endpoint}",kind="{kind}"}} {count}'
+                )
+
+        name = f"{prefix}_circuit_state"
+        lines.append(f"# HELP {name} Circuit breaker state (1 for the current state).")
+        lines.append(f"# TYPE {name} gauge")
+        for endpoint, stats in self.endpoints.items():
+            if stats.circuit_state is None:
+                continue
+
+            for state in BreakerState:
+                lines.append(
+                    f'{name}{{endpoint="{endpoint}",state="{state.value}"}} '
+                    f"{int(state == stats.circuit_state)}"
+                )
+
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} Request latency.")
+        lines.append(f"# TYPE {name} histogram")
+        for endpoint, stats in self.endpoints.items():
+            for bound, count in stats.latency_buckets:
+                lines.append(
+                    f'{name}_bucket{{endpoint="{endpoint}",le="{bound:.6g}"}} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats.requests}'
+            )
+            lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {stats.latency_sum}')
+            lines.append(f'{name}_count{{endpoint="{endpoint}"}} {stats.requests}')
+
+        return "\n".join(lines) + "\n"
+
+
+class _EndpointRecorder:
+    def __init__(self):
+        self.stats = EndpointStats.model_construct()
+        self.histogram = LatencyHistogram()
+
+
+class StatsRecorder:
+    """StatsRecorder collects metrics from request events. It's safe to use from many threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointRecorder] = {}
+
+    def _recorder(self, endpoint: str) -> _EndpointRecorder:
+        recorder = self._endpoints.get(endpoint)
+        if recorder is None:
+            recorder = self._endpoints[endpoint] = _EndpointRecorder()
+
+        return recorder
+
+    def record(self, event: RequestEvent, item_errors: int = 0) -> None:
+        with self._lock:
+            recorder = self._recorder(event.endpoint)
+
+            stats = recorder.stats
+            stats.requests += 1
+            stats.claims += event.claim_count
+            stats.item_errors += item_errors
+            stats.hedged_requests += event.hedged
+            stats.bytes_sent += event.request_bytes
+            stats.bytes_received += event.response_bytes
+
+            if isinstance(event.error, GatewayError):
+                stats.gateway_errors += 1
+            elif isinstance(event.error, ResponseError):
+                stats.response_errors += 1
+            elif event.error is not None:
+                stats.other_errors += 1
+
+            recorder.histogram.observe(event.total_seconds)
+
+    def record_short_circuit(self, endpoint: str) -> None:
+        """Counts a request which wasn't sent because the circuit breaker was open."""
+
+        with self._lock:
+            self._recorder(endpoint).stats.short_circuited += 1
+
+    def add(self, endpoint: str, endpoint_stats: EndpointStats) -> None:
+        """Adds the counters and latencies from a snapshot of another recorder."""
+
+        with self._lock:
+            recorder = self._recorder(endpoint)
+
+            for field in counter_fields:
+                setattr(
+                    recorder.stats,
+                    field,
+                    getattr(recorder.stats, field) + getattr(endpoint_stats, field),
+                )
+
+            histogram = recorder.histogram
+            previous = 0
+            for i, (_, cumulative) in enumerate(endpoint_stats.latency_buckets):
+                histogram.counts[i] += cumulative - previous
+                previous = cumulative
+            histogram.counts[-1] += endpoint_stats.requests - previous
+            histogram.count += endpoint_stats.requests
+            histogram.sum += endpoint_stats.latency_sum
+
+    def snapshot(self) -> ClientStats:
+        with self._lock:
+            endpoints: dict[str, EndpointStats] = {}
+            for endpoint, recorder in self._endpoints.items():
+                histogram = recorder.histogram
+
+                cumulative = 0
+                buckets: list[tuple[float, int]] = []
+                for bound, count in zip(latency_bucket_bounds, histogram.counts):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+
+                endpoints[endpoint] = recorder.stats.model_copy(
+                    update={
+                        "latency_p50": histogram.percentile(50),
+                        "latency_p95": histogram.percentile(95),
+                        "latency_p99": histogram.percentile(99),
+                        "latency_sum": histogram.sum,
+                        "latency_buckets": buckets,
+                    }
+                )
+
+        return ClientStats(endpoints=endpoints)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
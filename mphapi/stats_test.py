@@ -0,0 +1,95 @@
+from typing import Callable
+
+import pytest
+
+from .claim import Claim
+from .client import Client, PriceConfig
+from .hooks import RequestEvent
+from .response import GatewayError
+from .stats import ClientStats, LatencyHistogram, StatsRecorder
+from .stub import StubConfig, StubServer
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)
+
+    # Percentiles are estimates, but should be within a bucket's width of the real value.
+    for percentile, expected in [(50, 0.5), (95, 0.95), (99, 0.99)]:
+        assert histogram.percentile(percentile) == pytest.approx(expected, rel=0.2)
+
+    assert histogram.count == 1000
+    assert histogram.sum == pytest.approx(500.5)
+
+
+def test_client_stats(load_claim: Callable[[str], Claim]):
+    claims = [load_claim("hcfa"), load_claim("inpatient"), load_claim("outpatient")]
+
+    with StubServer(StubConfig(item_error_rate=1)) as server:
+        client = Client("api-key", api_url=server.url)
+        client.price(PriceConfig(), claims[0])
+        client.price_batch(PriceConfig(), *claims)
+
+        server.config = StubConfig(throttle_rate=1)
+        with pytest.raises(GatewayError):
+            client.price_batch(PriceConfig(), *claims)
+
+    stats = client.stats()
+
+    single = stats.endpoints["/v1/medicare/price/claim"]
+    assert single.requests == 1
+    assert single.claims == 1
+    assert single.errors == 0
+    assert single.bytes_sent > 0
+    assert single.bytes_received > 0
+    assert single.latency_p50 > 0
+
+    batch = stats.endpoints["/v1/medicare/price/claims"]
+    assert batch.requests == 2
+    assert batch.claims == 6
+    assert batch.gateway_errors == 1
+    assert batch.item_errors == 3
+
+    prometheus = stats.to_prometheus()
+    assert 'mphapi_requests_total{endpoint="/v1/medicare/price/claims"} 2' in prometheus
+    assert (
+        'mphapi_errors_total{endpoint="/v1/medicare/price/claims",kind="gateway"} 1'
+        in prometheus
+    )
+    assert (
+        'mphapi_request_duration_seconds_count{endpoint="/v1/medicare/price/claim"} 1'
+        in prometheus
+    )
+
+    client.reset_stats()
+    assert client.stats().endpoints == {}
+
+
+def test_merge():
+    first = StatsRecorder()
+    second = StatsRecorder()
+    for i in range(100):
+        recorder = first if i % 2 == 0 else second
+        recorder.record(
+            RequestEvent(
+                method="POST",
+                url="http://localhost/v1/medicare/price/claims",
+                endpoint="/v1/medicare/price/claims",
+                claim_count=10,
+                request_bytes=100,
+                total_seconds=(i + 1) / 100,
+            ),
+            item_errors=1,
+        )
+
+    merged = ClientStats.merge(first.snapshot(), second.snapshot())
+    stats = merged.endpoints["/v1/medicare/price/claims"]
+
+    assert stats.requests == 100
+    assert stats.claims == 1000
+    assert stats.item_errors == 100
+    assert stats.bytes_sent == 10000
+    assert stats.latency_sum == pytest.approx(50.5)
+    assert stats.latency_p50 == pytest.approx(0.5, rel=0.2)
+    assert stats.latency_buckets[-1][1] == 100
@@ -0,0 +1,507 @@
+"""
+A local stand-in for the My Price Health API, for load testing and tuning clients without using
+quota against production. Responses use the same envelopes as the real API, but prices are made
+up. Latency, throttling, gateway errors, and partial batch failures can be injected.
+
+Run it from the command line with `python -m mphapi.stub --help`, or in-process:
+
+    with StubServer(StubConfig(latency=Latency(seconds=0.05))) as server:
+        client = Client("api-key", api_url=server.url)
+
+or without a server at all:
+
+    client = Client("api-key", transport=StubAPI().transport())
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional, Self
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .claim import Claim, RateSheet
+from .fields import deferred_model_config
+from .pricing import ClaimRepricingCode, PricedService, Pricing
+from .transport import InMemoryRequest, InMemoryTransport
+
+
+class LatencyDistribution(str, Enum):
+    FIXED = "fixed"
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+    EXPONENTIAL = "exponential"
+
+
+class Latency(BaseModel):
+    """Latency describes how long the stub takes to respond to a request"""
+
+    model_config = deferred_model_config
+
+    distribution: LatencyDistribution = LatencyDistribution.FIXED
+    """Distribution latencies are sampled from"""
+
+    seconds: float = 0
+    """Fixed latency, or the mean of the distribution (the median for lognormal)"""
+
+    spread: float = 0
+    """Half the range for uniform, the standard deviation for normal, or sigma for lognormal"""
+
+    per_claim_seconds: float = 0
+    """Additional latency for every claim in the request"""
+
+    def sample(self, rng: random.Random, claim_count: int) -> float:
+        match self.distribution:
+            case LatencyDistribution.FIXED:
+                latency = self.seconds
+            case LatencyDistribution.UNIFORM:
+                latency = rng.uniform(
+                    self.seconds - self.spread, self.seconds + self.spread
+                )
+            case LatencyDistribution.NORMAL:
+                latency = rng.gauss(self.seconds, self.spread)
+            case LatencyDistribution.LOGNORMAL:
+                latency = self.seconds * rng.lognormvariate(0, self.spread)
+            case LatencyDistribution.EXPONENTIAL:
+                latency = rng.expovariate(1 / self.seconds) if self.seconds > 0 else 0
+
+        return max(latency, 0) + self.per_claim_seconds * claim_count
+
+
+class StubConfig(BaseModel):
+    """StubConfig configures the behavior of the stub server"""
+
+    model_config = deferred_model_config
+
+    latency: Latency = Field(default_factory=Latency)
+    """How long requests take to respond"""
+
+    max_requests_per_second: Optional[float] = None
+    """Requests beyond this rate are throttled with a 429"""
+
+    max_concurrent_requests: Optional[int] = None
+    """Requests beyond this many in flight are throttled with a 429"""
+
+    throttle_rate: float = 0
+    """Fraction of requests to randomly throttle with a 429"""
+
+    gateway_error_rate: float = 0
+    """Fraction of requests to randomly fail with one of `gateway_error_codes`"""
+
+    gateway_error_codes: list[int] = [502, 503, 504]
+    """Status codes used for gateway errors"""
+
+    item_error_rate: float = 0
+    """Fraction of claims in batch requests that fail to price while the rest of the batch succeeds"""
+
+    seed: Optional[int] = None
+    """Seed for the random number generator so runs are reproducible"""
+
+
+class GatewayFault(Exception):
+    def __init__(self, message: str, code: int):
+        self.message = message
+        self.code = code
+
+
+claim_status_path = re.compile(r"^/v1/claim/[^/]+/status$")
+
+
+class StubAPI:
+    """
+    StubAPI answers requests for a stand-in for the pricing API's endpoints:
+
+    - `/v1/medicare/price/claim`
+    - `/v1/medicare/price/claims`
+    - `/v1/medicare/estimate/claims`
+    - `/v1/medicare/estimate/rate-sheet`
+    - `/v1/claim/{id}/status`
+    """
+
+    config: StubConfig
+    request_count: int
+    """Number of requests received, including ones that were failed on purpose"""
+
+    def __init__(self, config: StubConfig | None = None):
+        self.config = config or StubConfig()
+        self.request_count = 0
+
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tokens = self.config.max_requests_per_second or 0.0
+        self._tokens_updated_at = time.monotonic()
+
+    def transport(self) -> InMemoryTransport:
+        """Returns a transport which answers the client's requests in-process."""
+
+        def handle(request: InMemoryRequest) -> tuple[int, bytes]:
+            return self.handle(urllib.parse.urlsplit(request.url).path, request.body)
+
+        return InMemoryTransport(handle)
+
+    def handle(self, path: str, body: bytes) -> tuple[int, bytes]:
+        with self._lock:
+            self.request_count += 1
+            self._in_flight += 1
+
+        try:
+            try:
+                request = json.loads(body)
+            except ValueError:
+                return failure(400, "Bad Request", "request body must be JSON")
+
+            claim_count = len(request) if isinstance(request, list) else 1
+
+            try:
+                self._inject_faults()
+            except GatewayFault as fault:
+                return (
+                    fault.code,
+                    json.dumps({"message": fault.message, "code": fault.code}).encode(),
+                )
+
+            with self._lock:
+                latency = self.config.latency.sample(self._rng, claim_count)
+            time.sleep(latency)
+
+            return self._respond(path, request)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _inject_faults(self) -> None:
+        config = self.config
+
+        with self._lock:
+            if config.max_requests_per_second is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    config.max_requests_per_second,
+                    self._tokens
+                    + (now - self._tokens_updated_at) * config.max_requests_per_second,
+                )
+                self._tokens_updated_at = now
+
+                if self._tokens < 1:
+                    raise GatewayFault("Too Many Requests", 429)
+                self._tokens -= 1
+
+            if (
+                config.max_concurrent_requests is not None
+                and self._in_flight > config.max_concurrent_requests
+            ):
+                raise GatewayFault("Too Many Requests", 429)
+
+            if self._rng.random() < config.throttle_rate:
+                raise GatewayFault("Too Many Requests", 429)
+
+            if self._rng.random() < config.gateway_error_rate:
+                code = self._rng.choice(config.gateway_error_codes)
+                raise GatewayFault(
+                    gateway_error_messages.get(code, "Gateway Error"), code
+                )
+
+    def _respond(self, path: str, request: Any) -> tuple[int, bytes]:
+        match path:
+            case "/v1/medicare/price/claim":
+                if not isinstance(request, dict):
+                    return failure(400, "Bad Request", "expected a single claim")
+
+                try:
+                    claim = Claim.model_validate(request)
+                except ValidationError as e:
+                    return failure(400, "Invalid claim", str(e))
+
+                return success(price_claim(claim))
+            case "/v1/medicare/price/claims" | "/v1/medicare/estimate/claims":
+                if not isinstance(request, list):
+                    return failure(400, "Bad Request", "expected a list of claims")
+
+                return self._batch(request, Claim, price_claim)
+            case "/v1/medicare/estimate/rate-sheet":
+                if not isinstance(request, list):
+                    return failure(400, "Bad Request", "expected a list of rate sheets")
+
+                return self._batch(request, RateSheet, estimate_rate_sheet)
+            case _ if claim_status_path.match(path):
+                return 200, b'{"result":{},"status":200}'
+            case _:
+                return failure(404, "Not Found", f"no endpoint at {path}")
+
+    def _batch[Input: BaseModel](
+        self,
+        request: list[Any],
+        input_type: type[Input],
+        price: Callable[[Input], bytes],
+    ) -> tuple[int, bytes]:
+        results: list[bytes] = []
+        error_count = 0
+
+        for item in request:
+            with self._lock:
+                fail = self._rng.random() < self.config.item_error_rate
+
+            try:
+                input = input_type.model_validate(item)
+            except ValidationError as e:
+                results.append(item_failure(item, "Invalid claim", str(e)))
+                error_count += 1
+                continue
+
+            if fail:
+                results.append(
+                    item_failure(
+                        item,
+                        "Pricing failed",
+                        "pricing service temporarily unavailable (injected failure)",
+                    )
+                )
+                error_count += 1
+            else:
+                results.append(price(input))
+
+        content = (
+            b'{"results":[%s],"success_count":%d,"error_count":%d,"status_code":200}'
+            % (
+                b",".join(results),
+                len(results) - error_count,
+                error_count,
+            )
+        )
+
+        return 200, content
+
+
+class StubServer(StubAPI):
+    """StubServer serves the `StubAPI` endpoints over HTTP."""
+
+    def __init__(
+        self, config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        super().__init__(config)
+
+        self._thread: threading.Thread | None = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, content = stub.handle(self.path, body)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> Self:
+        """Starts serving requests on a background thread."""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+gateway_error_messages = {
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+    504: "Endpoint request timed out",
+}
+
+
+def success(result: bytes) -> tuple[int, bytes]:
+    return 200, b'{"result":%s,"status":200}' % result
+
+
+def failure(status: int, title: str, detail: str) -> tuple[int, bytes]:
+    return (
+        status,
+        json.dumps(
+            {"error": {"title": title, "detail": detail}, "status": status}
+        ).encode(),
+    )
+
+
+def dump(pricing: Pricing) -> bytes:
+    return pricing.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def made_up_amount(*keys: str | None) -> float:
+    """Returns a stable, made up Medicare amount for the given codes."""
+
+    digest = hashlib.blake2b(
+        "|".join(key or "" for key in keys).encode(), digest_size=4
+    )
+    return round(20 + int.from_bytes(digest.digest()) % 50000 / 100, 2)
+
+
+def price_claim(claim: Claim) -> bytes:
+    services = [
+        PricedService(
+            line_number=service.line_number,
+            medicare_amount=(
+                round(service.billed_amount * 0.4, 2)
+                if service.billed_amount is not None
+                else made_up_amount(service.procedure_code, service.rev_code)
+            ),
+        )
+        for service in claim.services
+    ]
+
+    return dump(
+        Pricing(
+            claim_id=claim.claim_id,
+            medicare_amount=round(
+                sum(service.medicare_amount or 0 for service in services), 2
+            ),
+            medicare_repricing_code=ClaimRepricingCode.MEDICARE,
+            services=services,
+        )
+    )
+
+
+def estimate_rate_sheet(rate_sheet: RateSheet) -> bytes:
+    services = [
+        PricedService(
+            medicare_amount=made_up_amount(
+                rate_sheet.npi,
+                service.procedure_code,
+                *(service.procedure_modifiers or []),
+            ),
+            medicare_std_dev=1.5,
+        )
+        for service in rate_sheet.services or []
+    ] or [PricedService(medicare_amount=made_up_amount(rate_sheet.npi, rate_sheet.drg))]
+
+    return dump(
+        Pricing(
+            medicare_amount=round(
+                sum(service.medicare_amount or 0 for service in services), 2
+            ),
+            medicare_repricing_code=ClaimRepricingCode.MEDICARE,
+            services=services,
+        )
+    )
+
+
+def item_failure(item: Any, title: str, detail: str) -> bytes:
+    claim_id = item.get("claimID") if isinstance(item, dict) else None
+
+    # Pricing always has at least one service, even when pricing failed.
+    return json.dumps(
+        {
+            "claimID": claim_id,
+            "medicareRepricingCode": ClaimRepricingCode.NEEDS_MORE_INFO.value,
+            "services": [{}],
+            "editError": {"title": title, "detail": detail},
+        }
+    ).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serves a local stand-in for the My Price Health API."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--config", type=Path, help="JSON file with a StubConfig to start from"
+    )
+    parser.add_argument(
+        "--latency-distribution", type=LatencyDistribution, default=None
+    )
+    parser.add_argument("--latency-seconds", type=float, default=None)
+    parser.add_argument("--latency-spread", type=float, default=None)
+    parser.add_argument("--latency-per-claim-seconds", type=float, default=None)
+    parser.add_argument("--max-requests-per-second", type=float, default=None)
+    parser.add_argument("--max-concurrent-requests", type=int, default=None)
+    parser.add_argument("--throttle-rate", type=float, default=None)
+    parser.add_argument("--gateway-error-rate", type=float, default=None)
+    parser.add_argument("--item-error-rate", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = (
+        StubConfig()
+        if args.config is None
+        else StubConfig.model_validate_json(args.config.read_text())
+    )
+
+    latency_overrides = {
+        "distribution": args.latency_distribution,
+        "seconds": args.latency_seconds,
+        "spread": args.latency_spread,
+        "per_claim_seconds": args.latency_per_claim_seconds,
+    }
+    config.latency = config.latency.model_copy(
+        update={
+            key: value for key, value in latency_overrides.items() if value is not None
+        }
+    )
+
+    overrides = {
+        "max_requests_per_second": args.max_requests_per_second,
+        "max_concurrent_requests": args.max_concurrent_requests,
+        "throttle_rate": args.throttle_rate,
+        "gateway_error_rate": args.gateway_error_rate,
+        "item_error_rate": args.item_error_rate,
+        "seed": args.seed,
+    }
+    config = config.model_copy(
+        update={key: value for key, value in overrides.items() if value is not None}
+    )
+
+    server = StubServer(config, args.host, args.port)
+    print(f"Serving on {server.url}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from . import client as client_module
+from .claim import Claim, RateSheet, RateSheetService
+from .client import Client, PriceConfig, pack_batches, serialize_items
+from .credentials import Credentials
+from .hooks import RequestEvent
+from .pricing import ClaimRepricingCode, ClaimStatus, status_new
+from .response import GatewayError
+from .retry import item_failed_with
+from .stub import Latency, LatencyDistribution, StubConfig, StubServer
+
+
+def make_client(server: StubServer) -> Client:
+    return Client(
+        "api-key",
+        api_url=server.url,
+        app_url=server.url,
+        app_api_key="app-api-key",
+        app_referer=server.url,
+        app_credentials=Credentials(
+            api_key="app-api-key",
+            referer=server.url,
+            credentials_path=Path("fake-credentials-path"),
+            email="test-user@mypricehealth.com",
+            id_token="fake-id-token",
+            refresh_token="fake-refresh-token",
+            expires_at=sys.float_info.max,
+        ),
+    )
+
+
+def test_endpoints(sample_claims: list[Claim]):
+    with StubServer() as server:
+        client = make_client(server)
+        config = PriceConfig()
+
+        pricing = client.price(config, sample_claims[0])
+        assert pricing.claim_id == sample_claims[0].claim_id
+        assert pricing.medicare_repricing_code == ClaimRepricingCode.MEDICARE
+
+        pricings = client.price_batch(config, *sample_claims)
+        assert [pricing.claim_id for pricing in pricings] == [
+            claim.claim_id for claim in sample_claims
+        ]
+        assert [len(pricing.services) for pricing in pricings] == [
+            len(claim.services) for claim in sample_claims
+        ]
+
+        assert len(client.estimate_claims(config, *sample_claims)) == len(sample_claims)
+
+        estimates = client.estimate_rate_sheet(
+            RateSheet.model_validate(
+                {
+                    "npi": "1679184618",
+                    "providerZIP": "78596",
+                    "services": [RateSheetService(procedure_code="92014")],
+                }
+            )
+        )
+        assert estimates[0].services[0].medicare_amount is not None
+
+        client.insert_claim_status(
+            "123", ClaimStatus(step=status_new.step, status=status_new.status)
+        )
+
+        assert server.request_count == 5
+
+
+def test_throttling(sample_claims: list[Claim]):
+    with StubServer(StubConfig(throttle_rate=1)) as server:
+        client = make_client(server)
+
+        with pytest.raises(GatewayError) as single_error:
+            client.price(PriceConfig(), sample_claims[0])
+        assert single_error.value.code == 429
+
+        with pytest.raises(GatewayError) as batch_error:
+            client.price_batch(PriceConfig(), *sample_claims)
+        assert batch_error.value.code == 429
+
+
+def test_partial_batch_failures(sample_claims: list[Claim]):
+    with StubServer(StubConfig(item_error_rate=0.5, seed=1)) as server:
+        pricings = make_client(server).price_batch(PriceConfig(), *sample_claims * 10)
+
+    failed = [pricing for pricing in pricings if pricing.edit_error is not None]
+    assert 0 < len(failed) < len(pricings)
+    assert all(
+        pricing.medicare_repricing_code == ClaimRepricingCode.NEEDS_MORE_INFO
+        for pricing in failed
+    )
+
+
+def test_retry_failed_items(
+    sample_claims: list[Claim], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(client_module, "backoff_seconds", lambda attempt: 0)
+    claims = sample_claims * 10
+    claim_counts: list[int] = []
+
+    with StubServer(StubConfig(item_error_rate=0.5, seed=1)) as server:
+        client = make_client(server)
+        client.add_hook(lambda event: claim_counts.append(event.claim_count))
+        pricings = client.price_batch(
+            PriceConfig(),
+            *claims,
+            item_retries=10,
+            retry_item=item_failed_with("Pricing failed"),
+        )
+
+    assert [pricing.claim_id for pricing in pricings] == [
+        claim.claim_id for claim in claims
+    ]
+    assert all(pricing.edit_error is None for pricing in pricings)
+
+    # Only the failed claims were sent again, in smaller batches.
+    assert claim_counts[0] == len(claims)
+    assert 0 < max(claim_counts[1:]) <= len(claims) // 2
+    assert sum(claim_counts[1:]) < len(claims) * 10
+
+
+def test_no_retry_item(sample_claims: list[Claim]):
+    with StubServer(StubConfig(item_error_rate=1)) as server:
+        client = make_client(server)
+        pricings = client.price_batch(PriceConfig(), *sample_claims, item_retries=10)
+
+    # Without a retry_item predicate no item error is taken to be transient.
+    assert all(pricing.edit_error is not None for pricing in pricings)
+    assert server.request_count == 1
+
+
+def test_pack_batches():
+    # "[a,b]" is 5 bytes for two one byte items.
+    assert pack_batches([1, 1, 1, 1], 5) == [(0, 2), (2, 4)]
+    assert pack_batches([1, 10, 1], 5) == [(0, 1), (1, 2), (2, 3)]
+    assert pack_batches([1, 1, 1], 100) == [(0, 3)]
+    assert pack_batches([], 100) == []
+
+
+def test_max_request_bytes(sample_claims: list[Claim]):
+    claims = sample_claims * 4
+    sizes = [len(item) for item in serialize_items(claims)]
+    events: list[RequestEvent] = []
+
+    with StubServer() as server:
+        client = make_client(server)
+        client.max_request_bytes = max(sizes) + 10
+        client.add_hook(events.append)
+        pricings = client.price_batch(PriceConfig(), *claims)
+
+        # An item larger than the limit is still sent, on its own.
+        client.max_request_bytes = 10
+        client.estimate_claims(PriceConfig(), claims[0])
+
+    assert [pricing.claim_id for pricing in pricings] == [
+        claim.claim_id for claim in claims
+    ]
+    assert len(events) > 2
+    assert sum(event.claim_count for event in events[:-1]) == len(claims)
+    assert all(event.request_bytes <= max(sizes) + 10 for event in events[:-1])
+    assert events[-1].claim_count == 1
+
+
+def test_bulk_claim_statuses(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(client_module, "backoff_seconds", lambda attempt: 0)
+    statuses = [
+        (str(i), ClaimStatus(step=status_new.step, status=status_new.status))
+        for i in range(50)
+    ]
+
+    # Without retries, the updates which hit a gateway error are returned rather than raised.
+    with StubServer(StubConfig(gateway_error_rate=0.3, seed=1)) as server:
+        failures = make_client(server).insert_claim_statuses(statuses, retries=0)
+
+    assert 0 < len(failures) < len(statuses)
+    assert all(isinstance(failure.error, GatewayError) for failure in failures)
+
+    # With retries, they all eventually go through.
+    with StubServer(StubConfig(gateway_error_rate=0.3, seed=1)) as server:
+        client = make_client(server)
+        assert client.insert_claim_statuses(statuses, retries=10) == []
+        assert server.request_count > len(statuses)
+        assert client.stats().endpoints["/v1/claim/{id}/status"].requests == (
+            server.request_count
+        )
+
+
+def test_latency():
+    for distribution in LatencyDistribution:
+        latency = Latency(
+            distribution=distribution,
+            seconds=0.01,
+            spread=0.005,
+            per_claim_seconds=0.001,
+        )
+
+        rng = random.Random(1)
+        samples = [latency.sample(rng, 10) for _ in range(100)]
+
+        # Latency is never negative, and the per claim latency is always added.
+        assert all(sample >= 0.01 for sample in samples)
@@ -0,0 +1,226 @@
+"""
+Transports send the client's HTTP requests. `Client` uses `RequestsTransport` unless it's given
+another implementation of `Transport`, such as `HTTP2Transport` or `InMemoryTransport`.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Iterator, Mapping, NamedTuple, Protocol
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+_connect_timer = threading.local()
+
+
+def take_connect_seconds() -> float:
+    """Returns the time the current thread has spent connecting since the last call."""
+
+    seconds: float = getattr(_connect_timer, "seconds", 0.0)
+    _connect_timer.seconds = 0.0
+
+    return seconds
+
+
+def record_connect_seconds(seconds: float) -> None:
+    """Adds to the time the current thread has spent connecting."""
+
+    _connect_timer.seconds = getattr(_connect_timer, "seconds", 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_connect_seconds(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_connect_seconds(time.perf_counter() - start)
+
+
+# urllib3 declares ConnectionCls as its BaseHTTP(S)Connection protocols, which its own connection
+# classes don't match exactly (e.g. default_socket_options is Final in the classes but mutable in
+# the protocols), so subclasses of those classes can't be assigned without an ignore.
+class _TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection  # pyright: ignore[reportAssignmentType]
+
+
+class _TimedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection  # pyright: ignore[reportAssignmentType]
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter which records how long the current thread spends opening connections."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {  # type: ignore
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def new_session(max_connections: int = 10) -> requests.Session:
+    """
+    Returns a session which pools connections and records connect times. Up to `max_connections`
+    connections are kept open for reuse per host.
+    """
+
+    session = requests.Session()
+
+    adapter = TimedHTTPAdapter(pool_maxsize=max_connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+Timeout = tuple[float | None, float | None]
+"""Seconds to wait for a connection to open, and for the server to send data"""
+
+
+class TransportResponse(Protocol):
+    """
+    TransportResponse is a response whose status and headers have been received. The body is read
+    from `iter_content`, or all at once from `content`.
+    """
+
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+    @property
+    def content(self) -> bytes: ...
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]: ...
+
+    def close(self) -> None: ...
+
+
+class Transport(Protocol):
+    """
+    Transport sends requests for `Client`. `request` returns once the response's status and headers
+    have been received, leaving the body to be streamed. Transports must be safe to use from
+    several threads at once, and raise `requests.ConnectionError` or `requests.Timeout` when a
+    request can't be sent or times out, so those are retried and failed over like any other.
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: bytes,
+        headers: Mapping[str, str],
+        timeout: Timeout | None = None,
+    ) -> TransportResponse: ...
+
+    def close(self) -> None: ...
+
+
+class RequestsTransport:
+    """RequestsTransport is the default transport, which sends requests with `requests`."""
+
+    session: requests.Session
+
+    def __init__(self, max_connections: int = 10):
+        self.session = new_session(max_connections)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: bytes,
+        headers: Mapping[str, str],
+        timeout: Timeout | None = None,
+    ) -> requests.Response:
+        return self.session.request(
+            method, url, data=data, headers=headers, stream=True, timeout=timeout
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class InMemoryRequest(NamedTuple):
+    method: str
+    url: str
+    body: bytes
+    headers: Mapping[str, str]
+
+
+class InMemoryResponse:
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+
+    def __init__(
+        self, status_code: int, content: bytes, headers: Mapping[str, str] = {}
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"Content-Type": "application/json", **headers}
+
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryTransport:
+    """
+    InMemoryTransport answers requests by calling `handler` in the same process, without any
+    network, for unit tests and for benchmarking the client on its own. The handler returns a
+    status code and a JSON body. Timeouts are ignored.
+
+    For responses from a stand-in for the whole API, use `StubAPI.transport()`.
+    """
+
+    handler: Callable[[InMemoryRequest], tuple[int, bytes]]
+    requests: list[InMemoryRequest]
+    """Every request sent, in the order they were sent, unless `record_requests` is off"""
+
+    def __init__(
+        self,
+        handler: Callable[[InMemoryRequest], tuple[int, bytes]],
+        record_requests: bool = True,
+    ):
+        self.handler = handler
+        self.requests = []
+        self.record_requests = record_requests
+
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        data: bytes,
+        headers: Mapping[str, str],
+        timeout: Timeout | None = None,
+    ) -> InMemoryResponse:
+        request = InMemoryRequest(method, url, data, dict(headers))
+        if self.record_requests:
+            with self._lock:
+                self.requests.append(request)
+
+        status_code, content = self.handler(request)
+
+        return InMemoryResponse(status_code, content)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,73 @@
+import json
+from typing import Callable
+
+import pytest
+
+from . import client as client_module
+from .claim import Claim
+from .client import Client, PriceConfig
+from .response import GatewayError
+from .retry import item_failed_with
+from .stub import StubAPI, StubConfig, price_claim, success
+from .transport import InMemoryRequest, InMemoryResponse, InMemoryTransport
+
+
+def test_in_memory(load_claim: Callable[[str], Claim]):
+    claim = load_claim("hcfa")
+    responses = [
+        (503, b'{"message":"Service Unavailable","code":503}'),
+        success(price_claim(claim)),
+    ]
+
+    transport = InMemoryTransport(lambda request: responses.pop(0))
+    with Client(
+        "api-key", api_url="https://api.example", transport=transport
+    ) as client:
+        with pytest.raises(GatewayError):
+            client.price(PriceConfig(), claim)
+
+        pricing = client.price(PriceConfig(is_commercial=True), claim)
+        assert pricing.claim_id == claim.claim_id
+
+    request = transport.requests[-1]
+    assert request.method == "POST"
+    assert request.url == "https://api.example/v1/medicare/price/claim"
+    assert request.headers["x-api-key"] == "api-key"
+    assert request.headers["is-commercial"] == "true"
+    assert json.loads(request.body)["claimID"] == claim.claim_id
+
+
+def test_stub_transport(
+    load_claim: Callable[[str], Claim], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(client_module, "backoff_seconds", lambda attempt: 0)
+    claim = load_claim("hcfa")
+    stub = StubAPI(StubConfig(item_error_rate=0.5, seed=1))
+
+    with Client("api-key", transport=stub.transport()) as client:
+        results = client.price_batch(
+            PriceConfig(),
+            *[claim] * 20,
+            item_retries=10,
+            retry_item=item_failed_with("Pricing failed"),
+        )
+
+    assert all(result.claim_id == claim.claim_id for result in results)
+    assert all(result.edit_error is None for result in results)
+    assert stub.request_count > 1
+
+
+def test_in_memory_response():
+    response = InMemoryResponse(200, b"0123456789")
+    assert list(response.iter_content(4)) == [b"0123", b"4567", b"89"]
+    assert response.headers["Content-Type"] == "application/json"
+
+
+def test_request_recorded():
+    transport = InMemoryTransport(lambda request: (200, request.body))
+    response = transport.request("POST", "http://x/y", b"{}", {"a": "b"})
+
+    assert response.content == b"{}"
+    assert transport.requests == [
+        InMemoryRequest("POST", "http://x/y", b"{}", {"a": "b"})
+    ]
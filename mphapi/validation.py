@@ -0,0 +1,261 @@
+"""
+Checks claims locally for problems the API is certain to reject them for, so they can be fixed or
+set aside without spending a round trip (and quota) on them.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence, cast
+
+from .claim import Claim, FormType, Provider, Service
+from .date import Date
+from .pricing import ClaimRepricingCode, PricedService, Pricing
+from .response import ResponseError
+
+_npi = re.compile(r"[12]\d{9}")
+_zip = re.compile(r"\d{5}(-?\d{4})?")
+_icd10_diagnosis = re.compile(r"[A-Z]\d[0-9A-Z](\.?[0-9A-Z]{1,4})?", re.IGNORECASE)
+_icd10_procedure = re.compile(r"[0-9A-HJ-NP-Z]{7}", re.IGNORECASE)
+_hcpcs = re.compile(r"[0-9A-Z]\d{3}[0-9A-Z]", re.IGNORECASE)
+_modifier = re.compile(r"[0-9A-Z]{2}", re.IGNORECASE)
+_rev_code = re.compile(r"\d{3,4}")
+
+
+@dataclass
+class ClaimIssue:
+    """ClaimIssue is a single problem found with a claim by `validate_claim`."""
+
+    field: str
+    """Path of the offending field (e.g. services[2].procedure_code)"""
+
+    reason: str
+    """Why the field is invalid"""
+
+    def __str__(self) -> str:
+        return f"{self.field}: {self.reason}"
+
+
+@dataclass
+class RejectedClaim:
+    """RejectedClaim is a claim that was set aside by `preflight` along with why."""
+
+    position: int
+    """Index of the claim in the input"""
+
+    claim: Claim
+    issues: list[ClaimIssue]
+
+    def pricing(self) -> Pricing:
+        """
+        Returns a result for the claim in the same shape the API uses for claims it couldn't
+        price, so it can stand in for the API's response.
+        """
+
+        return Pricing.model_construct(
+            claim_id=self.claim.claim_id,
+            medicare_repricing_code=ClaimRepricingCode.NEEDS_MORE_INFO,
+            medicare_repricing_note="claim failed validation",
+            services=[PricedService.model_construct() for _ in self.claim.services]
+            or [PricedService.model_construct()],
+            edit_error=ResponseError(
+                title="Claim failed validation",
+                detail="; ".join(str(issue) for issue in self.issues),
+            ),
+        )
+
+
+@dataclass
+class Preflight:
+    """Preflight splits claims into those worth sending to the API and those that aren't."""
+
+    valid: list[Claim] = field(default_factory=list)
+    """Claims which passed validation, in their original order"""
+
+    valid_positions: list[int] = field(default_factory=list)
+    """Index in the input of each valid claim"""
+
+    rejected: list[RejectedClaim] = field(default_factory=list)
+    """Claims which failed validation"""
+
+    def merge(self, results: Sequence[Pricing]) -> list[Pricing]:
+        """
+        Combines the results of pricing the valid claims with stand-in results for the rejected
+        ones, giving one result per input claim in input order.
+        """
+
+        if len(results) != len(self.valid):
+            raise ValueError(
+                f"expected {len(self.valid)} results but received {len(results)}"
+            )
+
+        merged: list[Pricing | None] = [None] * (len(self.valid) + len(self.rejected))
+        for position, result in zip(self.valid_positions, results):
+            merged[position] = result
+
+        for rejected in self.rejected:
+            merged[rejected.position] = rejected.pricing()
+
+        # Every position is either a valid or a rejected claim, so none are left as None.
+        return cast(list[Pricing], merged)
+
+
+def _check_code(
+    issues: list[ClaimIssue],
+    path: str,
+    value: str | None,
+    pattern: re.Pattern[str],
+    kind: str,
+) -> None:
+    if value is not None and not pattern.fullmatch(value):
+        issues.append(ClaimIssue(path, f"{value!r} is not a valid {kind}"))
+
+
+def _check_dates(
+    issues: list[ClaimIssue],
+    path: str,
+    date_from: Date | None,
+    date_through: Date | None,
+) -> None:
+    if (
+        date_from is not None
+        and date_through is not None
+        and date_through.datetime < date_from.datetime
+    ):
+        issues.append(
+            ClaimIssue(
+                f"{path}date_through",
+                f"{date_through} is before date_from {date_from}",
+            )
+        )
+
+
+def _check_npi(issues: list[ClaimIssue], path: str, npi: str) -> None:
+    if not _npi.fullmatch(npi):
+        issues.append(ClaimIssue(path, f"{npi!r} is not a 10 digit NPI"))
+        return
+
+    # NPIs end with a Luhn check digit computed as if they were prefixed with 80840.
+    total = 24
+    for i, digit in enumerate(reversed(npi[:9])):
+        value = int(digit)
+        if i % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+
+    if (10 - total % 10) % 10 != int(npi[9]):
+        issues.append(ClaimIssue(path, f"{npi!r} has an invalid check digit"))
+
+
+def _check_provider(issues: list[ClaimIssue], path: str, provider: Provider) -> None:
+    _check_npi(issues, f"{path}npi", provider.npi)
+    _check_code(issues, f"{path}provider_zip", provider.provider_zip, _zip, "ZIP code")
+
+
+def _check_service(issues: list[ClaimIssue], path: str, service: Service) -> None:
+    if service.provider is not None:
+        _check_provider(issues, f"{path}provider.", service.provider)
+
+    _check_code(
+        issues, f"{path}procedure_code", service.procedure_code, _hcpcs, "HCPCS code"
+    )
+    for i, modifier in enumerate(service.procedure_modifiers or ()):
+        _check_code(
+            issues, f"{path}procedure_modifiers[{i}]", modifier, _modifier, "modifier"
+        )
+
+    _check_code(issues, f"{path}rev_code", service.rev_code, _rev_code, "revenue code")
+    _check_dates(issues, path, service.date_from, service.date_through)
+
+
+def validate_claim(claim: Claim) -> list[ClaimIssue]:
+    """
+    Returns the problems with a claim which would cause the API to reject it, or an empty list if
+    none were found. Passing doesn't guarantee a claim can be priced, but failing means it can't.
+    """
+
+    issues: list[ClaimIssue] = []
+
+    if not claim.services:
+        issues.append(ClaimIssue("services", "at least one service is required"))
+
+    _check_provider(issues, "", claim)
+    if not claim.provider_zip:
+        issues.append(ClaimIssue("provider_zip", "provider ZIP code is required"))
+
+    if claim.form_type == FormType.UB_04 and not claim.bill_type_or_pos:
+        issues.append(
+            ClaimIssue("bill_type_or_pos", "bill type is required for UB-04 claims")
+        )
+
+    _check_dates(issues, "", claim.date_from, claim.date_through)
+
+    _check_code(
+        issues,
+        "admit_diagnosis",
+        claim.admit_diagnosis,
+        _icd10_diagnosis,
+        "ICD-10 diagnosis",
+    )
+    if claim.principal_diagnosis is not None:
+        _check_code(
+            issues,
+            "principal_diagnosis.code",
+            claim.principal_diagnosis.code,
+            _icd10_diagnosis,
+            "ICD-10 diagnosis",
+        )
+    for i, diagnosis in enumerate(claim.other_diagnoses or ()):
+        _check_code(
+            issues,
+            f"other_diagnoses[{i}].code",
+            diagnosis.code,
+            _icd10_diagnosis,
+            "ICD-10 diagnosis",
+        )
+
+    _check_code(
+        issues,
+        "principal_procedure",
+        claim.principal_procedure,
+        _icd10_procedure,
+        "ICD-10 procedure",
+    )
+    for i, procedure in enumerate(claim.other_procedures or ()):
+        _check_code(
+            issues,
+            f"other_procedures[{i}]",
+            procedure,
+            _icd10_procedure,
+            "ICD-10 procedure",
+        )
+
+    for i, service in enumerate(claim.services):
+        _check_service(issues, f"services[{i}].", service)
+
+    return issues
+
+
+def validate_claims(claims: Iterable[Claim]) -> list[list[ClaimIssue]]:
+    """Validates each claim, returning the issues found with each one in order."""
+
+    return [validate_claim(claim) for claim in claims]
+
+
+def preflight(claims: Iterable[Claim]) -> Preflight:
+    """
+    Validates claims before they're sent to the API, setting aside the ones which would be
+    rejected. Use `Preflight.merge` to line the API's results back up with the input.
+    """
+
+    result = Preflight()
+    for position, claim in enumerate(claims):
+        issues = validate_claim(claim)
+        if issues:
+            result.rejected.append(RejectedClaim(position, claim, issues))
+        else:
+            result.valid.append(claim)
+            result.valid_positions.append(position)
+
+    return result
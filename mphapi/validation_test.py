@@ -0,0 +1,68 @@
+from typing import Callable
+
+from .claim import Claim, FormType, Service
+from .client import Client, PriceConfig
+from .date import Date
+from .pricing import ClaimRepricingCode
+from .stub import StubConfig, StubServer
+from .validation import preflight, validate_claim
+
+
+def test_valid_claims(load_claim: Callable[[str], Claim]):
+    for test in ["hcfa", "inpatient", "outpatient"]:
+        assert validate_claim(load_claim(test)) == []
+
+
+def test_invalid_claim(load_claim: Callable[[str], Claim]):
+    claim = load_claim("outpatient").model_copy(
+        update={
+            "npi": "1234567890",
+            "provider_zip": None,
+            "form_type": FormType.UB_04,
+            "bill_type_or_pos": None,
+            "date_from": Date(2024, 3, 2),
+            "date_through": Date(2024, 3, 1),
+            "admit_diagnosis": "12345",
+            "services": [
+                Service(procedure_code="9928", procedure_modifiers=["JB", "X"]),
+            ],
+        }
+    )
+
+    assert [issue.field for issue in validate_claim(claim)] == [
+        "npi",
+        "provider_zip",
+        "bill_type_or_pos",
+        "date_through",
+        "admit_diagnosis",
+        "services[0].procedure_code",
+        "services[0].procedure_modifiers[1]",
+    ]
+
+    # Claims built without validation can slip through with no services.
+    empty = Claim.model_construct(npi="1831125087", provider_zip="78596", services=[])
+    assert [issue.field for issue in validate_claim(empty)] == ["services"]
+
+
+def test_preflight_price_batch(load_claim: Callable[[str], Claim]):
+    valid = load_claim("hcfa")
+    invalid = load_claim("outpatient").model_copy(update={"npi": "123"})
+
+    checked = preflight([invalid, valid])
+    assert checked.valid == [valid]
+    assert checked.valid_positions == [1]
+    assert [rejected.position for rejected in checked.rejected] == [0]
+
+    with StubServer(StubConfig()) as server:
+        with Client("api-key", api_url=server.url) as client:
+            results = client.price_batch(PriceConfig(), invalid, valid, preflight=True)
+
+            # Only the valid claim was sent.
+            assert server.request_count == 1
+            assert client.stats().endpoints["/v1/medicare/price/claims"].claims == 1
+
+    assert len(results) == 2
+    assert results[0].medicare_repricing_code == ClaimRepricingCode.NEEDS_MORE_INFO
+    assert results[0].edit_error is not None
+    assert "npi" in results[0].edit_error.detail
+    assert results[1].edit_error is None
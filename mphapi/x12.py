@@ -0,0 +1,934 @@
+"""
+Reads claims from X12 837 professional (837P) and institutional (837I) interchanges, and writes
+them back out repriced. Files are read incrementally and claims are handled as soon as they're
+complete, so memory use doesn't grow with the size of the file:
+
+    for batch in itertools.batched(read_837("claims.837"), 100):
+        pricings = client.price_batch(config, *batch)
+"""
+
+import contextlib
+import os
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping, NamedTuple, cast
+
+from pydantic import ValidationError
+
+from .claim import Claim, FormType, Provider, Service, SexType
+from .files import Source, open_text
+from .pricing import ClaimRepricingCode, LineRepricingCode, Pricing
+
+
+class X12Error(ValueError):
+    """Raised when an interchange can't be read or a claim in it isn't valid."""
+
+    segment: int
+    """Position of the offending segment in the file, counting from 1"""
+
+    def __init__(self, message: str, segment: int):
+        super().__init__(f"segment {segment}: {message}")
+        self.segment = segment
+
+
+class Delimiters(NamedTuple):
+    """The separators used by an interchange, which are set by its ISA segment."""
+
+    element: str
+    component: str
+    repetition: str
+    segment: str
+
+
+isa_length = 106
+"""Length of the fixed-width ISA segment, including its terminator"""
+
+
+def detect_delimiters(isa: str) -> Delimiters:
+    """Returns the delimiters declared by an interchange's ISA segment."""
+
+    if len(isa) < isa_length or not isa.startswith("ISA"):
+        raise ValueError("expected a complete ISA segment")
+
+    return Delimiters(
+        element=isa[3],
+        component=isa[104],
+        repetition=isa[82],
+        segment=isa[105],
+    )
+
+
+class Segment:
+    """Segment is a single X12 segment, split into its elements."""
+
+    __slots__ = ("elements", "delimiters", "position")
+
+    elements: list[str]
+    """The segment ID followed by its elements, so `elements[1]` is e.g. CLM01"""
+
+    delimiters: Delimiters
+    position: int
+    """Position of the segment in the file, counting from 1"""
+
+    def __init__(self, elements: list[str], delimiters: Delimiters, position: int):
+        self.elements = elements
+        self.delimiters = delimiters
+        self.position = position
+
+    @property
+    def id(self) -> str:
+        return self.elements[0]
+
+    def get(self, index: int) -> str:
+        """Returns an element, or an empty string if the segment doesn't have it."""
+
+        return self.elements[index] if index < len(self.elements) else ""
+
+    def components(self, index: int) -> list[str]:
+        """Returns the components of a composite element."""
+
+        return self.get(index).split(self.delimiters.component)
+
+    def __str__(self) -> str:
+        return self.delimiters.element.join(self.elements) + self.delimiters.segment
+
+    def __repr__(self) -> str:
+        return f"Segment({str(self)!r})"
+
+
+def read_segments(
+    source: Source, chunk_size: int = 1 << 16, encoding: str = "utf-8"
+) -> Iterator[Segment]:
+    """
+    Yields the segments of one or more X12 interchanges, reading `chunk_size` characters at a
+    time. Delimiters are taken from each interchange's ISA segment. Line breaks between segments
+    are ignored.
+    """
+
+    with open_text(source, encoding) as f:
+        buffer = ""
+        delimiters: Delimiters | None = None
+        position = 0
+
+        while True:
+            chunk = f.read(chunk_size)
+            buffer = buffer.lstrip() + chunk
+
+            # Delimiters have to be known before any segments can be split.
+            if delimiters is None:
+                if len(buffer) < isa_length and chunk:
+                    continue
+                if not buffer:
+                    return
+                try:
+                    delimiters = detect_delimiters(buffer)
+                except ValueError as e:
+                    raise X12Error(str(e), position + 1) from None
+
+            parts = buffer.split(delimiters.segment)
+            buffer = parts.pop()
+            for part in parts:
+                part = part.strip()
+                if not part:
+                    continue
+
+                position += 1
+                if part.startswith("ISA"):
+                    try:
+                        delimiters = detect_delimiters(part + delimiters.segment)
+                    except ValueError:
+                        raise X12Error("malformed ISA segment", position) from None
+                    if len(part) != isa_length - 1:
+                        raise X12Error("malformed ISA segment", position)
+
+                yield Segment(part.split(delimiters.element), delimiters, position)
+
+            if not chunk:
+                if buffer.strip():
+                    raise X12Error("unterminated segment at end of file", position + 1)
+                return
+
+
+sex_codes = {"M": SexType.MALE, "F": SexType.FEMALE, "U": SexType.UNKNOWN}
+
+facility_code_qualifiers = {"A": FormType.UB_04, "B": FormType.HCFA}
+"""Form types by CLM05_02, which says whether CLM05_01 is a bill type or place of service"""
+
+implementation_form_types = {"X222": FormType.HCFA, "X223": FormType.UB_04}
+"""Form types by the implementation guide in ST03 or GS08 (e.g. 005010X222A1)"""
+
+provider_references = {
+    "EI": "provider_tax_id",
+    "0B": "provider_license_number",
+    "G2": "provider_commercial_number",
+}
+
+diagnosis_qualifiers = {
+    "ABK": "principal",
+    "BK": "principal",
+    "ABJ": "admitting",
+    "BJ": "admitting",
+    "ABF": "other",
+    "BF": "other",
+    "ABN": "other",
+    "BN": "other",
+}
+
+procedure_qualifiers = {
+    "BBR": "principal",
+    "BR": "principal",
+    "CAH": "principal",
+    "BBQ": "other",
+    "BQ": "other",
+}
+
+pounds_to_kg = 0.45359237
+inches_to_cm = 2.54
+
+
+def _dates(segment: Segment) -> tuple[str, str]:
+    """Returns the start and end of a DTP date or date range."""
+
+    value = segment.get(3)
+    if segment.get(2) == "RD8" and "-" in value:
+        start, end = value.split("-", 1)
+        return start, end
+
+    return value, value
+
+
+def _weight_kg(unit: str, weight: str) -> float | None:
+    if not weight:
+        return None
+
+    return float(weight) * pounds_to_kg if unit in ("01", "LB") else float(weight)
+
+
+class _ClaimReader:
+    """Tracks the loops the reader is in and builds each claim from their segments."""
+
+    def __init__(self, on_error: Callable[[X12Error], None] | None):
+        self.on_error = on_error
+
+        self.form_type: FormType | None = None
+        self.level = ""
+        self.billing_provider: dict[str, Any] = {}
+        self.subscriber: dict[str, Any] = {}
+        self.patient: dict[str, Any] = {}
+
+        self.claim: dict[str, Any] | None = None
+        self.claim_position = 0
+        self.facility: dict[str, Any] = {}
+        self.statement_dates: tuple[str, str] | None = None
+        self.services: list[dict[str, Any]] = []
+        self.service: dict[str, Any] | None = None
+
+        # The provider (or ambulance pick-up location) the N3, N4, REF, PER, and PRV segments
+        # which follow an NM1 describe.
+        self.target: dict[str, Any] | None = None
+        self.ambulance_pickup: dict[str, Any] | None = None
+
+        self._handlers: dict[str, Callable[[Segment], Claim | None]] = {
+            "GS": self._gs,
+            "ST": self._st,
+            "SE": self._se,
+            "HL": self._hl,
+            "PRV": self._prv,
+            "NM1": self._nm1,
+            "N3": self._n3,
+            "N4": self._n4,
+            "REF": self._ref,
+            "PER": self._per,
+            "SBR": self._sbr,
+            "DMG": self._dmg,
+            "PAT": self._pat,
+            "CLM": self._clm,
+            "DTP": self._dtp,
+            "CL1": self._cl1,
+            "CR1": self._cr1,
+            "MEA": self._mea,
+            "HI": self._hi,
+            "LX": self._lx,
+            "SV1": self._sv1,
+            "SV2": self._sv2,
+            "LIN": self._lin,
+        }
+
+    def read(self, segment: Segment) -> Claim | None:
+        """Reads a segment, returning the previous claim once it's complete."""
+
+        handler = self._handlers.get(segment.id)
+        if handler is None:
+            return None
+
+        try:
+            return handler(segment)
+        except (ValueError, IndexError) as e:
+            if isinstance(e, X12Error):
+                raise
+            raise X12Error(f"invalid {segment.id} segment: {e}", segment.position)
+
+    def finish(self) -> Claim | None:
+        """Returns the claim being read, if any, once there are no more segments for it."""
+
+        if self.claim is None:
+            return None
+
+        self._end_service()
+        claim, self.claim = self.claim, None
+        services, self.services = self.services, []
+        facility, self.facility = self.facility, {}
+        statement_dates, self.statement_dates = self.statement_dates, None
+        self.target = self.ambulance_pickup = None
+
+        fields: dict[str, Any] = {
+            **self.billing_provider,
+            **facility,
+            **self.subscriber,
+            **self.patient,
+            **claim,
+        }
+        fields.setdefault("form_type", self.form_type)
+
+        service_dates = [
+            date
+            for service in services
+            for date in (service.get("date_from"), service.get("date_through"))
+            if date
+        ]
+        if service_dates:
+            fields["date_from"] = min(service_dates)
+            fields["date_through"] = max(service_dates)
+        elif statement_dates is not None:
+            fields["date_from"], fields["date_through"] = statement_dates
+
+        try:
+            for service in services:
+                provider = service.get("provider")
+                service["provider"] = (
+                    Provider(**provider) if provider and "npi" in provider else None
+                )
+            fields["services"] = [Service(**service) for service in services]
+
+            return Claim(**fields)
+        except ValidationError as e:
+            error = X12Error(
+                f"invalid claim {fields.get('claim_id')!r}: {e}", self.claim_position
+            )
+            if self.on_error is None:
+                raise error from e
+
+            self.on_error(error)
+            return None
+
+    def _end_service(self) -> None:
+        if self.service is not None:
+            self.services.append(self.service)
+            self.service = None
+
+    def _gs(self, segment: Segment) -> None:
+        self._set_form_type(segment.get(8))
+
+    def _st(self, segment: Segment) -> Claim | None:
+        claim = self.finish()
+        self.level = ""
+        self.billing_provider = {}
+        self.subscriber = {}
+        self.patient = {}
+        self._set_form_type(segment.get(3))
+
+        return claim
+
+    def _set_form_type(self, version: str) -> None:
+        for implementation, form_type in implementation_form_types.items():
+            if implementation in version:
+                self.form_type = form_type
+
+    def _se(self, segment: Segment) -> Claim | None:
+        return self.finish()
+
+    def _hl(self, segment: Segment) -> Claim | None:
+        claim = self.finish()
+
+        self.level = segment.get(3)
+        match self.level:
+            case "20":
+                self.billing_provider = {}
+                self.target = self.billing_provider
+            case "22":
+                self.subscriber = {}
+                self.patient = {}
+                self.target = None
+            case "23":
+                self.patient = {}
+                self.target = None
+
+        return claim
+
+    def _prv(self, segment: Segment) -> None:
+        if self.target is not None and segment.get(3):
+            self.target["provider_taxonomy"] = segment.get(3)
+
+    def _nm1(self, segment: Segment) -> None:
+        entity = segment.get(1)
+        self.target = self.ambulance_pickup = None
+
+        if entity == "85":
+            self.target = self.billing_provider
+        elif self.claim is not None and entity in ("77", "82"):
+            if self.service is not None:
+                self.target = self.service.setdefault("provider", {})
+            elif entity == "77":
+                self.target = self.facility
+        elif self.claim is not None and entity == "PW":
+            self.ambulance_pickup = (
+                self.service if self.service is not None else self.claim
+            )
+
+        if self.target is None:
+            return
+
+        if segment.get(2) == "1":
+            self.target["provider_last_name"] = segment.get(3) or None
+            self.target["provider_first_name"] = segment.get(4) or None
+        elif segment.get(3):
+            self.target["provider_org_name"] = segment.get(3)
+
+        if segment.get(9):
+            self.target["npi"] = segment.get(9)
+
+    def _n3(self, segment: Segment) -> None:
+        if self.target is not None:
+            self.target["provider_address1"] = segment.get(1) or None
+            self.target["provider_address2"] = segment.get(2) or None
+
+    def _n4(self, segment: Segment) -> None:
+        if self.ambulance_pickup is not None:
+            self.ambulance_pickup["ambulance_pickup_zip"] = segment.get(3) or None
+        elif self.target is not None:
+            self.target["provider_city"] = segment.get(1) or None
+            self.target["provider_state"] = segment.get(2) or None
+            self.target["provider_zip"] = segment.get(3) or None
+
+    def _ref(self, segment: Segment) -> None:
+        qualifier = segment.get(1)
+
+        if self.claim is not None and self.service is None and qualifier == "D9":
+            self.claim["claim_id"] = segment.get(2)
+        elif self.target is not None and qualifier in provider_references:
+            self.target[provider_references[qualifier]] = segment.get(2)
+
+    def _per(self, segment: Segment) -> None:
+        if self.target is None:
+            return
+
+        fields = {
+            "TE": "provider_phones",
+            "FX": "provider_faxes",
+            "EM": "provider_emails",
+        }
+        for index in (3, 5, 7):
+            field = fields.get(segment.get(index))
+            if field is not None and segment.get(index + 1):
+                self.target.setdefault(field, []).append(segment.get(index + 1))
+
+    def _demographics(self) -> dict[str, Any]:
+        return self.patient if self.level == "23" else self.subscriber
+
+    def _sbr(self, segment: Segment) -> None:
+        if segment.get(3):
+            self.subscriber["plan_code"] = segment.get(3)
+
+    def _dmg(self, segment: Segment) -> None:
+        if self.claim is not None:
+            return
+
+        demographics = self._demographics()
+        if segment.get(2):
+            demographics["patient_date_of_birth"] = segment.get(2)
+        if segment.get(3) in sex_codes:
+            demographics["patient_sex"] = sex_codes[segment.get(3)]
+
+    def _pat(self, segment: Segment) -> None:
+        weight = _weight_kg(segment.get(7), segment.get(8))
+        if weight is not None:
+            self._demographics()["patient_weight_in_kg"] = weight
+
+    def _clm(self, segment: Segment) -> Claim | None:
+        claim = self.finish()
+        self.target = None
+
+        facility = segment.components(5)
+        self.claim = {
+            "claim_id": segment.get(1) or None,
+            "billed_amount": segment.get(2) or None,
+        }
+        if facility[0]:
+            self.claim["bill_type_or_pos"] = facility[0]
+        if len(facility) > 1 and facility[1] in facility_code_qualifiers:
+            self.claim["form_type"] = facility_code_qualifiers[facility[1]]
+        if len(facility) > 2 and facility[2]:
+            self.claim["bill_type_sequence"] = facility[2]
+        self.claim_position = segment.position
+
+        return claim
+
+    def _dtp(self, segment: Segment) -> None:
+        qualifier = segment.get(1)
+
+        if self.service is not None and qualifier == "472":
+            self.service["date_from"], self.service["date_through"] = _dates(segment)
+        elif self.claim is not None and qualifier == "434":
+            self.statement_dates = _dates(segment)
+
+    def _cl1(self, segment: Segment) -> None:
+        if self.claim is not None and segment.get(3):
+            self.claim["discharge_status"] = segment.get(3)
+
+    def _cr1(self, segment: Segment) -> None:
+        weight = _weight_kg(segment.get(1), segment.get(2))
+        if self.claim is not None and weight is not None:
+            self.claim["patient_weight_in_kg"] = weight
+
+    def _mea(self, segment: Segment) -> None:
+        if self.claim is not None and segment.get(2) == "HT" and segment.get(3):
+            self.claim["patient_height_in_cm"] = float(segment.get(3)) * inches_to_cm
+
+    def _hi(self, segment: Segment) -> None:
+        claim = self.claim
+        if claim is None:
+            return
+
+        for index in range(1, len(segment.elements)):
+            components = segment.components(index)
+            if len(components) < 2 or not components[1]:
+                continue
+
+            qualifier, code = components[0], components[1]
+            if qualifier in diagnosis_qualifiers:
+                diagnosis = {"code": code}
+                if len(components) > 8 and components[8]:
+                    diagnosis["present_on_admission"] = components[8]
+
+                match diagnosis_qualifiers[qualifier]:
+                    case "principal":
+                        claim["principal_diagnosis"] = diagnosis
+                    case "admitting":
+                        claim["admit_diagnosis"] = code
+                    case _:
+                        claim.setdefault("other_diagnoses", []).append(diagnosis)
+            elif qualifier in procedure_qualifiers:
+                if procedure_qualifiers[qualifier] == "principal":
+                    claim["principal_procedure"] = code
+                else:
+                    claim.setdefault("other_procedures", []).append(code)
+            elif qualifier in ("BG", "ABG"):
+                claim.setdefault("condition_codes", []).append(code)
+            elif qualifier in ("BH", "ABH"):
+                claim.setdefault("occurrence_codes", []).append(code)
+            elif qualifier in ("BE", "ABE"):
+                amount = components[4] if len(components) > 4 else ""
+                self._value_code(code, amount)
+            elif qualifier == "DR":
+                claim["drg"] = code
+
+    def _value_code(self, code: str, amount: str) -> None:
+        claim = self.claim
+        assert claim is not None
+
+        if not amount:
+            return
+
+        claim.setdefault("value_codes", []).append({"code": code, "amount": amount})
+        match code:
+            case "A0":
+                claim["ambulance_pickup_zip"] = amount.split(".")[0]
+            case "A8":
+                claim["patient_weight_in_kg"] = float(amount)
+            case "A9":
+                claim["patient_height_in_cm"] = float(amount)
+
+    def _lx(self, segment: Segment) -> None:
+        if self.claim is None:
+            return
+
+        self._end_service()
+        self.target = self.ambulance_pickup = None
+        self.service = {"line_number": segment.get(1) or None}
+
+    def _procedure(self, components: list[str]) -> None:
+        service = self.service
+        assert service is not None
+
+        if len(components) > 1 and components[1]:
+            service["procedure_code"] = components[1]
+
+        modifiers = [modifier for modifier in components[2:6] if modifier]
+        if modifiers:
+            service["procedure_modifiers"] = modifiers
+
+    def _sv1(self, segment: Segment) -> None:
+        if self.service is None:
+            return
+
+        self._procedure(segment.components(1))
+        self.service["billed_amount"] = segment.get(2) or None
+        self.service["units"] = segment.get(3) or None
+        self.service["quantity"] = segment.get(4) or None
+        self.service["place_of_service"] = segment.get(5) or None
+
+    def _sv2(self, segment: Segment) -> None:
+        if self.service is None:
+            return
+
+        self.service["rev_code"] = segment.get(1) or None
+        if segment.get(2):
+            self._procedure(segment.components(2))
+        self.service["billed_amount"] = segment.get(3) or None
+        self.service["units"] = segment.get(4) or None
+        self.service["quantity"] = segment.get(5) or None
+
+    def _lin(self, segment: Segment) -> None:
+        if self.service is not None and segment.get(3):
+            self.service["drug_code"] = segment.get(3)
+
+
+def read_837(
+    source: Source,
+    on_error: Callable[[X12Error], None] | None = None,
+    chunk_size: int = 1 << 16,
+    encoding: str = "utf-8",
+) -> Iterator[Claim]:
+    """
+    Yields the claims in X12 837P or 837I interchanges, one at a time as they're read.
+
+    Claims take their provider from the billing provider (loop 2010AA), overridden by the service
+    facility location (NM1 77) when it has one, and their patient details from the subscriber and
+    patient loops. The claim ID is REF D9 if present, or the patient control number (CLM01)
+    otherwise. Claims without service dates take their dates from the statement dates (DTP 434).
+
+    A claim which isn't valid raises `X12Error`, unless `on_error` is given, in which case it's
+    called with the error and reading carries on with the next claim.
+    """
+
+    reader = _ClaimReader(on_error)
+
+    for segment in read_segments(source, chunk_size, encoding):
+        claim = reader.read(segment)
+        if claim is not None:
+            yield claim
+
+    claim = reader.finish()
+    if claim is not None:
+        yield claim
+
+
+claim_pricing_methodologies = {
+    ClaimRepricingCode.MEDICARE: "02",
+    ClaimRepricingCode.CONTRACT_PRICING: "03",
+    ClaimRepricingCode.RBP_PRICING: "10",
+    ClaimRepricingCode.SINGLE_CASE_AGREEMENT: "03",
+    ClaimRepricingCode.NEEDS_MORE_INFO: "00",
+}
+"""Pricing methodology codes (HCP01) for claim repricing codes, with 10 (other) for the rest"""
+
+line_pricing_methodologies = {
+    LineRepricingCode.MEDICARE: "02",
+    LineRepricingCode.MEDICARE_PERCENT: "02",
+    LineRepricingCode.MEDICARE_NO_OUTLIER: "02",
+    LineRepricingCode.SYNTHETIC_MEDICARE: "02",
+    LineRepricingCode.FEE_SCHEDULE: "02",
+    LineRepricingCode.BILLED_PERCENT: "10",
+    LineRepricingCode.PER_DIEM: "10",
+    LineRepricingCode.FLAT_RATE: "07",
+    LineRepricingCode.COST_PERCENT: "13",
+    LineRepricingCode.LIMITED_TO_BILLED: "01",
+    LineRepricingCode.NOT_REPRICED_PER_REQUEST: "00",
+    LineRepricingCode.NOT_ALLOWED_BY_MEDICARE: "00",
+    LineRepricingCode.PACKAGED: "04",
+    LineRepricingCode.NEEDS_MORE_INFO: "00",
+    LineRepricingCode.PROCEDURE_CODE_PROBLEM: "00",
+}
+"""Pricing methodology codes (HCP01) for line repricing codes, with 10 (other) for the rest"""
+
+claim_hcp_followers = frozenset({"NM1", "SBR"})
+"""Segments starting the loops which follow the claim's HCP segment (2310 and 2320)"""
+
+line_hcp_followers = frozenset({"LIN", "NM1", "SVD", "LQ", "FRM"})
+"""Segments starting the loops which follow a service line's HCP segment (2410 to 2440)"""
+
+
+def format_amount(amount: float) -> str:
+    """Formats an amount as an X12 decimal, without trailing zeros."""
+
+    formatted = f"{amount:.2f}".rstrip("0").rstrip(".")
+    return "0" if formatted in ("", "-0") else formatted
+
+
+def _hcp(
+    delimiters: Delimiters,
+    methodology: str,
+    amount: float | None,
+    billed: str,
+    organization: str | None,
+    deny_code: str | None = None,
+) -> Segment:
+    elements = [
+        "HCP",
+        methodology,
+        format_amount(amount or 0),
+        "",
+        organization or "",
+    ]
+    if billed and amount is not None:
+        elements[3] = format_amount(float(billed) - amount)
+    if deny_code:
+        elements += [""] * 8 + [deny_code]
+
+    while not elements[-1]:
+        elements.pop()
+
+    return Segment(elements, delimiters, 0)
+
+
+def _replace_hcp(
+    segments: list[Segment], followers: frozenset[str], hcp: Segment
+) -> list[Segment]:
+    """Replaces any HCP segments with `hcp`, placed before the first segment in `followers`."""
+
+    kept = [segment for segment in segments if segment.id != "HCP"]
+    index = next(
+        (i for i, segment in enumerate(kept) if i > 0 and segment.id in followers),
+        len(kept),
+    )
+
+    return kept[:index] + [hcp] + kept[index:]
+
+
+def _reprice_claim(
+    claim: list[Segment],
+    pricing: Pricing,
+    delimiters: Delimiters,
+    organization: str | None,
+) -> list[Segment]:
+    lines: list[list[Segment]] = []
+    header: list[Segment] = []
+    for segment in claim:
+        if segment.id == "LX":
+            lines.append([segment])
+        elif lines:
+            lines[-1].append(segment)
+        else:
+            header.append(segment)
+
+    if pricing.allowed_amount is not None:
+        amount, code = pricing.allowed_amount, pricing.allowed_repricing_code
+    else:
+        amount, code = pricing.medicare_amount, pricing.medicare_repricing_code
+    edits = pricing.edit_detail
+    output = _replace_hcp(
+        header,
+        claim_hcp_followers,
+        _hcp(
+            delimiters,
+            "10" if code is None else claim_pricing_methodologies.get(code, "10"),
+            amount,
+            header[0].get(2),
+            organization,
+            edits.hcp_deny_code if edits else None,
+        ),
+    )
+
+    services = {
+        service.line_number: service
+        for service in pricing.services
+        if service.line_number is not None
+    }
+    for index, line in enumerate(lines):
+        service = services.get(line[0].get(1))
+        if service is None and not services and index < len(pricing.services):
+            service = pricing.services[index]
+
+        billed_line = next(
+            (segment for segment in line if segment.id in ("SV1", "SV2")), None
+        )
+        if service is None or billed_line is None:
+            output += line
+            continue
+
+        if service.allowed_amount is not None:
+            amount, line_code = service.allowed_amount, service.allowed_repricing_code
+        else:
+            amount, line_code = service.medicare_amount, service.medicare_repricing_code
+        billed = billed_line.get(2 if billed_line.id == "SV1" else 3)
+        output += _replace_hcp(
+            line,
+            line_hcp_followers,
+            _hcp(
+                delimiters,
+                (
+                    "10"
+                    if line_code is None
+                    else line_pricing_methodologies.get(line_code, "10")
+                ),
+                amount,
+                billed,
+                organization,
+            ),
+        )
+
+    return output
+
+
+def _claim_id(claim: list[Segment]) -> str:
+    """Returns the ID `read_837` gives a claim: REF D9 if present, otherwise CLM01."""
+
+    for segment in claim:
+        if segment.id == "LX":
+            break
+        if segment.id == "REF" and segment.get(1) == "D9":
+            return segment.get(2)
+
+    return claim[0].get(1)
+
+
+@contextlib.contextmanager
+def _open_output(output: str | os.PathLike[str] | IO[str]) -> Iterator[IO[str]]:
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            yield f
+    else:
+        yield output
+
+
+def write_repriced_837(
+    source: Source,
+    pricings: Iterable[Pricing | None] | Mapping[str, Pricing],
+    output: str | os.PathLike[str] | IO[str],
+    repricing_organization: str | None = None,
+    line_breaks: bool = True,
+    chunk_size: int = 1 << 16,
+    encoding: str = "utf-8",
+) -> int:
+    """
+    Copies an 837 interchange to `output` with HCP segments holding each claim's repricing. Each
+    claim is read, repriced, and written before the next is read, so memory use stays constant.
+    Returns the number of claims repriced.
+
+    `pricings` are either in the same order as the claims (as `read_837` yields them, with None
+    to leave a claim as it is) or keyed by claim ID. Claims are matched to pricings by claim ID
+    when they have one, so an `X12Error` is raised if pricings given in order get out of step.
+
+    Each claim (loop 2300) and service line (loop 2400) that has a result gets an HCP segment,
+    replacing any it already had:
+
+    - HCP01: the pricing methodology for the repricing code (see `claim_pricing_methodologies`
+      and `line_pricing_methodologies`)
+    - HCP02: the allowed amount, or the Medicare amount if there isn't one
+    - HCP03: the savings from the billed amount
+    - HCP04: `repricing_organization`, the repricing organization's identifier, if given
+    - HCP13: the reject reason code from `ClaimEdits.hcp_deny_code` (claims only)
+
+    The API's repricing codes (e.g. MED or IFO) aren't valid in any HCP element, so they're only
+    reflected in the pricing methodology. Segment counts (SE01) are updated to include the added
+    segments.
+    """
+
+    return write_repriced_segments(
+        read_segments(source, chunk_size, encoding),
+        pricings,
+        output,
+        repricing_organization,
+        line_breaks,
+    )
+
+
+def write_repriced_segments(
+    segments: Iterable[Segment],
+    pricings: Iterable[Pricing | None] | Mapping[str, Pricing],
+    output: str | os.PathLike[str] | IO[str],
+    repricing_organization: str | None = None,
+    line_breaks: bool = True,
+) -> int:
+    """
+    Works like `write_repriced_837`, but reads segments which have already been read (e.g. with
+    `read_segments`) and possibly filtered or changed.
+    """
+
+    by_id: Mapping[str, Pricing] | None = None
+    in_order: Iterator[Pricing | None] | None = None
+    if isinstance(pricings, Mapping):
+        by_id = cast(Mapping[str, Pricing], pricings)
+    else:
+        in_order = iter(pricings)
+
+    repriced = 0
+    claim: list[Segment] = []
+    transaction_count = 0
+
+    with _open_output(output) as f:
+
+        def write(segment: Segment) -> None:
+            nonlocal transaction_count
+            transaction_count += 1
+
+            f.write(str(segment))
+            if line_breaks and not segment.delimiters.segment.isspace():
+                f.write("\n")
+
+        def finish_claim() -> None:
+            nonlocal repriced
+
+            if not claim:
+                return
+
+            claim_id = _claim_id(claim)
+            if by_id is not None:
+                pricing = by_id.get(claim_id)
+            else:
+                assert in_order is not None
+                try:
+                    pricing = next(in_order)
+                except StopIteration:
+                    raise X12Error(
+                        f"no pricing for claim {claim_id!r}", claim[0].position
+                    ) from None
+
+                if pricing is not None and pricing.claim_id not in (None, claim_id):
+                    raise X12Error(
+                        f"pricing for claim {pricing.claim_id!r} doesn't match claim {claim_id!r}",
+                        claim[0].position,
+                    )
+
+            if pricing is None:
+                output_segments = claim
+            else:
+                output_segments = _reprice_claim(
+                    claim, pricing, claim[0].delimiters, repricing_organization
+                )
+                repriced += 1
+
+            for segment in output_segments:
+                write(segment)
+            claim.clear()
+
+        for segment in segments:
+            if segment.id in ("CLM", "HL", "SE"):
+                finish_claim()
+
+            if segment.id == "CLM" or (claim and segment.id not in ("HL", "SE")):
+                claim.append(segment)
+                continue
+
+            if segment.id == "ST":
+                transaction_count = 0
+            elif segment.id == "SE":
+                segment = Segment(
+                    ["SE", str(transaction_count + 1), *segment.elements[2:]],
+                    segment.delimiters,
+                    segment.position,
+                )
+
+            write(segment)
+
+        finish_claim()
+
+    return repriced
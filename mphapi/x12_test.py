@@ -0,0 +1,196 @@
+import io
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from .claim import FormType, SexType
+from .pricing import ClaimEdits, ClaimRepricingCode, LineRepricingCode, Pricing
+from .stub import price_claim
+from .x12 import (
+    Delimiters,
+    Segment,
+    X12Error,
+    read_837,
+    read_segments,
+    write_repriced_837,
+    write_repriced_segments,
+)
+
+
+def test_837p(testdata_dir: Path):
+    claims = list(read_837(testdata_dir.joinpath("837p.x12")))
+    assert [claim.claim_id for claim in claims] == ["TRACE1234", "5678"]
+
+    claim = claims[0]
+    assert claim.npi == "1679184618"
+    assert claim.provider_zip == "78596"
+    assert claim.provider_taxonomy == "207Q00000X"
+    assert claim.provider_phones == ["9565551234"]
+    assert claim.form_type == FormType.HCFA
+    assert claim.bill_type_or_pos == "11"
+    assert claim.patient_sex == SexType.MALE
+    assert str(claim.patient_date_of_birth) == "19600115"
+    assert claim.principal_diagnosis is not None
+    assert claim.principal_diagnosis.code == "E113293"
+    assert [diagnosis.code for diagnosis in claim.other_diagnoses or []] == ["Z794"]
+    assert claim.billed_amount == 175
+
+    claim = claims[1]
+    assert (str(claim.date_from), str(claim.date_through)) == ("20221101", "20221103")
+    first, second = claim.services
+    assert first.procedure_code == "99213"
+    assert first.procedure_modifiers == ["25"]
+    assert first.place_of_service == "11"
+    assert second.drug_code == "00003029328"
+    assert second.quantity == 2
+    assert second.provider is not None
+    assert second.provider.npi == "1003000126"
+    assert second.provider.provider_zip == "78550"
+
+
+def test_837i(testdata_dir: Path):
+    (claim,) = read_837(testdata_dir.joinpath("837i.x12"))
+
+    assert claim.claim_id == "IP-1"
+    assert claim.form_type == FormType.UB_04
+    assert claim.patient_sex == SexType.FEMALE
+    assert claim.discharge_status == "01"
+    assert claim.admit_diagnosis == "R509"
+    assert claim.principal_diagnosis is not None
+    assert claim.principal_diagnosis.present_on_admission == "Y"
+    assert len(claim.other_diagnoses or []) == 2
+    assert claim.principal_procedure == "0BH17EZ"
+    assert claim.condition_codes == ["01"]
+    assert claim.occurrence_codes == ["11"]
+    assert [str(value.amount) for value in claim.value_codes or []] == ["72.5", "4"]
+    assert claim.patient_weight_in_kg == 72.5
+    assert claim.drg == "194"
+    assert [service.rev_code for service in claim.services] == ["0120", "0450"]
+
+
+def test_streaming(read_testdata: Callable[[str], str]):
+    content = read_testdata("837p.x12") + read_testdata("837i.x12")
+    expected = [claim.claim_id for claim in read_837(io.StringIO(content))]
+    assert expected == ["TRACE1234", "5678", "IP-1"]
+
+    # Segments split across chunks, read from a binary file.
+    claims = read_837(io.BytesIO(content.encode()), chunk_size=7)
+    assert [claim.claim_id for claim in claims] == expected
+
+    # Delimiters come from the ISA segment.
+    other = (
+        content.replace("*", "|")
+        .replace(":", ">")
+        .replace("~\n", "~")
+        .replace("~", "\n")
+    )
+    segments = list(read_segments(io.StringIO(other)))
+    assert segments[0].delimiters == Delimiters("|", ">", "^", "\n")
+    assert segments[-1].id == "IEA"
+    assert [claim.claim_id for claim in read_837(io.StringIO(other))] == expected
+
+
+def test_errors(read_testdata: Callable[[str], str]):
+    content = read_testdata("837p.x12").replace(
+        "NM1*85*2*VALLEY CLINIC*****XX*1679184618", "NM1*85*2*VALLEY CLINIC"
+    )
+
+    with pytest.raises(X12Error, match="invalid claim 'TRACE1234'"):
+        list(read_837(io.StringIO(content)))
+
+    errors: list[X12Error] = []
+    claims = list(read_837(io.StringIO(content), on_error=errors.append))
+    assert claims == []
+    assert [error.segment for error in errors] == [22, 30]
+
+    with pytest.raises(X12Error, match="ISA"):
+        list(read_segments(io.StringIO("GS*HC~")))
+
+    with pytest.raises(X12Error, match="unterminated"):
+        list(read_segments(io.StringIO(read_testdata("837p.x12").rstrip("~\n"))))
+
+
+def hcp_segments(content: str) -> list[tuple[str, Segment]]:
+    """Returns each HCP segment along with the ID of the segment it follows."""
+
+    segments = list(read_segments(io.StringIO(content)))
+    return [
+        (previous.id, segment)
+        for previous, segment in zip(segments, segments[1:])
+        if segment.id == "HCP"
+    ]
+
+
+def test_write_repriced(read_testdata: Callable[[str], str]):
+    content = read_testdata("837p.x12")
+    pricings = [
+        Pricing.model_validate_json(price_claim(claim))
+        for claim in read_837(io.StringIO(content))
+    ]
+    pricings[0].edit_detail = ClaimEdits(hcp_deny_code="D1")
+    pricings[1].allowed_amount = 200
+    pricings[1].allowed_repricing_code = ClaimRepricingCode.CONTRACT_PRICING
+    pricings[1].services[1].medicare_repricing_code = LineRepricingCode.PACKAGED
+
+    output = io.StringIO()
+    assert write_repriced_837(io.StringIO(content), pricings, output) == 2
+    repriced = output.getvalue()
+
+    hcps = hcp_segments(repriced)
+    assert [(previous, str(hcp)) for previous, hcp in hcps] == [
+        ("HI", "HCP*02*70*105**********D1~"),
+        ("DTP", "HCP*10*70*105~"),
+        ("HI", "HCP*03*200*50~"),
+        ("DTP", "HCP*10*60*90~"),
+        ("DTP", "HCP*04*40*60~"),
+    ]
+    # Repricing codes like MED aren't valid HCP values, so only the methodology reflects them.
+    assert all(hcp.get(4) == "" for _, hcp in hcps)
+
+    # Segment counts include the new segments.
+    count = 0
+    for segment in read_segments(io.StringIO(repriced)):
+        count = 1 if segment.id == "ST" else count + 1
+        if segment.id == "SE":
+            assert segment.get(1) == str(count)
+
+    # The claims are unchanged, and repricing again replaces the HCP segments.
+    assert [claim.model_dump_json() for claim in read_837(io.StringIO(repriced))] == [
+        claim.model_dump_json() for claim in read_837(io.StringIO(content))
+    ]
+    again = io.StringIO()
+    write_repriced_837(io.StringIO(repriced), pricings, again)
+    assert again.getvalue() == repriced
+
+
+def test_write_repriced_segments(read_testdata: Callable[[str], str]):
+    content = read_testdata("837p.x12")
+    pricings = [
+        Pricing.model_validate_json(price_claim(claim))
+        for claim in read_837(io.StringIO(content))
+    ]
+
+    # HCP04 holds the repricing organization's identifier.
+    output = io.StringIO()
+    segments = read_segments(io.StringIO(content))
+    assert write_repriced_segments(segments, pricings, output, "REPRICER1") == 2
+    hcps = [hcp for _, hcp in hcp_segments(output.getvalue())]
+    assert [hcp.get(4) for hcp in hcps] == ["REPRICER1"] * 5
+    assert str(hcps[1]) == "HCP*10*70*105*REPRICER1~"
+
+
+def test_write_repriced_by_id(read_testdata: Callable[[str], str]):
+    content = read_testdata("837p.x12") + read_testdata("837i.x12")
+    claim = next(read_837(io.StringIO(content)))
+    pricing = Pricing.model_validate_json(price_claim(claim))
+
+    output = io.StringIO()
+    assert write_repriced_837(io.StringIO(content), {"TRACE1234": pricing}, output) == 1
+    assert len(hcp_segments(output.getvalue())) == 2
+
+    with pytest.raises(X12Error, match="doesn't match claim '5678'"):
+        write_repriced_837(io.StringIO(content), [pricing, pricing], io.StringIO())
+
+    with pytest.raises(X12Error, match="no pricing"):
+        write_repriced_837(io.StringIO(content), [pricing], io.StringIO())